@@ -1,68 +1,251 @@
 import os
 import json
-import requests
-from flask import Flask, render_template, request, redirect, url_for, session, flash
+import hashlib
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from flask import (Flask, Response, abort, flash, g, jsonify, redirect, render_template, request,
+                   session, url_for)
 from dotenv import load_dotenv
-from flask_session import Session # Import Flask-Session
+from jinja2 import FileSystemBytecodeCache
+from response_cache import cache_from_env, make_cache_key
+from singleflight import SingleFlight
+from model_router import parse_model_list, router_from_env
+from prompts import build_ideas_messages, build_content_messages
+import sqlite3
+from content_store import content_store_from_env
+from jobs import DONE as JOB_DONE, FAILED as JOB_FAILED, QUEUED as JOB_QUEUED, RUNNING as JOB_RUNNING, job_queue_from_env
+from artifact_store import artifact_id_for, artifact_store_from_env
+from idea_index import idea_index_from_env
+from topic_catalog import MAX_PAGE_SIZE, topic_catalog_from_env
+from content_results import (apply_generated_fields, apply_translated_fields, default_generated_content,
+                             default_translated_content, normalize_translation)
+from languages import LANGUAGES, parse_language_list
+from llm_json import CONTENT_SCHEMA, IDEAS_SCHEMA, IncrementalJsonParser, LLMParseError, parse_llm_json
+from translation import ChunkedTranslationError, TranslationPlan
+from telemetry import telemetry_from_env
+from session_backend import init_session_backend
+from static_assets import static_assets_from_env
 
 load_dotenv()
 
-app = Flask(__name__)
+APP_DIR = os.path.abspath(os.path.dirname(__file__))
+# Default home of runtime data (session files, content store, artifact DB);
+# each location can still be set on its own below.
+DATA_DIR = os.path.abspath(os.getenv("DATA_DIR") or APP_DIR)
 
-# --- START Flask-Session Configuration ---
-# SECRET_KEY is essential for signing the session cookie and for Flask-Session
-app.config["SECRET_KEY"] = os.getenv("FLASK_SECRET_KEY", os.urandom(32)) 
+# --- Telemetry ---
+# Per-stage timings, token/cost accounting and sampled traces (see telemetry.py),
+# exported at /metrics. `debug_log` replaces the old debug prints: payload dumps
+# only happen with LOG_LEVEL=DEBUG, for DEBUG_LOG_SAMPLE_RATE of the calls.
+telemetry, debug_log = telemetry_from_env()
 
-# Choose your session type. Filesystem is easy for local development.
-app.config["SESSION_TYPE"] = "filesystem"
+# --- Sessions ---
+# SESSION_BACKEND is "filesystem" (default), "redis" or "cookie"; see
+# session_backend.py. The backend is set up by create_app() and built on the
+# first request.
+SESSION_BACKEND = os.getenv("SESSION_BACKEND", "filesystem")
+SESSION_FILE_PATH = os.getenv("SESSION_FILE_DIR") or os.path.join(DATA_DIR, 'flask_session')
 
-# Configure the directory for filesystem sessions.
-SESSION_FILE_PATH = os.path.join(os.path.abspath(os.path.dirname(__file__)), 'flask_session')
-if not os.path.exists(SESSION_FILE_PATH):
+# --- Content Store ---
+# Ideas lists, generated articles and translations are stored compressed with a
+# TTL; the session only keeps their references ("<name>_ref").
+content_store = content_store_from_env(os.path.join(DATA_DIR, 'content_store'))
+
+def save_session_artifact(name, value):
+    previous_ref = session.get(f"{name}_ref")
+    with telemetry.span("content_store_write", artifact=name):
+        session[f"{name}_ref"] = content_store.put(value)
+    if previous_ref:
+        content_store.delete(previous_ref)
+
+def load_session_artifact(name):
+    ref = session.get(f"{name}_ref")
+    return content_store.get(ref) if ref else None
+
+def drop_session_artifact(name):
+    ref = session.pop(f"{name}_ref", None)
+    if ref:
+        content_store.delete(ref)
+
+# --- Artifact Store ---
+# Every successful idea list, article and translation is also kept durably in
+# SQLite under a stable, content-derived ID, so results can be re-opened
+# (/ideas/<id>, /content/<id>) from any worker without calling the AI again.
+artifact_store = artifact_store_from_env(os.path.join(DATA_DIR, 'artifacts.sqlite3'))
+
+def record_artifact(kind, payload, parent_id=None):
+    if artifact_store is None:
+        return None
+    try:
+        return artifact_store.save(kind, payload, parent_id=parent_id)
+    except sqlite3.Error as e:
+        print(f"Could not save {kind} artifact: {e}")
+        return None
+
+# --- Idea Index ---
+# Near-duplicate lookup over every stored idea (see idea_index.py). An idea close
+# to one that was already written up gets a link to that article, and a slug
+# whose blog URL is already taken by another article is flagged. Artifacts saved
+# before the index existed, or by the batch CLI, are picked up in the background
+# once the app is created.
+idea_index = idea_index_from_env(artifact_store)
+
+def sync_idea_index():
+    try:
+        synced = idea_index.sync(artifact_store)
+    except sqlite3.Error as e:
+        print(f"Could not sync the idea index: {e}")
+        return
+    if synced:
+        print(f"Idea index: indexed {synced} stored artifacts.")
+
+def idea_notes(ideas):
+    # Per idea: the written-up ideas it is close to, and the article already using its slug.
+    if idea_index is None:
+        return []
     try:
-        os.makedirs(SESSION_FILE_PATH)
-        print(f"Created session directory: {SESSION_FILE_PATH}")
-    except OSError as e:
-        print(f"Error creating session directory {SESSION_FILE_PATH}: {e}")
-        # Depending on your needs, you might want to exit or handle this error differently
-app.config["SESSION_FILE_DIR"] = SESSION_FILE_PATH
+        with telemetry.span("idea_lookup", ideas=len(ideas)):
+            return [{"similar": idea_index.similar(idea), "slug_taken_by": idea_index.slug_owner(idea)}
+                    for idea in ideas]
+    except sqlite3.Error as e:
+        print(f"Idea index lookup failed: {e}")
+        return []
 
-app.config["SESSION_PERMANENT"] = False # Make sessions non-permanent (browser-length) by default
-app.config["SESSION_USE_SIGNER"] = True  # Encrypts the session ID cookie. Recommended.
-# app.config["SESSION_COOKIE_SAMESITE"] = "Lax" 
-# app.config["SESSION_COOKIE_SECURE"] = True # In production with HTTPS, set this to True
+def index_ideas(ideas, ideas_artifact_id):
+    if idea_index is None:
+        return
+    try:
+        idea_index.add_ideas(ideas, ideas_artifact_id)
+    except sqlite3.Error as e:
+        print(f"Could not index ideas: {e}")
+
+def slug_collision_notices(selected_idea):
+    owner = None
+    if idea_index is not None:
+        try:
+            owner = idea_index.slug_owner(selected_idea)
+        except sqlite3.Error as e:
+            print(f"Idea index lookup failed: {e}")
+    if owner is None:
+        return []
+    return [(f"Warning: https://{YOUR_BLOG_DOMAIN}/{owner['slug']} is already the URL of the article "
+             f"'{owner['title']}'. Change the slug before publishing.", "warning")]
 
-# Initialize the Flask-Session extension
-# This MUST come AFTER you've set the app.config values for Flask-Session
-server_session = Session(app)
-# --- END Flask-Session Configuration ---
+def link_idea_content(selected_idea, content_artifact_id):
+    if idea_index is None or not selected_idea or not content_artifact_id:
+        return
+    try:
+        idea_index.link_content(selected_idea, content_artifact_id)
+    except sqlite3.Error as e:
+        print(f"Could not link content to its idea: {e}")
 
 
 # Global variables
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 DEEPSEEK_MODEL = os.getenv("DEEPSEEK_MODEL", "deepseek/deepseek-chat") 
 TRANSLATION_MODEL = os.getenv("TRANSLATION_MODEL", "mistralai/mistral-7b-instruct:free")
+# Ordered models per task: the first is the primary (and names the cache entries),
+# the rest are hedges / fallbacks (see model_router.py). Unset lists fall back to
+# the single models above.
+MODEL_ROUTES = {
+    "ideas": parse_model_list(os.getenv("IDEAS_MODELS"), DEEPSEEK_MODEL),
+    "content": parse_model_list(os.getenv("CONTENT_MODELS"), DEEPSEEK_MODEL),
+    "translation": parse_model_list(os.getenv("TRANSLATION_MODELS"), TRANSLATION_MODEL),
+}
+IDEAS_MODEL = MODEL_ROUTES["ideas"][0]
+CONTENT_MODEL = MODEL_ROUTES["content"][0]
+TRANSLATION_MODEL = MODEL_ROUTES["translation"][0]
 YOUR_BLOG_DOMAIN = os.getenv("YOUR_BLOG_DOMAIN", "myblogname.com")
+# Articles are translated section by section, concurrently (see translation.py);
+# sections longer than this many characters are split between paragraphs.
+TRANSLATION_CHUNK_CHARS = int(os.getenv("TRANSLATION_CHUNK_CHARS", "2000"))
+# Languages offered on the content page (codes from languages.py). One "Translate"
+# click translates into all of them concurrently unless the user unticks some.
+TRANSLATION_LANGUAGES = parse_language_list(os.getenv("TRANSLATION_LANGUAGES", "fr"))
+
+# --- Topic Catalog ---
+# Topics come from TOPIC_CATALOG_PATH (JSON, CSV or SQLite) or the built-in list
+# in topics.py; they are indexed by ID, title and keyword (see topic_catalog.py).
+# The index page and /topics show one page of TOPICS_PAGE_SIZE at a time.
+topic_catalog = topic_catalog_from_env()
+TOPICS_PAGE_SIZE = min(int(os.getenv("TOPICS_PAGE_SIZE", "50")), MAX_PAGE_SIZE)
+
+# --- LLM Response Cache ---
+# Responses are keyed on a hash of (model, messages). Only the routes listed in
+# LLM_CACHE_ROUTES read from / write to the cache; "content" is opt-in because
+# users usually expect a fresh article when they pick the same idea again.
+LLM_CACHE_ROUTES = {r.strip() for r in os.getenv("LLM_CACHE_ROUTES", "ideas,translation").split(",") if r.strip()}
+response_cache = cache_from_env()
 
 # --- AI Call Function ---
-def call_openrouter_api(prompt_messages, model_to_use=DEEPSEEK_MODEL):
+# All routes share one pooled, keep-alive client per worker (see openrouter_client.py).
+# It is created, and requests imported, on the first upstream call rather than at startup.
+def get_openrouter_client():
+    from openrouter_client import get_client
+    return get_client(OPENROUTER_API_KEY)
+
+# --- Request Coalescing ---
+# Identical calls that overlap share one upstream request, so a burst of users
+# picking the same popular topic costs one generation. Only calls in progress
+# are shared, and a "Regenerate" call only joins another "Regenerate" call, so
+# nobody gets an older answer than they would have without coalescing. Calls
+# only join calls of the same priority, so a user's request never waits in the
+# scheduler's batch queue behind a background call it happened to match.
+LLM_COALESCE_REQUESTS = os.getenv("LLM_COALESCE_REQUESTS", "true").lower() in ("1", "true", "yes")
+llm_single_flight = SingleFlight() if LLM_COALESCE_REQUESTS else None
+
+def flight_key(prompt_messages, model_to_use, cache_route, refresh, priority="interactive"):
+    return (make_cache_key(model_to_use, prompt_messages), cache_route, refresh, priority)
+
+def call_openrouter_api(prompt_messages, model_to_use=DEEPSEEK_MODEL, cache_route=None, refresh=False,
+                        priority="interactive", client_id=None):
+    # cache_route names the calling route ("ideas", "content", "translation");
+    # refresh=True skips the cache lookup (e.g. "Regenerate") but still stores the new result.
+    # priority ("interactive" or "batch") and client_id place the call in the client's scheduler queue.
+    if llm_single_flight is None:
+        return _call_openrouter_api(prompt_messages, model_to_use, cache_route, refresh, priority, client_id)
+    return llm_single_flight.do(flight_key(prompt_messages, model_to_use, cache_route, refresh, priority),
+                                _call_openrouter_api, prompt_messages, model_to_use, cache_route, refresh,
+                                priority, client_id)
+
+def _call_openrouter_api(prompt_messages, model_to_use, cache_route, refresh, priority, client_id):
+    cache_key = None
+    if response_cache is not None and cache_route in LLM_CACHE_ROUTES:
+        cache_key = make_cache_key(model_to_use, prompt_messages)
+        if refresh:
+            response_cache.record_bypass()
+        else:
+            cached_response = response_cache.get(cache_key)
+            if cached_response is not None:
+                return cached_response
+
     if not OPENROUTER_API_KEY:
         print("OpenRouter API key not found.")
         return None
+
+    def request_model(model):
+        with telemetry.span("upstream", route=cache_route, model=model):
+            api_response = fetch_openrouter_response(prompt_messages, model, priority, client_id)
+        if api_response:
+            telemetry.record_usage(cache_route, model, api_response.get('usage'))
+        return api_response
+
+    models = MODEL_ROUTES.get(cache_route) or [model_to_use]
+    if models[0] != model_to_use:
+        models = [model_to_use]  # an explicitly chosen model is not rerouted
+    _, api_response = model_router.call(cache_route, models, request_model,
+                                        lambda candidate: response_is_usable(cache_route, candidate))
+    if cache_key and api_response and api_response.get('choices'):
+        response_cache.set(cache_key, api_response)
+    return api_response
+
+def fetch_openrouter_response(prompt_messages, model_to_use, priority="interactive", client_id=None):
+    import requests
     try:
-        response = requests.post(
-            url="https://openrouter.ai/api/v1/chat/completions",
-            headers={
-                "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-                "Content-Type": "application/json"
-            },
-            data=json.dumps({
-                "model": model_to_use,
-                "messages": prompt_messages
-            })
-        )
-        response.raise_for_status()
-        return response.json()
+        return get_openrouter_client().chat_completion(prompt_messages, model_to_use,
+                                                       priority=priority, client_id=client_id)
     except requests.exceptions.RequestException as e:
         print(f"API Request Error with model {model_to_use}: {e}")
         if hasattr(e, 'response') and e.response is not None:
@@ -72,128 +255,362 @@ def call_openrouter_api(prompt_messages, model_to_use=DEEPSEEK_MODEL):
         return None
     except json.JSONDecodeError as e_json: # Renamed to avoid conflict
         print(f"JSON Decode Error with model {model_to_use}: {e_json}")
-        # Check if 'response' was defined in this scope (it would be if requests.post succeeded but raise_for_status failed on non-JSON error)
-        # However, more likely it's defined if raise_for_status passed but response.json() failed.
-        if 'response' in locals() and hasattr(response, 'text'): # Use .text for string content
-            print(f"Response text that failed to parse as JSON: {response.text}")
         return None
 
-# --- Topics Data ---
-TOPICS_DATA = {
-  "topics": [
-    {"category": "cybersecurity", "title": "Password Security Basics", "keywords": ["passwords", "security", "authentication", "best practices"]},
-    {"category": "cybersecurity", "title": "Understanding Phishing Attacks", "keywords": ["phishing", "email security", "social engineering", "prevention"]},
-    {"category": "networking", "title": "VPN Explained Simply", "keywords": ["VPN", "remote work", "privacy", "security"]},
-    {"category": "networking", "title": "Network Security Fundamentals", "keywords": ["firewall", "network protection", "monitoring", "basics"]},
-    {"category": "AI", "title": "AI in Business: Practical Applications", "keywords": ["artificial intelligence", "business automation", "productivity", "implementation"]},
-    {"category": "AI", "title": "Machine Learning for Non-Technical Teams", "keywords": ["machine learning", "data analysis", "business intelligence", "simple explanation"]},
-    {"category": "cloud", "title": "Cloud Storage Security Best Practices", "keywords": ["cloud security", "data protection", "backup", "compliance"]},
-    {"category": "cloud", "title": "Moving to the Cloud: What HR Needs to Know", "keywords": ["cloud migration", "HR considerations", "employee training", "change management"]}
-  ]
-}
+# --- Upstream Concurrency ---
+# Views are plain WSGI views: a request waiting on the AI holds its server thread,
+# so how many requests a worker serves at once is set by the server's threads
+# (gthread). A worker-wide executor, sharing the pooled client above, lets one
+# request's independent calls (translation sections and languages) run side by
+# side and bounds how many upstream calls one worker process makes at once. Background work
+# (pre-warming) gets its own small executor, LLM_BATCH_MAX_INFLIGHT threads:
+# batch calls wait in the scheduler's batch queue while holding their thread,
+# and on the shared executor they would leave user requests queued behind them
+# before the scheduler could put them first.
+LLM_MAX_INFLIGHT = int(os.getenv("LLM_MAX_INFLIGHT", "64"))
+PREWARM_TRANSLATION = os.getenv("PREWARM_TRANSLATION", "false").lower() in ("1", "true", "yes")
+llm_executor = ThreadPoolExecutor(max_workers=LLM_MAX_INFLIGHT, thread_name_prefix="llm")
+LLM_BATCH_MAX_INFLIGHT = int(os.getenv("LLM_BATCH_MAX_INFLIGHT") or "4")
+batch_executor = ThreadPoolExecutor(max_workers=LLM_BATCH_MAX_INFLIGHT, thread_name_prefix="llm-batch")
+
+# --- Model Routing ---
+# Calls for a task with several models go to the first healthy one; a backup
+# request goes to the next model once the first has taken longer than its recent
+# p95 (LLM_HEDGE_PERCENTILE), and the first answer that parses wins. Streams
+# only use the primary model, since their progress is already visible.
+model_router = router_from_env(max_workers=LLM_MAX_INFLIGHT)
+ROUTE_SCHEMAS = {"ideas": IDEAS_SCHEMA, "content": CONTENT_SCHEMA}
+
+def response_is_usable(cache_route, api_response):
+    # "Usable" means the route could parse it; translation requests are a mix of JSON
+    # and plain Markdown (see translation.py), so for them any text will do.
+    if not api_response or not api_response.get('choices'):
+        return False
+    raw_content = (api_response['choices'][0].get('message') or {}).get('content') or ""
+    if not raw_content.strip():
+        return False
+    schema = ROUTE_SCHEMAS.get(cache_route)
+    if schema is None:
+        return True
+    try:
+        parse_llm_json(raw_content, schema)
+    except LLMParseError:
+        return False
+    return True
+
+def session_client_id():
+    # A random per-session ID: scopes job deduplication and gives each browser its own scheduler queue.
+    if 'client_id' not in session:
+        session['client_id'] = uuid.uuid4().hex
+    return session['client_id']
+
+def plan_translation(english_content, language):
+    return TranslationPlan(english_content.get('linkedin_post_en'), english_content.get('blog_article_en'),
+                           english_content.get('blog_link_tag_en'), language=language,
+                           max_chunk_chars=TRANSLATION_CHUNK_CHARS)
+
+def fetch_translations(plans, refresh=False, client_id=None):
+    # Every language's post and article sections are separate requests, all sent at
+    # once, so the wait is about as long as the slowest language rather than the sum.
+    pending = [[llm_executor.submit(telemetry.bind(call_openrouter_api), prompt_messages_translation, TRANSLATION_MODEL,
+                                    cache_route="translation", refresh=refresh, client_id=client_id)
+                for prompt_messages_translation in plan.requests]
+               for plan in plans.values()]
+    return [[future.result() for future in futures] for futures in pending]
+
+def prewarm_translation(generated_content_en):
+    # Fire-and-forget: translate the freshly generated English content in the
+    # background so that a later "Translate" click is a cache hit.
+    if not PREWARM_TRANSLATION or response_cache is None or "translation" not in LLM_CACHE_ROUTES:
+        return None
+    return [batch_executor.submit(call_openrouter_api, prompt_messages_translation,
+                                  TRANSLATION_MODEL, cache_route="translation", priority="batch")
+            for language in TRANSLATION_LANGUAGES
+            for prompt_messages_translation in plan_translation(generated_content_en, language).requests]
+
+def requested_languages(values):
+    # Languages picked on the page, limited to the configured ones (all of them when none are picked).
+    languages = [code for code in parse_language_list(values, default=()) if code in TRANSLATION_LANGUAGES]
+    return languages or TRANSLATION_LANGUAGES
+
+def load_translations():
+    # Session translations, keyed by language code, in TRANSLATION_LANGUAGES order.
+    return load_session_artifact('translations') or {}
+
+# --- Streaming ---
+# With STREAM_RESPONSES on, /generate_content and /translate_content render the
+# page immediately and the browser reads tokens from a Server-Sent Events endpoint.
+STREAM_RESPONSES = os.getenv("STREAM_RESPONSES", "true").lower() in ("1", "true", "yes")
+
+def stream_openrouter_api(prompt_messages, model_to_use=DEEPSEEK_MODEL, client_id=None, cache_route=None):
+    # Yields text deltas; errors are raised to the caller so it can report them on the stream.
+    import requests
+    if not OPENROUTER_API_KEY:
+        raise requests.exceptions.RequestException("OpenRouter API key not found.")
+    with telemetry.span("upstream", route=cache_route, model=model_to_use, stream=True):
+        yield from get_openrouter_client().stream_chat_completion(
+            prompt_messages, model_to_use, client_id=client_id,
+            on_usage=lambda usage: telemetry.record_usage(cache_route, model_to_use, usage))
+
+def sse_event(event_name, payload):
+    return f"event: {event_name}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+def sse_response(event_stream):
+    return Response(event_stream, mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+def store_streamed_response(prompt_messages, model_to_use, cache_route, raw_content):
+    # Keep streamed results consistent with the non-streaming path's cache.
+    if response_cache is not None and cache_route in LLM_CACHE_ROUTES:
+        response_cache.set(make_cache_key(model_to_use, prompt_messages),
+                           {"choices": [{"message": {"role": "assistant", "content": raw_content}}]})
+
+def invalidate_cached_response(prompt_messages, model_to_use):
+    # Called when a (possibly cached) response could not be parsed, so the next click retries upstream.
+    if response_cache is not None:
+        response_cache.delete(make_cache_key(model_to_use, prompt_messages))
+
+# --- Result Helpers ---
+# Turning model responses into results is shared by the inline routes and the
+# background jobs. Messages for the user are returned as (message, category)
+# "notices" rather than flashed, because jobs run outside any request.
+def finish_content_generation(selected_idea, current_topic_detail, prompt_messages_generation, api_response_generation):
+    generated_content_en = default_generated_content(selected_idea, current_topic_detail, YOUR_BLOG_DOMAIN)
+    notices = slug_collision_notices(selected_idea)
+    raw_content_str_cg = "" 
+
+    if api_response_generation and api_response_generation.get('choices'):
+        try:
+            raw_content_str_cg = api_response_generation['choices'][0]['message']['content'].strip()
+            with telemetry.span("parse", route="content"):
+                parse_result_cg = parse_llm_json(raw_content_str_cg, CONTENT_SCHEMA)
+            if parse_result_cg.repaired:
+                notices.append(("Warning: AI response for content generation was not valid JSON and had to be repaired.", "warning"))
+            parsed_content_cg = parse_result_cg.data
+
+            apply_generated_fields(generated_content_en, parsed_content_cg)
+
+            if "Error:" not in generated_content_en["linkedin_post_en"] and "Error:" not in generated_content_en["blog_article_en"]:
+                prewarm_translation(generated_content_en)
+
+        except (LLMParseError, KeyError, TypeError) as e_cg_parser: # Renamed
+            snippet_cg = raw_content_str_cg[:200] if raw_content_str_cg else "N/A"
+            notices.append((f"Error processing AI response for content generation: {type(e_cg_parser).__name__} - {str(e_cg_parser)}. Snippet: '{snippet_cg}...'", "error"))
+            print(f"Full Raw AI Response (Content Generation) causing processing error:\n{raw_content_str_cg if raw_content_str_cg else 'N/A'}")
+            invalidate_cached_response(prompt_messages_generation, CONTENT_MODEL)
+   
+    else: 
+        error_message = "Failed to receive a valid response from the AI for generating content."
+        if api_response_generation and 'error' in api_response_generation: 
+            api_err_cg = api_response_generation['error'] # Renamed
+            error_message += f" API Error ({api_err_cg.get('type', 'Unknown')}): {api_err_cg.get('message', 'No details')}"
+        elif not api_response_generation:
+            error_message += " No response was received from the API for content generation."
+        notices.append((error_message, "error"))
+
+    return generated_content_en, notices
+
+def save_generated_content(generated_content_en, notices, selected_idea):
+    # Records successful content and links it to its idea; returns the artifact ID (None on failure).
+    generation_failed = any(category == "error" for _, category in notices)
+    content_artifact_id = None if generation_failed else record_artifact("content", generated_content_en)
+    link_idea_content(selected_idea, content_artifact_id)
+    return content_artifact_id
+
+def render_generated_content(generated_content_en, notices, selected_idea):
+    for message, category in notices:
+        flash(message, category)
+
+    debug_log.debug_payload("generated_content_en before setting session in /generate_content", generated_content_en)
+
+    save_session_artifact('last_generated_content', generated_content_en)
+    drop_session_artifact('translations') 
+    content_artifact_id = save_generated_content(generated_content_en, notices, selected_idea)
+
+    return render_page('content.html', **generated_content_en, translations={},
+                           content_artifact_id=content_artifact_id)
+
+def finish_translations(english_content, plans, api_responses_by_language):
+    # Returns the translations (placeholders for failed languages), the failed language codes and notices.
+    translations = {}
+    failed_languages = []
+    notices = []
+    content_artifact_id = artifact_id_for("content", english_content)
+
+    for (code, plan), api_responses_translation in zip(plans.items(), api_responses_by_language):
+        language_name = LANGUAGES[code]["name"]
+        translated_data = default_translated_content(YOUR_BLOG_DOMAIN, code)
+        try:
+            with telemetry.span("parse", route="translation", language=code):
+                parse_result_tr = plan.assemble(api_responses_translation)
+            if parse_result_tr.repaired:
+                notices.append((f"Warning: AI response for the {language_name} translation was not valid JSON and had to be repaired.", "warning"))
+            apply_translated_fields(translated_data, parse_result_tr.data, english_content, YOUR_BLOG_DOMAIN)
+            record_artifact("translation", translated_data, parent_id=content_artifact_id)
+
+        except ChunkedTranslationError as e_tr_parser:
+            # Sections that did translate stay cached, so retrying only redoes the failed ones.
+            notices.append((f"Error processing AI response for the {language_name} translation: {e_tr_parser} Retry to translate only the failed parts.", "error"))
+            failed_languages.append(code)
+            for index in e_tr_parser.failed_indexes:
+                invalidate_cached_response(plan.requests[index], TRANSLATION_MODEL)
+        translations[code] = translated_data
+
+    return translations, failed_languages, notices
+
+def render_translations(english_content, new_translations, failed_languages, notices):
+    for message, category in notices:
+        flash(message, category)
+    translations = {**load_translations(), **new_translations}
+    save_session_artifact('translations', translations)
+    return render_page('content.html', **english_content, translations=translations,
+                           failed_languages=failed_languages,
+                           content_artifact_id=artifact_id_for("content", english_content))
+
+# --- Background Jobs ---
+# With JOB_QUEUE_ENABLED, /generate_content and /translate_content enqueue a job
+# and redirect to /jobs/<id>, which shows progress and then the finished page.
+# The web worker is free as soon as the job is queued, and a closed browser tab
+# does not throw away a generation that is already paid for: jobs record their
+# results in the artifact store themselves, and /jobs/<id> only displays them.
+job_queue = job_queue_from_env(content_store)
+JOB_EVENTS_POLL_SECONDS = 0.5
+JOB_EVENTS_TIMEOUT_SECONDS = 600
+
+def run_content_job(selected_idea, current_topic_detail, refresh, client_id):
+    generated_content_en = default_generated_content(selected_idea, current_topic_detail, YOUR_BLOG_DOMAIN)
+    prompt_messages_generation = build_content_messages(selected_idea, generated_content_en["full_blog_url_en"],
+                                                        generated_content_en["blog_link_tag_en"])
+    api_response_generation = call_openrouter_api(prompt_messages_generation, CONTENT_MODEL,
+                                                  cache_route="content", refresh=refresh, client_id=client_id)
+    generated_content_en, notices = finish_content_generation(selected_idea, current_topic_detail,
+                                                              prompt_messages_generation, api_response_generation)
+    content_artifact_id = save_generated_content(generated_content_en, notices, selected_idea)
+    return {"generated_content_en": generated_content_en, "notices": notices, "idea": selected_idea,
+            "content_artifact_id": content_artifact_id}
+
+def run_translation_job(english_content, languages, refresh, client_id):
+    plans = {code: plan_translation(english_content, code) for code in languages}
+    api_responses_by_language = fetch_translations(plans, refresh, client_id)
+    translations, failed_languages, notices = finish_translations(english_content, plans, api_responses_by_language)
+    return {"english_content": english_content, "translations": translations,
+            "failed_languages": failed_languages, "notices": notices}
+
+def enqueue_job(kind, dedup_payload, fn, *args):
+    # Identical submissions from the same browser session while a job is in flight share that job.
+    dedup_key = hashlib.sha256(json.dumps([kind, session_client_id(), dedup_payload], sort_keys=True).encode("utf-8")).hexdigest()
+    job_id = job_queue.submit(kind, dedup_key, fn, *args)
+    if request.accept_mimetypes.best == "application/json":
+        return jsonify({"job_id": job_id, "status_url": url_for('job_status', job_id=job_id)}), 202
+    return redirect(url_for('view_job', job_id=job_id), code=303)
+
+def job_english_content(job_id):
+    # The English article of a finished job (content or translation), for translating from its page.
+    job = job_queue.get(job_id) if job_queue and job_id else None
+    if not job or job["status"] != JOB_DONE:
+        return None
+    result = job["result"]
+    return result["generated_content_en"] if job["kind"] == "content" else result["english_content"]
+
+def job_summary(job):
+    return {key: job[key] for key in ("id", "kind", "status", "created_at", "started_at", "finished_at", "error")}
+
+def render_page(template_name, **context):
+    with telemetry.span("render", template=template_name):
+        return render_template(template_name, **context)
+
+def start_request_trace():
+    g.trace, g.trace_token = telemetry.start_trace(request.endpoint or "unknown")
+
+def record_response_status(response):
+    g.response_status = response.status_code
+    return response
+
+def finish_request_trace(error=None):
+    # Runs after the session has been saved, so session_write is part of the trace.
+    if 'trace' in g:
+        telemetry.finish_trace(g.trace, g.trace_token, g.get('response_status', 500))
+
+def inject_feature_flags():
+    return {"stream_responses": STREAM_RESPONSES, "languages": LANGUAGES, "blog_domain": YOUR_BLOG_DOMAIN,
+            "translation_languages": TRANSLATION_LANGUAGES}
 
 # --- Routes ---
-@app.route('/', methods=['GET'])
+# Views are collected here and registered on the app by create_app().
+ROUTES = []
+
+def route(rule, **options):
+    def register(view):
+        ROUTES.append((rule, view, options))
+        return view
+    return register
+
+@route('/', methods=['GET'])
 def index():
     # These pops are fine, as Flask-Session handles the actual data storage
-    session.pop('last_generated_content', None)
-    session.pop('translated_content', None)
-    return render_template('index.html', topics=TOPICS_DATA['topics'])
+    drop_session_artifact('last_generated_content')
+    drop_session_artifact('translations')
+    query = request.args.get('q', '').strip()
+    category = request.args.get('category', '').strip()
+    page = max(1, request.args.get('page', 1, type=int))
+    total_topics, topics = topic_catalog.search(query, category, offset=(page - 1) * TOPICS_PAGE_SIZE,
+                                                limit=TOPICS_PAGE_SIZE)
+    pages = max(1, -(-total_topics // TOPICS_PAGE_SIZE))
+    return render_page('index.html', topics=topics, total_topics=total_topics, page=page, pages=pages,
+                       query=query, category=category, categories=topic_catalog.categories())
 
-@app.route('/generate_ideas', methods=['POST'])
+@route('/generate_ideas', methods=['POST'])
 def generate_ideas():
-    selected_topic_title = request.form.get('topic_title')
+    selected_topic_id = request.form.get('topic_id')
+    selected_topic_title = request.form.get('topic_title')  # older pages and permalinks post the title
+    regenerate = request.form.get('regenerate') == '1'
     
-    if not selected_topic_title:
+    if not selected_topic_id and not selected_topic_title:
         flash("Please select a topic.", "warning")
         return redirect(url_for('index'))
 
-    selected_topic_detail = next((t for t in TOPICS_DATA['topics'] if t['title'] == selected_topic_title), None)
+    selected_topic_detail = topic_catalog.get(selected_topic_id) if selected_topic_id else None
+    if selected_topic_detail is None and selected_topic_title:
+        selected_topic_detail = topic_catalog.get_by_title(selected_topic_title)
     if not selected_topic_detail:
         flash("Topic not found.", "error")
         return redirect(url_for('index'))
 
     session['current_topic_detail'] = selected_topic_detail
     
-    prompt_messages = [
-        {"role": "system", "content": "You are an AI assistant that generates creative content ideas."},
-        {"role": "user", "content": f"""
-        Generate 5 distinct LinkedIn post ideas based on the topic: "{selected_topic_detail['title']}".
-        For each idea, provide:
-        1. A catchy `title` for the potential LinkedIn post.
-        2. A brief `summary` (1-2 sentences) of what the post would cover.
-        3. A suggested URL `slug` (3-5 words, lowercase, hyphenated) for a blog post related to this idea.
-        
-        Format your response as a valid JSON list of objects. Each object must have 'title', 'summary', and 'slug' keys.
-        Ensure all strings within the JSON are properly escaped, especially for newlines (use \\n), tabs (use \\t), and quotes (use \\"). Avoid any raw control characters within string values.
-        
-        Example:
-        [
-          {{"title": "Unlocking Password Power", "summary": "Discover why strong passwords are your first line of defense against online threats. We'll cover simple steps.", "slug": "unlocking-password-power"}},
-          {{"title": "Password Myths Debunked", "summary": "Are long passwords always better? We bust common password security myths for you.", "slug": "password-myths-debunked"}}
-        ]
-        
-        Your entire response should be ONLY the JSON list, with no other text, explanations, or markdown formatting (like ```json) surrounding it.
-        """}
-    ]
+    prompt_messages = build_ideas_messages(selected_topic_detail['title'])
 
-    api_response = call_openrouter_api(prompt_messages, model_to_use=DEEPSEEK_MODEL)
+    api_response = call_openrouter_api(prompt_messages, model_to_use=IDEAS_MODEL, cache_route="ideas",
+                                       refresh=regenerate, client_id=session_client_id())
     
     linkedin_ideas = [] 
+    ideas_artifact_id = None
+    notes = []
     error_message_for_flash = None
     raw_content_str = "" 
 
     if api_response and api_response.get('choices'):
         try:
             raw_content_str = api_response['choices'][0]['message']['content'].strip()
-            json_payload_str = raw_content_str
-            if json_payload_str.startswith("```json") and json_payload_str.endswith("```"):
-                json_payload_str = json_payload_str[len("```json"):-len("```")].strip()
-            elif json_payload_str.startswith("```") and json_payload_str.endswith("```"):
-                json_payload_str = json_payload_str[len("```"):-len("```")].strip()
-            
-            if not (json_payload_str.startswith('[') and json_payload_str.endswith(']')):
-                list_start_index = json_payload_str.find('[')
-                list_end_index = json_payload_str.rfind(']')
-                if list_start_index != -1 and list_end_index != -1 and list_end_index > list_start_index:
-                    json_payload_str = json_payload_str[list_start_index : list_end_index + 1]
-                else:
-                    raise ValueError("Response does not appear to contain a valid JSON list structure for ideas.")
+            with telemetry.span("parse", route="ideas"):
+                parse_result = parse_llm_json(raw_content_str, IDEAS_SCHEMA)
+            if parse_result.repaired:
+                flash("Warning: AI response for ideas was not valid JSON and had to be repaired.", "warning")
+            linkedin_ideas = parse_result.data
 
-            try:
-                parsed_data = json.loads(json_payload_str)
-            except json.JSONDecodeError as je: # Renamed to avoid conflict
-                print(f"Strict JSON parsing failed for ideas: {je}. Raw snippet being tried with strict=False: '{json_payload_str[:200]}...'")
-                try:
-                    parsed_data = json.loads(json_payload_str, strict=False)
-                    flash("Warning: AI response for ideas contained non-standard characters. Parsed using a more lenient mode.", "warning")
-                except json.JSONDecodeError as je_fallback:
-                    print(f"Lenient JSON parsing (strict=False) also failed for ideas: {je_fallback}")
-                    raise je_fallback
-
-            if not isinstance(parsed_data, list):
-                raise ValueError("Parsed data for ideas is not a list as expected.")
-            
-            valid_ideas_count = 0
-            for item in parsed_data:
-                if isinstance(item, dict) and 'title' in item and 'summary' in item and 'slug' in item:
-                    linkedin_ideas.append(item)
-                    valid_ideas_count +=1
-                else:
-                    print(f"Warning: Skipping an invalid item in ideas list: {item}")
-            
-            if not linkedin_ideas:
-                 raise ValueError("No valid ideas found in the parsed AI response, or the list was empty.")
-            
-            print(f"Successfully parsed {valid_ideas_count} ideas.")
-            session['generated_linkedin_ideas'] = linkedin_ideas
+            print(f"Successfully parsed {len(linkedin_ideas)} ideas.")
+            save_session_artifact('generated_linkedin_ideas', linkedin_ideas)
+            ideas_artifact_id = record_artifact("ideas", {"topic": selected_topic_detail, "ideas": linkedin_ideas})
+            notes = idea_notes(linkedin_ideas)
+            index_ideas(linkedin_ideas, ideas_artifact_id)
 
-        except (json.JSONDecodeError, ValueError, KeyError) as e_parser: # Renamed to avoid conflict
+        except (LLMParseError, KeyError, TypeError) as e_parser: # Renamed to avoid conflict
             snippet = raw_content_str[:200] if raw_content_str else "N/A"
             error_message_for_flash = f"Error processing AI response for ideas: {type(e_parser).__name__} - {str(e_parser)}. Snippet: '{snippet}...'"
             print(f"Full Raw AI Response (for Ideas) causing processing error:\n{raw_content_str if raw_content_str else 'N/A'}")
-            session.pop('generated_linkedin_ideas', None) 
+            drop_session_artifact('generated_linkedin_ideas')
             linkedin_ideas = [] 
+            invalidate_cached_response(prompt_messages, IDEAS_MODEL)
     
     else: 
         error_message_for_flash = "Failed to receive a valid response from the AI for generating ideas."
@@ -203,21 +620,24 @@ def generate_ideas():
         elif not api_response:
             error_message_for_flash += " No response was received from the API."
         
-        session.pop('generated_linkedin_ideas', None) 
+        drop_session_artifact('generated_linkedin_ideas')
         linkedin_ideas = []
 
     if error_message_for_flash:
         flash(error_message_for_flash, "error")
         
-    return render_template('ideas.html',
+    return render_page('ideas.html',
                            topic_title=selected_topic_detail.get('title', "N/A"),
-                           ideas=linkedin_ideas)
+                           topic_id=selected_topic_detail.get('id'),
+                           ideas=linkedin_ideas,
+                           idea_notes=notes,
+                           ideas_artifact_id=ideas_artifact_id)
 
 
-@app.route('/generate_content', methods=['POST'])
+@route('/generate_content', methods=['POST'])
 def generate_content():
     selected_idea_index_str = request.form.get('selected_idea_index')
-    generated_ideas = session.get('generated_linkedin_ideas')
+    generated_ideas = load_session_artifact('generated_linkedin_ideas')
     current_topic_detail = session.get('current_topic_detail')
 
     if selected_idea_index_str is None or not generated_ideas or not current_topic_detail:
@@ -234,134 +654,41 @@ def generate_content():
         flash(f"Invalid idea selected: {e_index}. Please try generating ideas again.", "error")
         return redirect(url_for('index')) 
 
-    blog_link_tag_en = selected_idea.get('slug', 'my-default-blog-post')
-    full_blog_url_en = f"https://{YOUR_BLOG_DOMAIN}/{blog_link_tag_en}"
-
-    prompt_messages_generation = [
-       {"role": "system", "content": "VERY IMPORTANT: Your entire response MUST be a single, valid JSON object and NOTHING ELSE. Do not include any commentary, notes, explanations, or any text whatsoever before or after the JSON object. Adhere strictly to JSON syntax. The JSON object must contain exactly two keys: 'linkedin_post' and 'blog_article'."},
-       {"role": "user", "content": f"""
-       Generate content based on the topic: "{selected_idea['title']}" (summary: "{selected_idea['summary']}").
-       The blog post should link to: {full_blog_url_en} with slug: {blog_link_tag_en}.
-    
-       Output a single JSON object with two keys:
-       1. `linkedin_post`: A concise LinkedIn post for the topic, including the link {full_blog_url_en}.
-       2. `blog_article`: A detailed Markdown blog article (approx. 1000 words) for the topic. This must be the full article, not a note.
-    
-       JSON Example:
-       {{
-         "linkedin_post": "Example LinkedIn post... Read more: {full_blog_url_en}",
-         "blog_article": "# Example Title\\n\\nFull Markdown article content..."
-       }}
-    
-       Reminder: ONLY the JSON object. No extra text, no ```json wrappers, just the raw JSON starting with {{ and ending with }}.
-       Ensure all string values inside the JSON are correctly escaped (newlines as \\n, quotes as \\", etc.).
-       """}
-    ]
-    
-    api_response_generation = call_openrouter_api(prompt_messages_generation, model_to_use=DEEPSEEK_MODEL)
-    
-    generated_content_en = {
-        "linkedin_post_en": "Error: Could not generate English LinkedIn post.",
-        "blog_article_en": "Error: Could not generate English blog article.",
-        "blog_link_tag_en": blog_link_tag_en,
-        "full_blog_url_en": full_blog_url_en,
-        "idea_title": selected_idea.get('title', "N/A"),
-        "topic_title": current_topic_detail.get('title', "N/A")
-    }
-    error_message_for_flash = None
-    raw_content_str_cg = "" 
-
-    if api_response_generation and api_response_generation.get('choices'):
-        try:
-            raw_content_str_cg = api_response_generation['choices'][0]['message']['content'].strip()
-            json_payload_str_cg = raw_content_str_cg
-            if json_payload_str_cg.startswith("```json") and json_payload_str_cg.endswith("```"):
-                json_payload_str_cg = json_payload_str_cg[len("```json"):-len("```")].strip()
-            elif json_payload_str_cg.startswith("```") and json_payload_str_cg.endswith("```"):
-                json_payload_str_cg = json_payload_str_cg[len("```"):-len("```")].strip()
-
-            if not (json_payload_str_cg.startswith('{') and json_payload_str_cg.endswith('}')):
-                obj_start_index = json_payload_str_cg.find('{')
-                obj_end_index = json_payload_str_cg.rfind('}')
-                if obj_start_index != -1 and obj_end_index != -1 and obj_end_index > obj_start_index:
-                    json_payload_str_cg = json_payload_str_cg[obj_start_index : obj_end_index + 1]
-                else:
-                    raise ValueError("Response does not appear to contain a valid JSON object structure for content generation.")
-
-            parsed_content_cg = None
-            try:
-                parsed_content_cg = json.loads(json_payload_str_cg) 
-            except json.JSONDecodeError as je_cg:
-                print(f"Strict JSON parsing failed for content generation: {je_cg}. Raw snippet trying with strict=False: '{json_payload_str_cg[:200]}...'")
-                try:
-                    parsed_content_cg = json.loads(json_payload_str_cg, strict=False)
-                    flash("Warning: AI response for content generation contained non-standard characters. Parsed leniently.", "warning")
-                except json.JSONDecodeError as je_fallback_cg:
-                    print(f"Lenient JSON parsing (strict=False) also failed for content generation: {je_fallback_cg}")
-                    raise je_fallback_cg
-
-            if not isinstance(parsed_content_cg, dict):
-                raise ValueError("Parsed content for generation is not a dictionary as expected.")
-
-            generated_content_en["linkedin_post_en"] = parsed_content_cg.get("linkedin_post", generated_content_en["linkedin_post_en"])
-            generated_content_en["blog_article_en"] = parsed_content_cg.get("blog_article", generated_content_en["blog_article_en"])
-            
-            if len(generated_content_en["blog_article_en"]) < 200 and \
-               ("note:" in generated_content_en["blog_article_en"].lower() or \
-                "summary." in generated_content_en["blog_article_en"].lower() or \
-                "truncated" in generated_content_en["blog_article_en"].lower()):
-                print(f"Warning: Retrieved blog_article (key 'blog_article') from AI seems to be a short note/summary, not the full content. Content snippet: '{generated_content_en['blog_article_en'][:150]}...'")
-
-            if "Error:" not in generated_content_en["linkedin_post_en"] and full_blog_url_en not in generated_content_en["linkedin_post_en"]:
-                 generated_content_en["linkedin_post_en"] += f"\n\nRead more: {full_blog_url_en}"
-
-        except (json.JSONDecodeError, ValueError, KeyError) as e_cg_parser: # Renamed
-            snippet_cg = raw_content_str_cg[:200] if raw_content_str_cg else "N/A"
-            error_message_for_flash = f"Error processing AI response for content generation: {type(e_cg_parser).__name__} - {str(e_cg_parser)}. Snippet: '{snippet_cg}...'"
-            print(f"Full Raw AI Response (Content Generation) causing processing error:\n{raw_content_str_cg if raw_content_str_cg else 'N/A'}")
-   
-    else: 
-        error_message_for_flash = "Failed to receive a valid response from the AI for generating content."
-        if api_response_generation and 'error' in api_response_generation: 
-            api_err_cg = api_response_generation['error'] # Renamed
-            error_message_for_flash += f" API Error ({api_err_cg.get('type', 'Unknown')}): {api_err_cg.get('message', 'No details')}"
-        elif not api_response_generation:
-            error_message_for_flash += " No response was received from the API for content generation."
-
-    if error_message_for_flash:
-        flash(error_message_for_flash, "error")
+    generated_content_en = default_generated_content(selected_idea, current_topic_detail, YOUR_BLOG_DOMAIN)
+    blog_link_tag_en = generated_content_en["blog_link_tag_en"]
+    full_blog_url_en = generated_content_en["full_blog_url_en"]
+    regenerate = request.form.get('regenerate') == '1'
 
-    # DEBUGGING PRINT: Check what's being stored in session
-    print("--- DEBUG: generated_content_en before setting session in /generate_content ---")
-    try:
-        # ensure_ascii=False helps if your content has non-ASCII characters that you want to see directly
-        print(json.dumps(generated_content_en, indent=2, ensure_ascii=False)) 
-    except TypeError as te: # Catch error if generated_content_en is not serializable (should not happen here)
-        print(f"Could not serialize generated_content_en for debug printing: {te}")
-        print(f"Raw generated_content_en: {generated_content_en}")
-    print("--- END DEBUG /generate_content (before session set) ---")
+    if STREAM_RESPONSES and request.form.get('stream') == '1':
+        # Render the page shell right away; the browser pulls tokens from /generate_content/stream.
+        drop_session_artifact('translations')
+        return render_page('content.html', **{**generated_content_en, "linkedin_post_en": "", "blog_article_en": ""},
+                               translations={}, streaming="content")
 
-    session['last_generated_content'] = generated_content_en
-    session.pop('translated_content', None) 
+    if job_queue is not None:
+        return enqueue_job("content", {"idea": selected_idea, "topic": current_topic_detail, "regenerate": regenerate},
+                           run_content_job, selected_idea, current_topic_detail, regenerate, session_client_id())
 
-    return render_template('content.html', **generated_content_en, translated_content=None)
+    prompt_messages_generation = build_content_messages(selected_idea, full_blog_url_en, blog_link_tag_en)
+    
+    api_response_generation = call_openrouter_api(prompt_messages_generation, model_to_use=CONTENT_MODEL,
+                                                  cache_route="content", refresh=regenerate,
+                                                  client_id=session_client_id())
+    generated_content_en, notices = finish_content_generation(selected_idea, current_topic_detail,
+                                                              prompt_messages_generation, api_response_generation)
+    return render_generated_content(generated_content_en, notices, selected_idea)
 
 
-@app.route('/translate_content', methods=['POST'])
+@route('/translate_content', methods=['POST'])
 def translate_content():
-    # DEBUGGING PRINT: Check if route is hit and what session contains
-    print("--- DEBUG: Entered /translate_content route ---")
-    english_content_from_session = session.get('last_generated_content')
-    print("--- DEBUG: english_content_from_session in /translate_content ---")
-    if english_content_from_session:
-        try:
-            print(json.dumps(english_content_from_session, indent=2, ensure_ascii=False))
-        except TypeError as te_trans: # Renamed
-            print(f"Could not serialize english_content_from_session for debug printing in translate: {te_trans}")
-            print(f"Raw english_content_from_session in translate: {english_content_from_session}")
-    else:
-        print("english_content_from_session is None or empty.")
-    print("--- END DEBUG /translate_content (after session get) ---")
+    english_content_from_session = load_session_artifact('last_generated_content')
+    job_content = job_english_content(request.form.get('job_id'))
+    if job_content and job_content != english_content_from_session:
+        # Translating from a job's page: that job's article becomes the session's.
+        english_content_from_session = job_content
+        save_session_artifact('last_generated_content', english_content_from_session)
+        drop_session_artifact('translations')
+    debug_log.debug_payload("english_content_from_session in /translate_content", english_content_from_session)
 
     if not english_content_from_session: 
         flash("No content to translate. Please generate content first (session data missing).", "warning")
@@ -380,120 +707,403 @@ def translate_content():
         print("Redirecting to index from /translate_content because essential keys are missing or contain errors in english_content_from_session.")
         return redirect(url_for('index')) 
             
-    prompt_messages_translation = [
-        {"role": "system", "content": "You are an expert translator. Translate the provided texts from English to French. Maintain the original markdown formatting for the blog article. For the 'blog_link_tag', translate it into a suitable French slug (lowercase, hyphenated, 3-5 words). Output your response as a single JSON object with keys: 'linkedin_post_fr', 'blog_article_fr', and 'blog_link_tag_fr'."},
-        {"role": "user", "content": f"""
-        Please translate the following English content to French.
-
-        LinkedIn Post (English):
-        ---
-        {linkedin_post_en}
-        ---
-
-        Blog Article (English - Markdown):
-        ---
-        {blog_article_en}
-        ---
-
-        Blog Link Tag (English Slug):
-        ---
-        {blog_link_tag_en}
-        ---
-
-        Return a JSON object with 'linkedin_post_fr', 'blog_article_fr', and 'blog_link_tag_fr'.
-        Example JSON structure:
-        {{
-          "linkedin_post_fr": "Ceci est la version française...",
-          "blog_article_fr": "# Titre de l'article en français\\n\\nContenu en markdown...",
-          "blog_link_tag_fr": "mon-article-en-francais"
-        }}
-        """}
-    ]
-
-    api_response_translation = call_openrouter_api(prompt_messages_translation, model_to_use=TRANSLATION_MODEL)
-    
-    translated_data = {
-        "linkedin_post_fr": "Error: Could not translate LinkedIn post.",
-        "blog_article_fr": "Error: Could not translate blog article.",
-        "blog_link_tag_fr": "erreur-slug",
-        "full_blog_url_fr": f"https://{YOUR_BLOG_DOMAIN}/erreur-slug" 
-    }
-    error_message_for_flash = None
-    raw_content_str_fr = "" 
+    regenerate = request.form.get('regenerate') == '1'
+    languages = requested_languages(request.form.getlist('language'))
+    if STREAM_RESPONSES and request.form.get('stream') == '1':
+        # Same idea as /generate_content: render now, stream the translations in.
+        streaming_placeholders = {code: {**default_translated_content(YOUR_BLOG_DOMAIN, code), "linkedin_post": "", "blog_article": ""}
+                                  for code in languages}
+        return render_page('content.html', **english_content_from_session,
+                               translations={**load_translations(), **streaming_placeholders},
+                               streaming="translation", streaming_languages=languages, regenerate=regenerate)
+
+    if job_queue is not None:
+        return enqueue_job("translation", {"content": artifact_id_for("content", english_content_from_session),
+                                           "languages": languages, "regenerate": regenerate},
+                           run_translation_job, english_content_from_session, languages, regenerate,
+                           session_client_id())
+
+    plans = {code: plan_translation(english_content_from_session, code) for code in languages}
+    api_responses_by_language = fetch_translations(plans, regenerate, session_client_id())
+    translations, failed_languages, notices = finish_translations(english_content_from_session, plans,
+                                                                  api_responses_by_language)
+    return render_translations(english_content_from_session, translations, failed_languages, notices)
+
 
-    if api_response_translation and api_response_translation.get('choices'):
+# --- Streaming Routes ---
+@route('/generate_content/stream', methods=['GET'])
+def stream_content():
+    selected_idea = session.get('current_selected_idea')
+    current_topic_detail = session.get('current_topic_detail')
+    if not selected_idea or not current_topic_detail:
+        return sse_response([sse_event("failed", {"message": "Session expired. Please start over by selecting a topic."})])
+
+    generated_content_en = default_generated_content(selected_idea, current_topic_detail, YOUR_BLOG_DOMAIN)
+    prompt_messages_generation = build_content_messages(selected_idea, generated_content_en["full_blog_url_en"],
+                                                        generated_content_en["blog_link_tag_en"])
+    client_id = session_client_id()
+    # The finished result is kept here for /generate_content/finalize, so only what
+    # this stream produced is ever saved; the session is written before streaming starts.
+    result_ref = uuid.uuid4().hex
+    session['content_stream_ref'] = result_ref
+
+    def event_stream():
+        import requests
+        parser = IncrementalJsonParser(CONTENT_SCHEMA)
         try:
-            raw_content_str_fr = api_response_translation['choices'][0]['message']['content'].strip()
-            json_payload_str_fr = raw_content_str_fr
-            if json_payload_str_fr.startswith("```json") and json_payload_str_fr.endswith("```"):
-                json_payload_str_fr = json_payload_str_fr[len("```json"):-len("```")].strip()
-            elif json_payload_str_fr.startswith("```") and json_payload_str_fr.endswith("```"):
-                json_payload_str_fr = json_payload_str_fr[len("```"):-len("```")].strip()
-            else: # Fallback if no markdown wrappers
-                json_start_fr = json_payload_str_fr.find('{')
-                json_end_fr = json_payload_str_fr.rfind('}') + 1
-                if json_start_fr != -1 and json_end_fr != 0 and json_end_fr > json_start_fr:
-                    json_payload_str_fr = json_payload_str_fr[json_start_fr:json_end_fr]
-                else:
-                    raise ValueError("Could not find valid JSON structure in AI response for translation.")
-
-            parsed_translation = None
+            for text in stream_openrouter_api(prompt_messages_generation, CONTENT_MODEL, client_id=client_id,
+                                              cache_route="content"):
+                for field, delta in parser.feed(text):
+                    yield sse_event("delta", {"field": field, "text": delta})
+        except (requests.exceptions.RequestException, ValueError) as e:
+            print(f"Streaming error during content generation: {e}")
+            yield sse_event("failed", {"message": f"Failed to receive a valid response from the AI for generating content: {e}"})
+            return
+
+        try:
+            with telemetry.span("parse", route="content"):
+                parse_result_cg = parser.close()
+        except LLMParseError as e_cg_parser:
+            print(f"Full Raw AI Response (Content Generation, streamed) causing processing error:\n{parser.raw_text}")
+            yield sse_event("failed", {"message": f"Error processing AI response for content generation: {e_cg_parser}"})
+            return
+
+        apply_generated_fields(generated_content_en, parse_result_cg.data)
+        store_streamed_response(prompt_messages_generation, CONTENT_MODEL, "content", parser.raw_text)
+        content_store.put({"generated_content_en": generated_content_en, "idea": selected_idea}, ref=result_ref)
+        prewarm_translation(generated_content_en)
+        yield sse_event("done", generated_content_en)
+
+    return sse_response(event_stream())
+
+
+@route('/generate_content/finalize', methods=['POST'])
+def finalize_streamed_content():
+    # A streaming response cannot update the session once it has started, so the
+    # page calls this before enabling translation. It saves the result the stream
+    # kept server-side; anything in the request body is ignored.
+    result_ref = session.pop('content_stream_ref', None)
+    streamed_result = content_store.get(result_ref) if result_ref else None
+    if not streamed_result:
+        return jsonify({"error": "No finished content to save. Please generate it again."}), 409
+    content_store.delete(result_ref)
+
+    generated_content_en = streamed_result["generated_content_en"]
+    save_session_artifact('last_generated_content', generated_content_en)
+    drop_session_artifact('translations')
+    content_artifact_id = record_artifact("content", generated_content_en)
+    link_idea_content(streamed_result["idea"], content_artifact_id)
+    return jsonify({"status": "ok", "content_artifact_id": content_artifact_id})
+
+
+@route('/translate_content/stream', methods=['GET'])
+def stream_translation():
+    english_content_from_session = load_session_artifact('last_generated_content')
+    if not english_content_from_session:
+        return sse_response([sse_event("failed", {"message": "No content to translate. Please generate content first (session data missing)."})])
+
+    languages = requested_languages(request.args.get('languages', ''))
+    plans = {code: plan_translation(english_content_from_session, code) for code in languages}
+    regenerate = request.args.get('regenerate') == '1'
+    client_id = session_client_id()
+    # Kept for /translate_content/finalize, like the content stream's result.
+    result_ref = uuid.uuid4().hex
+    session['translation_stream_ref'] = result_ref
+
+    def event_stream():
+        # Every request for every language starts at once. Languages are forwarded one
+        # after another; each one's sections in article order as soon as they (and
+        # everything before them) are done, and its post whenever it is ready.
+        futures = {code: [llm_executor.submit(call_openrouter_api, prompt_messages_translation, TRANSLATION_MODEL,
+                                              cache_route="translation", refresh=regenerate, client_id=client_id)
+                          for prompt_messages_translation in plan.requests]
+                   for code, plan in plans.items()}
+        translations = {}
+        errors = {}
+        for code, plan in plans.items():
+            post_future, chunk_futures = futures[code][0], futures[code][1:]
+            post_result = None
+            article_pieces = []
             try:
-                parsed_translation = json.loads(json_payload_str_fr)
-            except json.JSONDecodeError as je_fr:
-                print(f"Strict JSON parsing failed for translation: {je_fr}. Raw snippet trying with strict=False: '{json_payload_str_fr[:200]}...'")
-                try:
-                    parsed_translation = json.loads(json_payload_str_fr, strict=False)
-                    flash("Warning: AI response for translation contained non-standard characters. Parsed leniently.", "warning")
-                except json.JSONDecodeError as je_fallback_fr:
-                    print(f"Lenient JSON parsing (strict=False) also failed for translation: {je_fallback_fr}")
-                    raise je_fallback_fr
-
-            if not isinstance(parsed_translation, dict):
-                raise ValueError("Parsed translation data is not a dictionary as expected.")
-
-            translated_data["linkedin_post_fr"] = parsed_translation.get("linkedin_post_fr", translated_data["linkedin_post_fr"])
-            translated_data["blog_article_fr"] = parsed_translation.get("blog_article_fr", translated_data["blog_article_fr"])
-            translated_data["blog_link_tag_fr"] = parsed_translation.get("blog_link_tag_fr", translated_data["blog_link_tag_fr"])
-            
-            translated_data["full_blog_url_fr"] = f"https://{YOUR_BLOG_DOMAIN}/{translated_data['blog_link_tag_fr']}"
-            
-            if "Error:" not in translated_data["linkedin_post_fr"] and \
-               translated_data["full_blog_url_fr"] not in translated_data["linkedin_post_fr"]:
-                original_en_url = english_content_from_session.get('full_blog_url_en', '') 
-                if original_en_url and original_en_url in translated_data["linkedin_post_fr"]:
-                     translated_data["linkedin_post_fr"] = translated_data["linkedin_post_fr"].replace(original_en_url, translated_data["full_blog_url_fr"])
-                elif translated_data["full_blog_url_fr"] not in translated_data["linkedin_post_fr"]: 
-                     translated_data["linkedin_post_fr"] += f"\n\nLire la suite : {translated_data['full_blog_url_fr']}"
-
-        except (json.JSONDecodeError, ValueError, KeyError) as e_fr_parser: # Renamed
-            snippet_fr = raw_content_str_fr[:200] if raw_content_str_fr else "N/A"
-            error_message_for_flash = f"Error processing AI response for translation: {type(e_fr_parser).__name__} - {str(e_fr_parser)}. Snippet: '{snippet_fr}...'"
-            print(f"Full Raw AI Response (Translation) causing processing error:\n{raw_content_str_fr if raw_content_str_fr else 'N/A'}")
+                for piece in plan.iter_article(future.result() for future in chunk_futures):
+                    article_pieces.append(piece)
+                    yield sse_event("delta", {"language": code, "field": "blog_article", "text": piece})
+                    if post_result is None and post_future.done():
+                        post_result = plan.parse_post(post_future.result())
+                        yield sse_event("delta", {"language": code, "field": "linkedin_post", "text": post_result.data["linkedin_post"]})
+                if post_result is None:
+                    post_result = plan.parse_post(post_future.result())
+            except ChunkedTranslationError as e_tr_parser:
+                print(f"Streaming error during {LANGUAGES[code]['name']} translation: {e_tr_parser}")
+                for index in e_tr_parser.failed_indexes:
+                    invalidate_cached_response(plan.requests[index], TRANSLATION_MODEL)
+                errors[code] = f"Error processing AI response for the {LANGUAGES[code]['name']} translation: {e_tr_parser}"
+                continue
+
+            parsed_translation = {**post_result.data, "blog_article": "".join(article_pieces)}
+            translations[code] = apply_translated_fields(default_translated_content(YOUR_BLOG_DOMAIN, code), parsed_translation,
+                                                         english_content_from_session, YOUR_BLOG_DOMAIN)
+        if translations:
+            content_store.put({"english_content": english_content_from_session, "translations": translations}, ref=result_ref)
+        yield sse_event("done", {"translations": translations, "errors": errors})
+
+    return sse_response(event_stream())
+
+
+@route('/translate_content/finalize', methods=['POST'])
+def finalize_streamed_translation():
+    # Saves the translations the stream kept server-side; the request body is ignored.
+    english_content_from_session = load_session_artifact('last_generated_content')
+    result_ref = session.pop('translation_stream_ref', None)
+    streamed_result = content_store.get(result_ref) if result_ref else None
+    if not english_content_from_session:
+        return jsonify({"error": "Session expired."}), 400
+    if not streamed_result:
+        return jsonify({"error": "No finished translation to save. Please translate again."}), 409
+    content_store.delete(result_ref)
+    if streamed_result["english_content"] != english_content_from_session:
+        return jsonify({"error": "The content changed while it was being translated. Please translate again."}), 409
+
+    content_artifact_id = artifact_id_for("content", english_content_from_session)
+    for translated_data in streamed_result["translations"].values():
+        record_artifact("translation", translated_data, parent_id=content_artifact_id)
+    save_session_artifact('translations', {**load_translations(), **streamed_result["translations"]})
+    return jsonify({"status": "ok"})
+
+
+# --- Job Routes ---
+@route('/jobs/<job_id>', methods=['GET'])
+def view_job(job_id):
+    job = job_queue.get(job_id) if job_queue else None
+    if not job:
+        abort(404)
+    if job["status"] in (JOB_QUEUED, JOB_RUNNING):
+        return render_page('job.html', job=job)
+    if job["status"] == JOB_FAILED:
+        flash(f"The background {job['kind']} job failed: {job['error']}", "error")
+        return redirect(url_for('index'))
+
+    # Read-only: the job already recorded its results, so reloading this page
+    # changes nothing. The translate form names the job, and /translate_content
+    # takes the article from it (see job_english_content).
+    result = job["result"]
+    notices = [(category, message) for message, category in result["notices"]]
+    if job["kind"] == "content":
+        generated_content_en = result["generated_content_en"]
+        return render_page('content.html', **generated_content_en, translations={}, notices=notices,
+                           content_artifact_id=result.get("content_artifact_id"), job_id=job_id)
+    return render_page('content.html', **result["english_content"], translations=result["translations"],
+                       failed_languages=result["failed_languages"], notices=notices, job_id=job_id,
+                       content_artifact_id=artifact_id_for("content", result["english_content"]))
+
+
+@route('/jobs/<job_id>/status', methods=['GET'])
+def job_status(job_id):
+    job = job_queue.get(job_id) if job_queue else None
+    if not job:
+        return jsonify({"error": "Unknown job."}), 404
+    return jsonify({**job_summary(job), "result_url": url_for('view_job', job_id=job_id)})
+
+
+@route('/jobs/<job_id>/events', methods=['GET'])
+def job_events(job_id):
+    if not job_queue or not job_queue.get(job_id):
+        return sse_response([sse_event("failed", {"message": "Unknown job."})])
+
+    result_url = url_for('view_job', job_id=job_id)  # the generator runs after the request context is gone
+
+    def event_stream():
+        # Reports every status change, then "done" or "failed".
+        last_status = None
+        deadline = time.monotonic() + JOB_EVENTS_TIMEOUT_SECONDS
+        while time.monotonic() < deadline:
+            job = job_queue.get(job_id)
+            if job is None:
+                yield sse_event("failed", {"message": "The job expired."})
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                yield sse_event("status", job_summary(job))
+            if job["status"] in (JOB_DONE, JOB_FAILED):
+                yield sse_event("done" if job["status"] == JOB_DONE else "failed",
+                                {**job_summary(job), "result_url": result_url})
+                return
+            time.sleep(JOB_EVENTS_POLL_SECONDS)
+        yield sse_event("failed", {"message": "Timed out waiting for the job; reload the page to keep waiting."})
+
+    return sse_response(event_stream())
+
+
+@route('/jobs/stats', methods=['GET'])
+def job_stats():
+    if not job_queue:
+        abort(404)
+    return jsonify(job_queue.stats())
+
+
+# --- Topic Routes ---
+@route('/topics', methods=['GET'])
+def list_topics():
+    # ?q=<words>&category=<name>&offset=<n>&limit=<n>; "next" links to the following page.
+    query = request.args.get('q', '').strip()
+    category = request.args.get('category', '').strip()
+    offset = max(0, request.args.get('offset', 0, type=int))
+    limit = max(1, min(request.args.get('limit', TOPICS_PAGE_SIZE, type=int), MAX_PAGE_SIZE))
+    total_topics, topics = topic_catalog.search(query, category, offset=offset, limit=limit)
+    next_url = None
+    if offset + len(topics) < total_topics:
+        next_url = url_for('list_topics', q=query or None, category=category or None, offset=offset + limit, limit=limit)
+    return jsonify({"total": total_topics, "offset": offset, "limit": limit, "topics": topics, "next": next_url})
+
+@route('/topics/<topic_id>', methods=['GET'])
+def get_topic(topic_id):
+    topic = topic_catalog.get(topic_id)
+    if not topic:
+        return jsonify({"error": "Unknown topic."}), 404
+    return jsonify(topic)
+
+
+# --- Metrics Routes ---
+def component_stats():
+    # Every component's own counters, exported next to the request metrics.
+    client = get_openrouter_client()
+    stats = {"openrouter_client": client.stats(), "model_router": model_router.stats()}
+    optional = {"llm_scheduler": client.scheduler, "response_cache": response_cache, "content_store": content_store,
+                "artifact_store": artifact_store, "idea_index": idea_index, "job_queue": job_queue,
+                "single_flight": llm_single_flight, "static_assets": static_assets}
+    for name, component in optional.items():
+        if component is not None:
+            stats[name] = component.stats()
+    return stats
+
+@route('/metrics', methods=['GET'])
+def metrics():
+    if not telemetry.enabled:
+        abort(404)
+    return Response(telemetry.render(component_stats()), mimetype="text/plain; version=0.0.4")
+
+@route('/metrics/usage', methods=['GET'])
+def metrics_usage():
+    # Tokens and estimated cost per route, summed over models.
+    if not telemetry.enabled:
+        abort(404)
+    return jsonify(telemetry.usage_by_route())
+
+@route('/metrics/traces', methods=['GET'])
+def metrics_traces():
+    # The most recent sampled traces (TRACE_SAMPLE_RATE), newest last.
+    if not telemetry.enabled:
+        abort(404)
+    return jsonify(telemetry.recent_traces())
+
+
+# --- Stored Artifact Routes ---
+@route('/ideas/<artifact_id>', methods=['GET'])
+def view_ideas(artifact_id):
+    artifact = artifact_store.get(artifact_id, kind="ideas") if artifact_store else None
+    if not artifact:
+        abort(404)
+    # Put the stored list back in the session so "Select & Generate" works from here.
+    session['current_topic_detail'] = artifact["payload"]["topic"]
+    save_session_artifact('generated_linkedin_ideas', artifact["payload"]["ideas"])
+    return render_page('ideas.html',
+                           topic_title=artifact["payload"]["topic"].get('title', "N/A"),
+                           topic_id=artifact["payload"]["topic"].get('id'),
+                           ideas=artifact["payload"]["ideas"],
+                           idea_notes=idea_notes(artifact["payload"]["ideas"]),
+                           ideas_artifact_id=artifact_id)
+
+
+@route('/content/<artifact_id>', methods=['GET'])
+def view_content(artifact_id):
+    artifact = artifact_store.get(artifact_id, kind="content") if artifact_store else None
+    if not artifact:
+        abort(404)
+    english_content = artifact["payload"]
+    translations = {}
+    for translation in artifact_store.children(artifact_id, "translation"):  # newest first
+        translated_data = normalize_translation(translation["payload"])
+        translations.setdefault(translated_data["language"], translated_data)
+
+    # Re-seed the session so translating from this page works without regenerating.
+    save_session_artifact('last_generated_content', english_content)
+    if translations:
+        save_session_artifact('translations', translations)
     else:
-        error_message_for_flash = "Failed to get a valid response from AI for translation."
-        if api_response_translation and 'error' in api_response_translation:
-            api_err_tr = api_response_translation['error']
-            error_message_for_flash += f" API Error ({api_err_tr.get('type', 'Unknown')}): {api_err_tr.get('message', 'No details')}"
-        elif not api_response_translation:
-            error_message_for_flash += " No response was received from the API for translation."
+        drop_session_artifact('translations')
+    return render_page('content.html', **english_content, translations=translations,
+                           content_artifact_id=artifact_id)
 
-    if error_message_for_flash:
-        flash(error_message_for_flash, "error")
 
-    session['translated_content'] = translated_data
-    
-    # Ensure english_content_from_session is passed to the template
-    final_render_data = {**english_content_from_session, "translated_content": translated_data}
-    return render_template('content.html', **final_render_data)
 
+# --- App Factory ---
+# Importing this module only reads configuration and sets up the stores; the
+# Flask app is built by create_app(). `app` (what `flask run`, gunicorn's
+# "app:app" and `python app.py` use) is created on first access.
+# Compiled templates are cached on disk (TEMPLATE_CACHE_DIR) so a new worker
+# skips Jinja's parse/compile step, and static files are served precompressed
+# with ETags (see static_assets.py).
+TEMPLATE_CACHE_ENABLED = os.getenv("TEMPLATE_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+TEMPLATE_CACHE_DIR = os.getenv("TEMPLATE_CACHE_DIR") or os.path.join(DATA_DIR, 'template_cache')
+static_assets = static_assets_from_env(os.path.join(APP_DIR, 'static'))
+
+def static_file(filename):
+    return static_assets.response(filename)
+
+def add_static_version(endpoint, values):
+    # url_for('static', ...) links carry the file's content hash, so they can be cached for good.
+    if endpoint == "static" and "filename" in values and "v" not in values:
+        version = static_assets.version(values["filename"])
+        if version:
+            values["v"] = version
+
+def create_app():
+    flask_app = Flask(__name__, static_folder=None)
+    # SECRET_KEY is essential for signing the session cookie and for Flask-Session
+    flask_app.config["SECRET_KEY"] = os.getenv("FLASK_SECRET_KEY", os.urandom(32))
+    init_session_backend(flask_app, SESSION_BACKEND, SESSION_FILE_PATH,
+                         save_span=lambda: telemetry.span("session_write"))
+
+    if TEMPLATE_CACHE_ENABLED:
+        try:
+            os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+            flask_app.jinja_env.bytecode_cache = FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+        except OSError as e:
+            print(f"Template cache disabled, could not create {TEMPLATE_CACHE_DIR}: {e}")
+    flask_app.add_url_rule("/static/<path:filename>", endpoint="static", view_func=static_file)
+    flask_app.url_defaults(add_static_version)
+
+    flask_app.before_request(start_request_trace)
+    flask_app.after_request(record_response_status)
+    flask_app.teardown_request(finish_request_trace)
+    flask_app.context_processor(inject_feature_flags)
+    for rule, view, options in ROUTES:
+        flask_app.add_url_rule(rule, view_func=view, **options)
+
+    if idea_index is not None:
+        threading.Thread(target=sync_idea_index, name="idea-index-sync", daemon=True).start()
+    return flask_app
+
+_app = None
+_app_lock = threading.Lock()
+
+def __getattr__(name):
+    global _app
+    if name != "app":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    if _app is None:
+        with _app_lock:
+            if _app is None:
+                _app = create_app()
+    return _app
 
 if __name__ == '__main__':
+    app = create_app()
     if not OPENROUTER_API_KEY :
         print("Warning: OPENROUTER_API_KEY is not set in .env.")
     # Check if Flask-Session config is okay
-    if app.config.get("SESSION_TYPE") == "filesystem" and not os.path.isdir(app.config.get("SESSION_FILE_DIR", "")):
-        print(f"Warning: SESSION_FILE_DIR '{app.config.get('SESSION_FILE_DIR')}' does not exist or is not a directory. Filesystem sessions may fail.")
+    if SESSION_BACKEND == "filesystem" and os.path.exists(SESSION_FILE_PATH) and not os.path.isdir(SESSION_FILE_PATH):
+        print(f"Warning: SESSION_FILE_DIR '{SESSION_FILE_PATH}' is not a directory. Filesystem sessions may fail.")
     elif not app.config.get("SECRET_KEY"):
         print("Warning: SECRET_KEY is not set. Flask sessions will not be secure.")
 
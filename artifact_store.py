@@ -0,0 +1,130 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    raw_size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS artifacts (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    blob_hash TEXT NOT NULL REFERENCES blobs(hash),
+    parent_id TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_parent ON artifacts(parent_id, kind, created_at);
+CREATE INDEX IF NOT EXISTS artifacts_kind ON artifacts(kind, created_at);
+"""
+
+
+def canonical_payload(payload):
+    return json.dumps(payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+def artifact_id_for(kind, payload):
+    """Stable ID: the same kind + payload always gets the same ID, on every worker."""
+    return hashlib.sha256(kind.encode("utf-8") + b"\n" + canonical_payload(payload)).hexdigest()[:20]
+
+
+def thread_connection(local, db_path):
+    """The calling thread's connection to `db_path` (WAL mode), opened on first use and kept on `local`."""
+    conn = getattr(local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(db_path, timeout=10)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # safe with WAL; skips an fsync per commit
+        conn.row_factory = sqlite3.Row
+        local.conn = conn
+    return conn
+
+
+class ArtifactStore:
+    """Durable SQLite (WAL) store for generated ideas, content and translations.
+
+    Payloads are stored zlib-compressed in `blobs`, keyed by their SHA-256,
+    so identical outputs are stored once. `artifacts` maps stable IDs to
+    blobs and records which artifact each one was derived from (e.g. a
+    translation's parent is the English content).
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters = {"saved": 0, "deduplicated": 0, "reads": 0}
+        directory = os.path.dirname(os.path.abspath(db_path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return thread_connection(self._local, self.db_path)
+
+    def save(self, kind, payload, parent_id=None):
+        raw = canonical_payload(payload)
+        blob_hash = hashlib.sha256(raw).hexdigest()
+        artifact_id = artifact_id_for(kind, payload)
+        conn = self._connect()
+        with conn:
+            blob_inserted = conn.execute(
+                "INSERT OR IGNORE INTO blobs (hash, data, raw_size) VALUES (?, ?, ?)",
+                (blob_hash, zlib.compress(raw, 6), len(raw)),
+            ).rowcount
+            conn.execute(
+                "INSERT OR IGNORE INTO artifacts (id, kind, blob_hash, parent_id, created_at) VALUES (?, ?, ?, ?, ?)",
+                (artifact_id, kind, blob_hash, parent_id, time.time()),
+            )
+        with self._lock:
+            self._counters["saved" if blob_inserted else "deduplicated"] += 1
+        return artifact_id
+
+    def get(self, artifact_id, kind=None):
+        row = self._connect().execute(
+            "SELECT a.id, a.kind, a.parent_id, a.created_at, b.data FROM artifacts a "
+            "JOIN blobs b ON b.hash = a.blob_hash WHERE a.id = ?",
+            (artifact_id,),
+        ).fetchone()
+        with self._lock:
+            self._counters["reads"] += 1
+        if row is None or (kind and row["kind"] != kind):
+            return None
+        return {
+            "id": row["id"],
+            "kind": row["kind"],
+            "parent_id": row["parent_id"],
+            "created_at": row["created_at"],
+            "payload": json.loads(zlib.decompress(row["data"])),
+        }
+
+    def children(self, parent_id, kind):
+        """All artifacts of `kind` derived from `parent_id`, newest first (e.g. one translation per language)."""
+        rows = self._connect().execute(
+            "SELECT id FROM artifacts WHERE parent_id = ? AND kind = ? ORDER BY created_at DESC",
+            (parent_id, kind),
+        ).fetchall()
+        return [artifact for artifact in (self.get(row["id"]) for row in rows) if artifact is not None]
+
+    def ids(self, kind):
+        """IDs of every artifact of `kind`, oldest first."""
+        rows = self._connect().execute(
+            "SELECT id FROM artifacts WHERE kind = ? ORDER BY created_at", (kind,),
+        ).fetchall()
+        return [row["id"] for row in rows]
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
+
+
+def artifact_store_from_env(default_path):
+    """Build the artifact store from ARTIFACT_STORE_* environment variables (None when disabled)."""
+    if os.getenv("ARTIFACT_STORE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return ArtifactStore(os.getenv("ARTIFACT_DB_PATH") or default_path)
@@ -0,0 +1,307 @@
+"""Headless batch generation for the whole topic catalog.
+
+Runs ideas -> content -> translations for every topic (and every generated
+idea) with the same prompts and parsing as the web app. Each result is
+appended to a JSONL file as soon as it is ready; that file doubles as the
+checkpoint, so re-running with the same --output resumes where it stopped.
+
+    python batch_generate.py --output weekly.jsonl --concurrency 4 --rpm 60
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from dotenv import load_dotenv
+
+from artifact_store import ArtifactStore, artifact_id_for
+from content_results import (apply_generated_fields, apply_translated_fields, default_generated_content,
+                             default_translated_content)
+from idea_index import idea_key
+from languages import parse_language_list
+from model_router import parse_model_list
+from llm_json import CONTENT_SCHEMA, IDEAS_SCHEMA, parse_llm_json
+from openrouter_client import client_from_env
+from prompts import build_content_messages, build_ideas_messages
+from topic_catalog import topic_catalog_from_env
+from translation import TranslationPlan
+
+
+class RateLimiter:
+    """Spaces call starts evenly so at most `requests_per_minute` are started per minute."""
+
+    def __init__(self, requests_per_minute):
+        self.interval = 60.0 / requests_per_minute if requests_per_minute > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class CheckpointLog:
+    """Append-only JSONL writer; the keys already present make up the checkpoint.
+
+    Only keys are kept in memory. For ideas and content, which a resumed run
+    needs for the later stages, the record's byte offset is kept too, and
+    result() re-reads it from the file when it is needed. Records whose JSON
+    had to be repaired are not part of the checkpoint, so a resumed run
+    tries those items again.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done_keys = set()
+        self._offsets = {}  # key -> byte offset of its record, for ideas and content
+        offset = 0
+        ends_with_newline = True
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for line in f:
+                    line_offset, offset = offset, offset + len(line)
+                    ends_with_newline = line.endswith(b"\n")
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # a line cut short by an interrupted run; that item is simply redone
+                    self._add(record, line_offset)
+        self._file = open(path, "ab")
+        if not ends_with_newline:
+            self._file.write(b"\n")  # don't glue the next record onto a cut-short line
+        self._lock = threading.Lock()
+
+    def _add(self, record, offset):
+        if record.get("repaired"):
+            return
+        self.done_keys.add(record["key"])
+        if record["stage"] in ("ideas", "content"):
+            self._offsets[record["key"]] = offset
+
+    def result(self, key):
+        """The stored result for `key`, or None if it has no record."""
+        offset = self._offsets.get(key)
+        if offset is None:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return json.loads(f.readline())["result"]
+
+    def write(self, record):
+        line = (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            self._add(record, offset)
+
+    def close(self):
+        self._file.close()
+
+
+class BatchRunner:
+    def __init__(self, client, log, limiter, ideas_model, content_model, translation_model, blog_domain,
+                 languages=("fr",), translation_chunk_chars=2000, ideas_per_topic=None, artifact_store=None):
+        self.client = client
+        self.log = log
+        self.limiter = limiter
+        self.ideas_model = ideas_model
+        self.content_model = content_model
+        self.translation_model = translation_model
+        self.blog_domain = blog_domain
+        self.languages = list(languages)  # empty: skip the translation stage
+        self.translation_chunk_chars = translation_chunk_chars
+        self.ideas_per_topic = ideas_per_topic
+        self.artifact_store = artifact_store
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+        self.skipped = 0
+        self.repaired = 0
+        self.tokens = 0
+
+    # --- One model call, rate limited and accounted ---
+    def _request(self, prompt_messages, model):
+        self.limiter.wait()
+        api_response = self.client.chat_completion(prompt_messages, model, priority="batch")
+        usage = api_response.get("usage") or {}
+        with self._lock:
+            self.tokens += usage.get("total_tokens") or usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0)
+        return api_response, usage
+
+    def _call(self, prompt_messages, model, schema):
+        api_response, usage = self._request(prompt_messages, model)
+        raw_content = api_response["choices"][0]["message"]["content"]
+        parse_result = parse_llm_json(raw_content, schema)
+        return parse_result.data, usage, parse_result.repaired
+
+    def _record(self, key, stage, started, topic, result, usage, repaired, idea=None, parent_id=None):
+        record = {"key": key, "stage": stage, "topic": topic, "idea": idea, "result": result,
+                  "usage": usage, "repaired": repaired, "elapsed_s": round(time.monotonic() - started, 2)}
+        if self.artifact_store is not None:
+            # Same payload shapes as the web app, so the IDs match its /ideas/ and /content/ permalinks.
+            payload = {"topic": topic, "ideas": result} if stage == "ideas" else result
+            record["artifact_id"] = self.artifact_store.save(stage, payload, parent_id=parent_id)
+        self.log.write(record)
+        with self._lock:
+            self.completed += 1
+            self.repaired += repaired
+
+    # --- Pipeline stages; each returns the follow-up tasks it unlocked ---
+    def ideas_task(self, topic):
+        key = f"ideas:{topic['title']}"
+        ideas = self.log.result(key)
+        if ideas is None:
+            started = time.monotonic()
+            ideas, usage, repaired = self._call(build_ideas_messages(topic["title"]), self.ideas_model, IDEAS_SCHEMA)
+            self._record(key, "ideas", started, topic, ideas, usage, repaired)
+        else:
+            self._skip()
+        return [(self.content_task, (topic, idea)) for idea in ideas[:self.ideas_per_topic]]
+
+    def content_task(self, topic, idea):
+        key = f"content:{topic['title']}:{idea_key(idea)}"  # two ideas may share a slug
+        content = self.log.result(key)
+        if content is None:
+            started = time.monotonic()
+            content = default_generated_content(idea, topic, self.blog_domain)
+            parsed, usage, repaired = self._call(build_content_messages(idea, content["full_blog_url_en"], content["blog_link_tag_en"]),
+                                       self.content_model, CONTENT_SCHEMA)
+            apply_generated_fields(content, parsed)
+            self._record(key, "content", started, topic, content, usage, repaired, idea=idea)
+        else:
+            self._skip()
+        return [(self.translation_task, (topic, idea, content, language)) for language in self.languages
+                if self._translation_key(topic, idea, language) not in self.log.done_keys]
+
+    @staticmethod
+    def _translation_key(topic, idea, language):
+        return f"translation:{topic['title']}:{idea_key(idea)}:{language}"
+
+    def translation_task(self, topic, idea, content, language):
+        # Languages run as separate tasks; within one, the chunk requests go one after
+        # another so --concurrency stays the real limit on calls in flight.
+        started = time.monotonic()
+        plan = TranslationPlan(content["linkedin_post_en"], content["blog_article_en"], content["blog_link_tag_en"],
+                               language=language, max_chunk_chars=self.translation_chunk_chars)
+        api_responses = []
+        usage = {"prompt_tokens": 0, "completion_tokens": 0}
+        for prompt_messages in plan.requests:
+            api_response, request_usage = self._request(prompt_messages, self.translation_model)
+            api_responses.append(api_response)
+            for field in usage:
+                usage[field] += request_usage.get(field, 0)
+        parse_result = plan.assemble(api_responses)
+        translated = apply_translated_fields(default_translated_content(self.blog_domain, language),
+                                             parse_result.data, content, self.blog_domain)
+        self._record(self._translation_key(topic, idea, language), "translation", started, topic, translated, usage,
+                     parse_result.repaired, idea=idea, parent_id=artifact_id_for("content", content))
+        return []
+
+    def _skip(self):
+        with self._lock:
+            self.skipped += 1
+
+    def run(self, topics, concurrency):
+        # At most `concurrency` tasks are submitted at a time, and follow-up tasks go
+        # before new topics (last in, first out). A topic's articles are translated
+        # right after they are written, so only the articles in flight are in memory.
+        topics = iter(topics)
+        ready = []
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch") as executor:
+            pending = {}
+            while True:
+                while len(pending) < concurrency:
+                    if ready:
+                        task, task_args = ready.pop()
+                    else:
+                        topic = next(topics, None)
+                        if topic is None:
+                            break
+                        task, task_args = self.ideas_task, (topic,)
+                    pending[executor.submit(task, *task_args)] = (task.__name__.replace("_task", ""), task_args[0]["title"])
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    label = pending.pop(future)
+                    try:
+                        follow_ups = future.result()
+                    except Exception as e:  # one bad item (HTTP, parsing, storage) must not end the run
+                        with self._lock:
+                            self.failed += 1
+                        print(f"Failed {label[0]} for {label[1]!r}: {type(e).__name__} - {e}", file=sys.stderr)
+                        continue
+                    ready.extend(reversed(follow_ups))  # keep their order when popped
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Pre-generate ideas, content and translations for every topic.")
+    parser.add_argument("--output", required=True, help="JSONL file to append results to (also the resume checkpoint)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum model calls in flight")
+    parser.add_argument("--rpm", type=float, default=60, help="Maximum model calls started per minute (0 = unlimited)")
+    parser.add_argument("--topics", nargs="*", help="Only these topic titles or IDs (default: all)")
+    parser.add_argument("--category", help="Only topics in this category")
+    parser.add_argument("--ideas-per-topic", type=int, default=None, help="Develop only the first N ideas per topic")
+    parser.add_argument("--languages", default=os.getenv("TRANSLATION_LANGUAGES", "fr"),
+                        help="Comma-separated language codes to translate into (default: TRANSLATION_LANGUAGES)")
+    parser.add_argument("--no-translate", action="store_true", help="Skip the translation stage")
+    parser.add_argument("--artifact-db", help="Also save results to this artifact store (see ARTIFACT_DB_PATH)")
+    args = parser.parse_args()
+
+    api_key = os.getenv("OPENROUTER_API_KEY")
+    if not api_key:
+        parser.error("OPENROUTER_API_KEY is not set.")
+
+    # The same catalog as the web app (TOPIC_CATALOG_PATH, or the built-in topics).
+    topics = [t for t in topic_catalog_from_env().all()
+              if (not args.topics or t["title"] in args.topics or t["id"] in args.topics)
+              and (not args.category or t["category"].lower() == args.category.lower())]
+    artifact_store = None
+    if args.artifact_db:
+        artifact_store = ArtifactStore(args.artifact_db)
+
+    # The web app's primary model for each task (the first of IDEAS_MODELS etc.); no hedging here.
+    default_model = os.getenv("DEEPSEEK_MODEL", "deepseek/deepseek-chat")
+    log = CheckpointLog(args.output)
+    runner = BatchRunner(
+        client_from_env(api_key), log, RateLimiter(args.rpm),
+        ideas_model=parse_model_list(os.getenv("IDEAS_MODELS"), default_model)[0],
+        content_model=parse_model_list(os.getenv("CONTENT_MODELS"), default_model)[0],
+        translation_model=parse_model_list(os.getenv("TRANSLATION_MODELS"),
+                                           os.getenv("TRANSLATION_MODEL", "mistralai/mistral-7b-instruct:free"))[0],
+        blog_domain=os.getenv("YOUR_BLOG_DOMAIN", "myblogname.com"),
+        languages=[] if args.no_translate else parse_language_list(args.languages),
+        translation_chunk_chars=int(os.getenv("TRANSLATION_CHUNK_CHARS", "2000")),
+        ideas_per_topic=args.ideas_per_topic, artifact_store=artifact_store,
+    )
+    started = time.monotonic()
+    try:
+        runner.run(topics, args.concurrency)
+    finally:
+        log.close()
+    minutes = max(time.monotonic() - started, 1e-9) / 60
+    print(json.dumps({
+        "completed": runner.completed,
+        "skipped_from_checkpoint": runner.skipped,
+        "failed": runner.failed,
+        "repaired": runner.repaired,
+        "elapsed_min": round(minutes, 2),
+        "items_per_min": round(runner.completed / minutes, 2),
+        "tokens_per_min": round(runner.tokens / minutes, 1),
+    }))
+    return 1 if runner.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
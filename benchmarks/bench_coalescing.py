@@ -0,0 +1,75 @@
+"""Request coalescing (single-flight) under a burst of identical requests.
+
+Fires N identical generations at once from threads (`call_openrouter_api`,
+as the views do), against a simulated model (no network), with coalescing on
+and off. Reports upstream calls and wall
+time for each. The response cache is bypassed so only coalescing is measured.
+
+    python benchmarks/bench_coalescing.py [--requests 50] [--latency-ms 300]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("OPENROUTER_API_KEY", "benchmark")
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import app as app_module  # noqa: E402
+from prompts import build_ideas_messages  # noqa: E402
+from singleflight import SingleFlight  # noqa: E402
+
+
+class SimulatedClient:
+    def __init__(self, latency_s):
+        self.latency_s = latency_s
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def chat_completion(self, prompt_messages, model, priority="interactive", client_id=None):
+        with self._lock:
+            self.calls += 1
+        time.sleep(self.latency_s)
+        return {"choices": [{"message": {"content": "[]"}}]}
+
+
+def run_threads(requests_count, prompt_messages):
+    with ThreadPoolExecutor(max_workers=requests_count) as executor:
+        list(executor.map(lambda _: app_module.call_openrouter_api(prompt_messages, cache_route=None), range(requests_count)))
+
+
+def measure(runner, requests_count, latency_s, coalesce):
+    client = SimulatedClient(latency_s)
+    app_module.get_openrouter_client = lambda: client
+    app_module.llm_single_flight = SingleFlight() if coalesce else None
+    started = time.perf_counter()
+    runner(requests_count, build_ideas_messages("Password Security Basics"))
+    elapsed = time.perf_counter() - started
+    result = {"upstream_calls": client.calls, "wall_s": round(elapsed, 3)}
+    if coalesce:
+        result.update(app_module.llm_single_flight.stats())
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=300)
+    args = parser.parse_args()
+    latency_s = args.latency_ms / 1000
+
+    report = {"requests": args.requests}
+    report["without_coalescing"] = measure(run_threads, args.requests, latency_s, coalesce=False)
+    report["with_coalescing"] = measure(run_threads, args.requests, latency_s, coalesce=True)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
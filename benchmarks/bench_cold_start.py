@@ -0,0 +1,150 @@
+"""Worker cold start: import time and time to first response.
+
+Every run starts a fresh interpreter, the way a new gunicorn worker or a
+serverless cold start would:
+
+* in-process: time to `import app`, the modules that pulled in, and the
+  first GET / through the test client;
+* server: time from spawning a werkzeug worker to its first 200 on GET /
+  over HTTP, then what the browser downloads for static/style.css (bytes
+  with gzip, and the status of a revalidation with the ETag).
+
+    python benchmarks/bench_cold_start.py [--runs 10] [--no-template-cache]
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.error
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_in_process():
+    started = time.perf_counter()
+    sys.path.insert(0, ROOT)
+    modules_before = len(sys.modules)
+    import app as app_module
+    imported = time.perf_counter()
+    modules_after_import = len(sys.modules)
+    flask_app = getattr(app_module, "app", None) or app_module.create_app()
+    client = flask_app.test_client()
+    status = client.get("/").status_code
+    first_response = time.perf_counter()
+    client.get("/")
+    second_response = time.perf_counter()
+    print(json.dumps({
+        "import_ms": (imported - started) * 1000,
+        "first_response_ms": (first_response - imported) * 1000,
+        "second_response_ms": (second_response - first_response) * 1000,
+        "modules_imported": modules_after_import - modules_before,
+        "modules_after_first_response": len(sys.modules) - modules_before,
+        "status": status,
+    }))
+
+
+def serve(port):
+    sys.path.insert(0, ROOT)
+    from werkzeug.serving import run_simple
+    from app import app
+    run_simple("127.0.0.1", port, app, threaded=True)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def fetch(url, headers=None):
+    request = urllib.request.Request(url, headers=headers or {})
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, dict(response.headers), response.read()
+    except urllib.error.HTTPError as e:
+        return e.code, dict(e.headers), e.read()
+
+
+def measure_server(env):
+    port = free_port()
+    url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve", str(port)],
+                               cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError("Worker exited during startup")
+            try:
+                status, _, _ = fetch(url + "/")
+                break
+            except (ConnectionError, urllib.error.URLError):
+                time.sleep(0.005)
+        first_response_ms = (time.perf_counter() - started) * 1000
+        page = fetch(url + "/")[2].decode("utf-8")
+        css_path = page.split('href="', 1)[1].split('"', 1)[0] if 'rel="stylesheet"' in page else "/static/style.css"
+        _, css_headers, css_body = fetch(url + css_path, {"Accept-Encoding": "gzip"})
+        etag = css_headers.get("ETag")
+        revalidate_status = fetch(url + css_path, {"If-None-Match": etag})[0] if etag else None
+        return {"first_response_ms": first_response_ms, "status": status,
+                "css_bytes": len(css_body), "css_encoding": css_headers.get("Content-Encoding", "identity"),
+                "css_cache_control": css_headers.get("Cache-Control"), "css_revalidate_status": revalidate_status}
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+
+def summarize(samples, key):
+    values = [sample[key] for sample in samples]
+    return {"median": round(statistics.median(values), 1), "max": round(max(values), 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--no-template-cache", action="store_true", help="Compile templates in every worker")
+    parser.add_argument("--measure-import", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure_import:
+        return measure_in_process()
+    if args.serve:
+        return serve(args.serve)
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        env = dict(os.environ)
+        env.update({
+            "OPENROUTER_API_KEY": "unused",
+            "FLASK_SECRET_KEY": "cold-start-secret",
+            "DATA_DIR": data_dir,
+            "TEMPLATE_CACHE_ENABLED": "false" if args.no_template_cache else "true",
+        })
+        in_process, server = [], []
+        for _ in range(args.runs):
+            output = subprocess.run([sys.executable, os.path.abspath(__file__), "--measure-import"], cwd=ROOT, env=env,
+                                    capture_output=True, text=True, check=True).stdout
+            in_process.append(json.loads(output.strip().splitlines()[-1]))
+            server.append(measure_server(env))
+
+    last = server[-1]
+    print(json.dumps({
+        "runs": args.runs,
+        "import_ms": summarize(in_process, "import_ms"),
+        "first_response_in_process_ms": summarize(in_process, "first_response_ms"),
+        "second_response_in_process_ms": summarize(in_process, "second_response_ms"),
+        "modules_imported": in_process[-1]["modules_imported"],
+        "modules_after_first_response": in_process[-1]["modules_after_first_response"],
+        "spawn_to_first_response_ms": summarize(server, "first_response_ms"),
+        "static_css": {key: last[key] for key in ("css_bytes", "css_encoding", "css_cache_control",
+                                                  "css_revalidate_status")},
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
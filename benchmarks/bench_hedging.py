@@ -0,0 +1,90 @@
+"""Tail latency with and without hedged requests.
+
+Runs content-generation calls through ModelRouter and OpenRouterClient against
+the local mock server (benchmarks/mock_openrouter.py). The primary model is
+usually fast but sometimes very slow (in fewer than 5% of calls, so its p95
+stays fast); the backup model is steady. Reports p50/p95/p99 latency and
+upstream calls per request, for failover only and for hedging at the
+primary's p95.
+
+    python benchmarks/bench_hedging.py [--requests 200] [--tail-probability 0.04] [--tail-ms 1500]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from llm_json import CONTENT_SCHEMA, LLMParseError, parse_llm_json  # noqa: E402
+from mock_openrouter import MockOpenRouter  # noqa: E402
+from model_router import ModelRouter  # noqa: E402
+from openrouter_client import OpenRouterClient  # noqa: E402
+from prompts import build_content_messages  # noqa: E402
+from telemetry import percentile  # noqa: E402
+
+PRIMARY, BACKUP = "deepseek/deepseek-chat", "backup/steady-model"
+
+
+def is_usable(api_response):
+    try:
+        parse_llm_json(api_response["choices"][0]["message"]["content"], CONTENT_SCHEMA)
+        return True
+    except (LLMParseError, KeyError, TypeError):
+        return False
+
+
+def run(args, hedge_percentile):
+    server = MockOpenRouter(latency_ms=args.primary_ms, model_latency_ms={BACKUP: args.backup_ms},
+                            tail_probability=args.tail_probability, tail_ms=args.tail_ms, tail_models=[PRIMARY],
+                            seed=7).start()
+    client = OpenRouterClient("benchmark", base_url=server.base_url, pool_maxsize=64)
+    router = ModelRouter(hedge_percentile=hedge_percentile, initial_hedge_delay=args.tail_ms / 1000,
+                         min_hedge_delay=0.01, min_samples=20, max_workers=64)
+    prompt = build_content_messages({"title": "Passwords", "summary": "Why they matter.", "slug": "passwords"},
+                                    "https://myblogname.com/passwords", "passwords")
+
+    def one(_):
+        started = time.perf_counter()
+        router.call("content", [PRIMARY, BACKUP], lambda model: client.chat_completion(prompt, model), is_usable)
+        return time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(one, range(40)))  # warm-up: learn the primary's latency profile
+        server.calls_by_model.clear()
+        latencies = list(executor.map(one, range(args.requests)))
+    time.sleep(args.tail_ms / 1000)  # let abandoned calls finish before closing the pool
+    server.shutdown()
+    client.close()
+    stats = router.stats()
+    return {
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "upstream_calls_per_request": round(sum(server.calls_by_model.values()) / args.requests, 3),
+        "hedged": stats["hedged"],
+        "backup_wins": stats["backup_wins"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--primary-ms", type=float, default=100)
+    parser.add_argument("--backup-ms", type=float, default=150)
+    parser.add_argument("--tail-probability", type=float, default=0.04)
+    parser.add_argument("--tail-ms", type=float, default=1500)
+    args = parser.parse_args()
+    print(json.dumps({
+        "requests": args.requests,
+        "failover_only": run(args, hedge_percentile=0),
+        "hedged_at_p95": run(args, hedge_percentile=95),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
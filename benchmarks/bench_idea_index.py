@@ -0,0 +1,120 @@
+"""Idea index: build cost, lookup latency and near-duplicate recall at scale.
+
+Indexes --ideas synthetic ideas into a fresh SQLite file, then looks up
+--queries rewordings of stored ideas (words dropped, swapped for synonyms,
+summaries rewritten) and as many unrelated ideas. Reports per-idea add cost,
+lookup p50/p95, LSH candidates per lookup, how many rewordings found their
+original (recall) and how many unrelated ideas matched anything (false
+positives), next to an exact brute-force scan over all shingle sets.
+
+    python benchmarks/bench_idea_index.py [--ideas 20000] [--queries 200]
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from idea_index import IdeaIndex, idea_key, shingles  # noqa: E402
+from telemetry import percentile  # noqa: E402
+
+SUBJECTS = ["password", "phishing", "firewall", "backup", "zero trust", "encryption", "automation", "privacy",
+            "monitoring", "compliance", "training", "incident response", "identity", "kubernetes", "analytics",
+            "governance", "remote work", "patching", "endpoint", "audit", "VPN", "MFA", "ransomware", "cloud cost"]
+AUDIENCES = ["small teams", "startups", "HR leaders", "developers", "managers", "nonprofits", "schools", "retailers"]
+PATTERNS = ["{n} {s} mistakes {a} make", "Why {a} get {s} wrong", "{s} checklist for {a}",
+            "What {a} should know about {s}", "The hidden cost of ignoring {s}", "{s} myths that hurt {a}",
+            "A {n}-minute guide to {s}", "How {a} can fix {s} in a week"]
+SYNONYMS = {"mistakes": "errors", "guide": "walkthrough", "checklist": "list", "hidden": "real",
+            "fix": "improve", "myths": "misconceptions", "know": "understand", "wrong": "badly"}
+FILLER = ["simple", "practical", "steps", "risk", "teams", "costly", "overlooked", "quick", "wins", "habits",
+          "budget", "tools", "policy", "people", "process", "everyday", "examples", "real", "lessons", "data"]
+
+
+def make_idea(rng, i):
+    subject, audience = rng.choice(SUBJECTS), rng.choice(AUDIENCES)
+    title = rng.choice(PATTERNS).format(n=rng.randint(3, 10), s=subject, a=audience)
+    title = f"{title[0].upper()}{title[1:]} ({rng.choice(FILLER)} {i})"
+    summary = f"{subject.capitalize()} for {audience}: " + " ".join(rng.sample(FILLER, 8)) + "."
+    return {"title": title, "summary": summary, "slug": "-".join(title.lower().replace("(", "").replace(")", "").split()[:6])}
+
+
+def reword(rng, idea):
+    # What the model tends to return for the same idea in another session.
+    words = [SYNONYMS.get(word.lower(), word) for word in idea["title"].split()]
+    if len(words) > 4:
+        words.pop(rng.randrange(1, len(words)))
+    summary_words = idea["summary"].split()
+    summary = " ".join(summary_words[:4] + rng.sample(FILLER, 5)) + "."
+    return {"title": " ".join(words), "summary": summary, "slug": idea["slug"] if rng.random() < 0.5 else "-".join(words).lower()}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--ideas", type=int, default=20000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--threshold", type=float, default=0.3)
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    ideas = [make_idea(rng, i) for i in range(args.ideas)]
+    with tempfile.TemporaryDirectory() as directory:
+        index = IdeaIndex(os.path.join(directory, "ideas.sqlite3"), threshold=args.threshold)
+        started = time.perf_counter()
+        for i, idea in enumerate(ideas):
+            index.add(idea, content_id=f"content-{i}")
+        add_seconds = time.perf_counter() - started
+
+        targets = rng.sample(range(args.ideas), args.queries)
+        rewordings = [(ideas[i], reword(rng, ideas[i])) for i in targets]
+        unrelated = [{"title": f"Quarterly {rng.choice(['sales', 'hiring', 'events'])} recap {i}",
+                      "summary": "Numbers and highlights.", "slug": f"recap-{i}"} for i in range(args.queries)]
+
+        found, lookup_ms, candidates = 0, [], []
+        for original, query in rewordings:
+            before = index.stats()["candidates"]
+            started = time.perf_counter()
+            matches = index.similar(query)
+            lookup_ms.append((time.perf_counter() - started) * 1000)
+            candidates.append(index.stats()["candidates"] - before)
+            found += any(match["key"] == idea_key(original) for match in matches)
+        false_positives = sum(1 for query in unrelated if index.similar(query))
+
+        # Exact answer, for comparison: Jaccard against every stored shingle set.
+        stored = [shingles(idea) for idea in ideas]
+        scan_ms, exact_found = [], 0
+        for original, query in rewordings[:20]:
+            query_shingles = shingles(query)
+            started = time.perf_counter()
+            best = max(range(len(stored)), key=lambda i: jaccard(query_shingles, stored[i]))
+            scan_ms.append((time.perf_counter() - started) * 1000)
+            exact_found += ideas[best] is original
+        db_bytes = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+    print(json.dumps({
+        "ideas": args.ideas,
+        "threshold": args.threshold,
+        "add_ms_per_idea": round(add_seconds / args.ideas * 1000, 3),
+        "db_bytes_per_idea": round(db_bytes / args.ideas),
+        "lookup_ms_p50": round(statistics.median(lookup_ms), 3),
+        "lookup_ms_p95": round(percentile(lookup_ms, 95), 3),
+        "candidates_per_lookup_avg": round(statistics.mean(candidates), 1),
+        "rewording_recall": round(found / len(rewordings), 3),
+        "unrelated_false_positive_rate": round(false_positives / len(unrelated), 3),
+        "brute_force_scan_ms": round(statistics.median(scan_ms), 1),
+        "brute_force_top1_accuracy": round(exact_found / len(scan_ms), 3),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Micro-benchmark for llm_json.parse_llm_json over a corpus of malformed model responses.
+
+Compares the unified parser with the fence-strip / find+rfind / json.loads
+sequence the routes used before, reporting throughput and how many
+responses each approach turns into schema-valid data.
+
+    python benchmarks/bench_llm_json.py [--corpus PATH] [--rounds N]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_json import (CONTENT_SCHEMA, IDEAS_SCHEMA, IncrementalJsonParser, LLMParseError, ResponseSchema,  # noqa: E402
+                      parse_llm_json)
+
+# The single-request French translation format the app used before chunked
+# translation; the corpus still has responses in it.
+TRANSLATION_SCHEMA = ResponseSchema("translation", dict, required_keys=("linkedin_post_fr", "blog_article_fr"),
+                                    optional_keys=("blog_link_tag_fr",))
+
+SCHEMAS = {"ideas": IDEAS_SCHEMA, "content": CONTENT_SCHEMA, "translation": TRANSLATION_SCHEMA}
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_response_corpus.jsonl")
+
+
+def legacy_parse(raw_text, schema):
+    # The extraction sequence previously copy-pasted into each route.
+    payload = raw_text.strip()
+    if payload.startswith("```json") and payload.endswith("```"):
+        payload = payload[len("```json"):-len("```")].strip()
+    elif payload.startswith("```") and payload.endswith("```"):
+        payload = payload[len("```"):-len("```")].strip()
+    opener, closer = ("[", "]") if schema.container is list else ("{", "}")
+    if not (payload.startswith(opener) and payload.endswith(closer)):
+        start, end = payload.find(opener), payload.rfind(closer)
+        if start == -1 or end <= start:
+            raise ValueError("no JSON structure")
+        payload = payload[start:end + 1]
+    try:
+        data = json.loads(payload)
+    except json.JSONDecodeError:
+        data = json.loads(payload, strict=False)
+    return schema.validate(data)
+
+
+def unified_parse(raw_text, schema):
+    return parse_llm_json(raw_text, schema).data
+
+
+def incremental_parse(raw_text, schema, chunk_size=16):
+    parser = IncrementalJsonParser(schema)
+    for i in range(0, len(raw_text), chunk_size):
+        parser.feed(raw_text[i:i + chunk_size])
+    return parser.close().data
+
+
+def run(name, parse, corpus, rounds):
+    ok = 0
+    failures = []
+    for row in corpus:
+        try:
+            parse(row["raw"], SCHEMAS[row["schema"]])
+            ok += 1
+        except (LLMParseError, ValueError):
+            failures.append(f'{row["schema"]}/{row["defect"]}')
+
+    total_bytes = sum(len(row["raw"].encode("utf-8")) for row in corpus) * rounds
+    started = time.perf_counter()
+    for _ in range(rounds):
+        for row in corpus:
+            try:
+                parse(row["raw"], SCHEMAS[row["schema"]])
+            except (LLMParseError, ValueError):
+                pass
+    elapsed = time.perf_counter() - started
+    return {
+        "parser": name,
+        "success_rate": round(ok / len(corpus), 3),
+        "responses_per_sec": round(len(corpus) * rounds / elapsed, 1),
+        "mb_per_sec": round(total_bytes / elapsed / 1e6, 2),
+        "failures": failures,
+    }
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--corpus", default=DEFAULT_CORPUS)
+    arg_parser.add_argument("--rounds", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    with open(args.corpus, encoding="utf-8") as f:
+        corpus = [json.loads(line) for line in f if line.strip()]
+
+    with contextlib.redirect_stdout(io.StringIO()):  # silence "Skipping an invalid item" warnings
+        results = [run("legacy", legacy_parse, corpus, args.rounds),
+                   run("unified", unified_parse, corpus, args.rounds),
+                   run("incremental", incremental_parse, corpus, max(args.rounds // 10, 1))]
+        # Like-for-like throughput on the responses the legacy code could already handle.
+        legacy_failures = set(results[0]["failures"])
+        parsable = [row for row in corpus if f'{row["schema"]}/{row["defect"]}' not in legacy_failures]
+        results += [run("legacy (parsable subset)", legacy_parse, parsable, args.rounds),
+                    run("unified (parsable subset)", unified_parse, parsable, args.rounds)]
+    print(f"corpus: {len(corpus)} responses from {args.corpus}")
+    for result in results:
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Client-side scheduling against a rate-limited upstream.
+
+Starts a local HTTP server that behaves like a quota-limited OpenRouter model:
+it allows --quota-rps requests per second and answers anything beyond that
+with 429 and a Retry-After header. A burst of calls is sent through
+OpenRouterClient without the scheduler (urllib3 retries) and with it (limits
+set to the quota). Reports completed and failed calls, 429s received and wall
+time. A second run floods the scheduler with batch calls and measures how
+long interactive calls wait behind them.
+
+    python benchmarks/bench_scheduler.py [--calls 40] [--quota-rps 10] [--concurrency 20]
+"""
+import argparse
+import json
+import math
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from llm_scheduler import CallScheduler  # noqa: E402
+from openrouter_client import OpenRouterClient  # noqa: E402
+
+MODEL = "mistralai/mistral-7b-instruct:free"
+PROMPT = [{"role": "user", "content": "Translate: passwords matter."}]
+
+
+class QuotaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, quota_rps, latency_s):
+        super().__init__(("127.0.0.1", 0), QuotaHandler)
+        self.quota_rps = quota_rps
+        self.latency_s = latency_s
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        self.rejected = 0
+
+    def admit(self):
+        with self.lock:
+            now = time.monotonic()
+            if now - self.window_start >= 1.0:
+                self.window_start, self.window_count = now, 0
+            if self.window_count >= self.quota_rps:
+                self.rejected += 1
+                return False, 1.0 - (now - self.window_start)
+            self.window_count += 1
+            return True, 0.0
+
+
+class QuotaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        allowed, retry_after = self.server.admit()
+        if allowed:
+            time.sleep(self.server.latency_s)
+            body = json.dumps({"choices": [{"message": {"content": "Les mots de passe comptent."}}],
+                               "usage": {"prompt_tokens": 12, "completion_tokens": 8}}).encode()
+            self.send_response(200)
+        else:
+            body = json.dumps({"error": {"message": "Rate limit exceeded", "code": 429}}).encode()
+            self.send_response(429)
+            self.send_header("Retry-After", str(math.ceil(retry_after)))  # whole seconds, like OpenRouter
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(quota_rps, latency_s):
+    server = QuotaServer(quota_rps, latency_s)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def burst(client, calls, concurrency, priority="interactive", client_id=None):
+    def one(_):
+        started = time.perf_counter()
+        try:
+            client.chat_completion(PROMPT, MODEL, priority=priority, client_id=client_id)
+            return True, time.perf_counter() - started
+        except requests.exceptions.RequestException:
+            return False, time.perf_counter() - started
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(one, range(calls)))
+
+
+def run_burst(args, scheduler):
+    server = start_server(args.quota_rps, args.latency_ms / 1000)
+    client = OpenRouterClient("benchmark", base_url=f"http://127.0.0.1:{server.server_address[1]}/api/v1",
+                              pool_maxsize=args.concurrency, max_retries=3, backoff_factor=0.2,
+                              scheduler=scheduler, max_rate_limit_retries=10)
+    started = time.perf_counter()
+    results = burst(client, args.calls, args.concurrency)
+    elapsed = time.perf_counter() - started
+    server.shutdown()
+    client.close()
+    completed = sum(ok for ok, _ in results)
+    return {"completed": completed, "failed": len(results) - completed, "upstream_429s": server.rejected,
+            "wall_s": round(elapsed, 2), "calls_per_s": round(completed / elapsed, 2)}
+
+
+def run_priorities(args):
+    # Batch work saturates the quota; a handful of interactive calls arrive shortly after.
+    server = start_server(args.quota_rps, args.latency_ms / 1000)
+    client = OpenRouterClient("benchmark", base_url=f"http://127.0.0.1:{server.server_address[1]}/api/v1",
+                              pool_maxsize=args.concurrency,
+                              scheduler=CallScheduler({MODEL: (args.quota_rps, 0)}))
+    batch = threading.Thread(target=burst, args=(client, args.calls, args.concurrency, "batch", "batch-cli"))
+    batch.start()
+    time.sleep(0.5)
+    interactive = burst(client, 5, 5, "interactive", "browser")
+    batch.join()
+    server.shutdown()
+    client.close()
+    return {"interactive_wait_ms_max": round(max(seconds for _, seconds in interactive) * 1000, 1),
+            "batch_calls_queued": args.calls, "scheduler": client.scheduler.stats()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=40)
+    parser.add_argument("--quota-rps", type=float, default=10)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    args = parser.parse_args()
+
+    print(json.dumps({
+        "calls": args.calls,
+        "quota_rps": args.quota_rps,
+        "without_scheduler": run_burst(args, scheduler=None),
+        "with_scheduler": run_burst(args, scheduler=CallScheduler({MODEL: (args.quota_rps, 0)})),
+        "interactive_behind_batch": run_priorities(args),
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Per-request session I/O benchmark.
+
+Drives the index -> ideas -> content -> translate flow through the Flask test
+client with canned model responses (no network). For each request it reports
+the bytes written to the session store and the content store, and the
+request latency. It also reports what the old inline-session layout would
+have written for the same data.
+
+    python benchmarks/bench_session_io.py --session-backend filesystem --content-backend filesystem
+    python benchmarks/bench_session_io.py --session-backend cookie --content-backend redis  # REDIS_URL=local:// stand-in
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from telemetry import percentile  # noqa: E402
+
+ARTICLE = "# Why Passwords Still Matter\n\n" + "\n\n".join(
+    f"## Section {i}\n\n" + "Strong passwords are long, unique and kept in a password manager. " * 12 for i in range(1, 11))
+CANNED = {
+    "ideas": json.dumps([{"title": f"Idea {i}", "summary": f"Summary {i}.", "slug": f"idea-{i}"} for i in range(5)]),
+    "content": json.dumps({"linkedin_post": "Passwords matter. Read more: https://myblogname.com/idea-0",
+                           "blog_article": ARTICLE}),
+    "translation": json.dumps({"linkedin_post": "Les mots de passe comptent.", "blog_link_tag": "idee-0"}),
+}
+
+
+def canned_call(prompt_messages, model_to_use=None, cache_route=None, refresh=False, *args, **kwargs):
+    route = cache_route or "ideas"
+    if route == "translation" and "JSON" not in prompt_messages[0]["content"]:
+        # An article section (see translation.py) comes back as plain Markdown.
+        return {"choices": [{"message": {"content": prompt_messages[-1]["content"].replace("Section", "Partie")}}]}
+    return {"choices": [{"message": {"content": CANNED[route]}}]}
+
+
+def dir_snapshot(directory):
+    snapshot = {}
+    for dirpath, _, filenames in os.walk(directory):
+        for name in filenames:
+            path = os.path.join(dirpath, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            snapshot[path] = (st.st_mtime_ns, st.st_size)
+    return snapshot
+
+
+def bytes_written(before, after):
+    return sum(size for path, (mtime, size) in after.items() if before.get(path, (None, None))[0] != mtime)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-request session I/O benchmark")
+    parser.add_argument("--session-backend", default="filesystem", choices=("filesystem", "cookie", "redis"))
+    parser.add_argument("--content-backend", default="filesystem", choices=("filesystem", "redis"))
+    parser.add_argument("--sessions", type=int, default=50)
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="bench_session_io_")
+    os.environ.update({
+        "SESSION_BACKEND": args.session_backend,
+        "CONTENT_STORE_BACKEND": args.content_backend,
+        "SESSION_FILE_DIR": os.path.join(work_dir, "flask_session"),
+        "CONTENT_STORE_DIR": os.path.join(work_dir, "content_store"),
+        "REDIS_URL": os.getenv("REDIS_URL", "local://"),
+        "OPENROUTER_API_KEY": "benchmark",
+        "STREAM_RESPONSES": "false",
+        "LLM_CACHE_ENABLED": "false",
+        "PREWARM_TRANSLATION": "false",
+    })
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as app_module
+    app_module.call_openrouter_api = canned_call
+    app_module._call_openrouter_api = canned_call  # what the views call through request coalescing
+    session_dir = app_module.SESSION_FILE_PATH
+
+    steps = [("GET", "/", None),
+             ("POST", "/generate_ideas", {"topic_id": app_module.topic_catalog.all()[0]["id"]}),
+             ("POST", "/generate_content", {"selected_idea_index": "0"}),
+             ("POST", "/translate_content", None)]
+    per_step = {path: {"session_bytes": [], "content_bytes": [], "latency_ms": []} for _, path, _ in steps}
+
+    for _ in range(args.sessions):
+        client = app_module.app.test_client()
+        for method, path, form in steps:
+            session_before = dir_snapshot(session_dir)
+            content_before = app_module.content_store.stats()["stored_bytes"]
+            started = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                response = client.open(path, method=method, data=form)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if args.session_backend == "cookie":
+                session_bytes = sum(len(h) for h in response.headers.getlist("Set-Cookie"))
+            else:
+                session_bytes = bytes_written(session_before, dir_snapshot(session_dir))
+            per_step[path]["session_bytes"].append(session_bytes)
+            per_step[path]["content_bytes"].append(app_module.content_store.stats()["stored_bytes"] - content_before)
+            per_step[path]["latency_ms"].append(elapsed_ms)
+
+    content_stats = app_module.content_store.stats()
+    inline_bytes = len(json.dumps({
+        "generated_linkedin_ideas": json.loads(CANNED["ideas"]),
+        "last_generated_content": {"linkedin_post_en": "x" * 60, "blog_article_en": ARTICLE},
+        "translations": {"fr": {"linkedin_post": "x" * 30, "blog_article": ARTICLE}},
+    }).encode("utf-8"))
+
+    report = {
+        "session_backend": args.session_backend,
+        "content_backend": args.content_backend,
+        "sessions": args.sessions,
+        "steps": {path: {
+            "session_bytes_avg": round(statistics.mean(values["session_bytes"]), 1),
+            "content_store_bytes_avg": round(statistics.mean(values["content_bytes"]), 1),
+            "latency_ms_p50": round(percentile(values["latency_ms"], 50), 2),
+            "latency_ms_p95": round(percentile(values["latency_ms"], 95), 2),
+        } for path, values in per_step.items()},
+        "content_store_compression_ratio": round(content_stats["raw_bytes"] / max(content_stats["stored_bytes"], 1), 2),
+        "legacy_inline_session_bytes_estimate": inline_bytes,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
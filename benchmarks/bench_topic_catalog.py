@@ -0,0 +1,133 @@
+"""Topic catalog load, lookup, search and index page cost at scale.
+
+Generates a synthetic catalog (--topics entries) and writes it as JSON, CSV
+and SQLite. Reports load + index time per format, lookup by ID against the
+old linear scan by title, search latency for a few queries, and the
+index page: the old template rendering every topic against the paginated one.
+
+    python benchmarks/bench_topic_catalog.py [--topics 10000]
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from topic_catalog import TopicCatalog, load_topics  # noqa: E402
+
+CATEGORIES = ["cybersecurity", "networking", "AI", "cloud", "devops", "data", "compliance", "HR tech"]
+WORDS = ["passwords", "phishing", "firewall", "backup", "zero trust", "encryption", "automation", "privacy",
+         "monitoring", "compliance", "training", "incident response", "identity", "kubernetes", "analytics",
+         "governance", "remote work", "patching", "endpoint", "audit"]
+OLD_INDEX_TEMPLATE = """<select name="topic_title" id="topic_title" required>
+{% for topic in topics %}<option value="{{ topic.title }}">{{ topic.category | capitalize }} - {{ topic.title }}</option>
+{% endfor %}</select>"""
+
+
+def synthetic_topics(count, seed=7):
+    rng = random.Random(seed)
+    topics = []
+    for i in range(count):
+        keywords = rng.sample(WORDS, 4)
+        topics.append({"category": CATEGORIES[i % len(CATEGORIES)],
+                       "title": f"{keywords[0].title()} and {keywords[1].title()} Guide {i}",
+                       "keywords": keywords})
+    return topics
+
+
+def write_files(topics, directory):
+    paths = {"json": os.path.join(directory, "topics.json"), "csv": os.path.join(directory, "topics.csv"),
+             "sqlite": os.path.join(directory, "topics.sqlite")}
+    with open(paths["json"], "w", encoding="utf-8") as f:
+        json.dump({"topics": topics}, f)
+    with open(paths["csv"], "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["category", "title", "keywords"])
+        writer.writeheader()
+        for topic in topics:
+            writer.writerow({**topic, "keywords": "; ".join(topic["keywords"])})
+    conn = sqlite3.connect(paths["sqlite"])
+    conn.execute("CREATE TABLE topics (category TEXT, title TEXT, keywords TEXT)")
+    conn.executemany("INSERT INTO topics VALUES (?, ?, ?)",
+                     [(t["category"], t["title"], "; ".join(t["keywords"])) for t in topics])
+    conn.commit()
+    conn.close()
+    return paths
+
+
+def per_call_us(fn, args_list):
+    started = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return round((time.perf_counter() - started) / len(args_list) * 1e6, 2)
+
+
+def median_ms(fn, repeat=20):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return round(statistics.median(samples) * 1000, 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--topics", type=int, default=10000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    topics = synthetic_topics(args.topics)
+    results = {"topics": args.topics, "load_and_index_ms": {}}
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_files(topics, directory)
+        for name, path in paths.items():
+            results["load_and_index_ms"][name] = median_ms(lambda: TopicCatalog(lambda: load_topics(path)), repeat=3)
+
+        catalog = TopicCatalog(lambda: load_topics(paths["json"]))
+        rng = random.Random(1)
+        sample = [rng.choice(catalog.all()) for _ in range(args.lookups)]
+        raw_topics = load_topics(paths["json"])
+        results["lookup_us"] = {
+            "linear_scan_by_title": per_call_us(
+                lambda title: next((t for t in raw_topics if t["title"] == title), None),
+                [(topic["title"],) for topic in sample[:200]]),
+            "catalog_get_by_id": per_call_us(catalog.get, [(topic["id"],) for topic in sample]),
+            "catalog_get_by_title": per_call_us(catalog.get_by_title, [(topic["title"],) for topic in sample]),
+        }
+        results["search_ms"] = {
+            query or f"category={category}": median_ms(lambda: catalog.search(query, category))
+            for query, category in (("phishing", None), ("zero trust encryption", None), ("encr", None),
+                                    ("", "cloud"), ("backup", "devops"))
+        }
+
+        os.environ.update({"TOPIC_CATALOG_PATH": paths["json"], "SESSION_BACKEND": "cookie",
+                           "ARTIFACT_STORE_ENABLED": "false", "CONTENT_STORE_DIR": os.path.join(directory, "content")})
+        with contextlib.redirect_stdout(io.StringIO()):
+            import app as app_module
+        client = app_module.app.test_client()
+        with app_module.app.app_context():
+            old_template = app_module.app.jinja_env.from_string(OLD_INDEX_TEMPLATE)
+            old_page = old_template.render(topics=raw_topics)
+            results["index_page"] = {
+                "all_topics_render_ms": median_ms(lambda: old_template.render(topics=raw_topics), repeat=5),
+                "all_topics_bytes": len(old_page.encode("utf-8")),
+            }
+        results["index_page"]["paginated_request_ms"] = median_ms(lambda: client.get("/"))
+        results["index_page"]["paginated_search_request_ms"] = median_ms(lambda: client.get("/?q=phish&category=cloud"))
+        results["index_page"]["paginated_bytes"] = len(client.get("/").data)
+        results["topics_api_request_ms"] = median_ms(lambda: client.get("/topics?q=backup&offset=100&limit=50"))
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""Single-request vs chunked, concurrent article translation, and multi-language fan-out.
+
+Simulates a model whose latency grows with the amount of text it has to
+write (no network) and reports wall-clock time for translating one article
+in a single request and as concurrent chunks, how many chunk requests an
+edit to one section causes with the response cache in place, and the time to
+translate into several languages one after another vs all at once.
+
+    python benchmarks/bench_translation.py [--sections 10] [--ms-per-char 0.05] [--chunk-chars 2000] [--languages fr,de,es,it,nl]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from languages import parse_language_list  # noqa: E402
+from response_cache import ResponseCache, make_cache_key  # noqa: E402
+from translation import TranslationPlan  # noqa: E402
+
+
+# The single-request French prompt the app used before chunked translation; the baseline here.
+def build_translation_messages(linkedin_post_en, blog_article_en, blog_link_tag_en):
+    return [
+        {"role": "system", "content": "You are an expert translator. Translate the provided texts from English to French. Maintain the original markdown formatting for the blog article. For the 'blog_link_tag', translate it into a suitable French slug (lowercase, hyphenated, 3-5 words). Output your response as a single JSON object with keys: 'linkedin_post_fr', 'blog_article_fr', and 'blog_link_tag_fr'."},
+        {"role": "user", "content": f"""
+        Please translate the following English content to French.
+
+        LinkedIn Post (English):
+        ---
+        {linkedin_post_en}
+        ---
+
+        Blog Article (English - Markdown):
+        ---
+        {blog_article_en}
+        ---
+
+        Blog Link Tag (English Slug):
+        ---
+        {blog_link_tag_en}
+        ---
+
+        Return a JSON object with 'linkedin_post_fr', 'blog_article_fr', and 'blog_link_tag_fr'.
+        Example JSON structure:
+        {{
+          "linkedin_post_fr": "Ceci est la version française...",
+          "blog_article_fr": "# Titre de l'article en français\\n\\nContenu en markdown...",
+          "blog_link_tag_fr": "mon-article-en-francais"
+        }}
+        """}
+    ]
+
+
+def build_article(sections, edited_section=None):
+    parts = ["# Why Passwords Still Matter\n\nAn introduction to the topic.\n"]
+    for i in range(1, sections + 1):
+        sentence = "Strong passwords are long, unique and kept in a password manager. "
+        if i == edited_section:
+            sentence = "Passphrases are easier to remember and just as strong. "
+        parts.append(f"## Section {i}\n\n" + sentence * 8 + "\n\n" + sentence * 6 + "\n")
+        if i % 4 == 0:
+            parts.append("```bash\npwgen -s 24 1\n```\n")
+    return "\n".join(parts)
+
+
+class SimulatedModel:
+    def __init__(self, ms_per_char, cache):
+        self.ms_per_char = ms_per_char
+        self.cache = cache
+        self.upstream_calls = 0
+
+    def __call__(self, prompt_messages):
+        cache_key = make_cache_key("simulated", prompt_messages)
+        cached = self.cache.get(cache_key) if self.cache is not None else None
+        if cached is not None:
+            return cached
+        self.upstream_calls += 1
+        text = prompt_messages[-1]["content"]
+        time.sleep(len(text) * self.ms_per_char / 1000)  # output is about as long as the input
+        if "JSON" in prompt_messages[0]["content"]:
+            reply = json.dumps({"linkedin_post": "Publication", "blog_link_tag": "mots-de-passe"})
+        else:
+            reply = "TRANSLATED " + text
+        api_response = {"choices": [{"message": {"content": reply}}]}
+        if self.cache is not None:
+            self.cache.set(cache_key, api_response)
+        return api_response
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sections", type=int, default=10)
+    parser.add_argument("--ms-per-char", type=float, default=0.05)
+    parser.add_argument("--chunk-chars", type=int, default=2000)
+    parser.add_argument("--languages", default="fr,de,es,it,nl")
+    args = parser.parse_args()
+
+    article = build_article(args.sections)
+    post, slug = "Passwords matter. Read more: https://myblogname.com/passwords", "passwords"
+    executor = ThreadPoolExecutor(max_workers=64)
+
+    model = SimulatedModel(args.ms_per_char, cache=None)
+    started = time.perf_counter()
+    model(build_translation_messages(post, article, slug))
+    single_s = time.perf_counter() - started
+
+    model = SimulatedModel(args.ms_per_char, cache=ResponseCache())
+    plan = TranslationPlan(post, article, slug, max_chunk_chars=args.chunk_chars)
+    started = time.perf_counter()
+    result = plan.assemble(list(executor.map(model, plan.requests)))
+    chunked_s = time.perf_counter() - started
+    first_calls = model.upstream_calls
+
+    edited_plan = TranslationPlan(post, build_article(args.sections, edited_section=2), slug,
+                                  max_chunk_chars=args.chunk_chars)
+    edited_plan.assemble(list(executor.map(model, edited_plan.requests)))
+    first_calls_after_edit = model.upstream_calls - first_calls
+
+    languages = parse_language_list(args.languages)
+    model = SimulatedModel(args.ms_per_char, cache=None)
+    started = time.perf_counter()
+    for language in languages:
+        language_plan = TranslationPlan(post, article, slug, language=language, max_chunk_chars=args.chunk_chars)
+        language_plan.assemble(list(executor.map(model, language_plan.requests)))
+    serial_languages_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    language_plans = [TranslationPlan(post, article, slug, language=language, max_chunk_chars=args.chunk_chars)
+                      for language in languages]
+    pending = [[executor.submit(model, messages) for messages in language_plan.requests]
+               for language_plan in language_plans]
+    for language_plan, futures in zip(language_plans, pending):
+        language_plan.assemble([future.result() for future in futures])
+    fan_out_s = time.perf_counter() - started
+
+    print(json.dumps({
+        "article_chars": len(article),
+        "chunks": plan.chunk_count,
+        "longest_chunk_chars": max(len(messages[-1]["content"]) for messages in plan.requests[1:]),
+        "single_request_s": round(single_s, 3),
+        "chunked_concurrent_s": round(chunked_s, 3),
+        "speedup": round(single_s / chunked_s, 2),
+        "code_blocks_preserved": result.data["blog_article"].count("```bash") == article.count("```bash"),
+        "requests_first_translation": first_calls,
+        "requests_after_editing_one_section": first_calls_after_edit,
+        "languages": languages,
+        "languages_one_after_another_s": round(serial_languages_s, 3),
+        "languages_fan_out_s": round(fan_out_s, 3),
+    }, indent=2))
+    executor.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,391 @@
+"""End-to-end load test of the web app against the mock OpenRouter server.
+
+Starts benchmarks/mock_openrouter.py in-process and --workers app processes
+(each a threaded werkzeug server sharing one secret key, session directory,
+content store and artifact database, as gunicorn workers would). Simulated
+users then walk the real flow over HTTP, each with their own cookie jar and
+sticky to one worker: index -> /generate_ideas (random topic) ->
+/generate_content (random idea) -> /translate_content. With --stream the
+content and translation steps go through the SSE endpoints and /finalize,
+like the browser does.
+
+Reports throughput, p50/p95/p99 latency per endpoint, errors, memory per
+worker (RSS and peak RSS) and disk I/O per worker, plus what the session and
+content stores hold afterwards. The app's own environment variables
+(SESSION_BACKEND, LLM_CACHE_ENABLED, ...) pass through to the workers.
+
+    python benchmarks/load_test.py --workers 2 --users 8 --flows-per-user 10 --output results.json
+    python benchmarks/load_test.py --write-baseline benchmarks/baseline.json
+    python benchmarks/load_test.py --baseline benchmarks/baseline.json --tolerance 0.25  # exits 1 on regression
+"""
+import argparse
+import html
+import json
+import os
+import random
+import re
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mock_openrouter import MockOpenRouter  # noqa: E402
+from telemetry import percentile  # noqa: E402
+
+ERROR_FLASH = re.compile(r'<li class="error">')
+STREAM_URLS = re.compile(r'streamInto\("([^"]+)",\s*"([^"]+)"')  # (stream URL, finalize URL) in content.html
+MEMORY_SAMPLE_SECONDS = 0.25
+REQUEST_TIMEOUT = 120
+MIN_LATENCY_REGRESSION_MS = 50  # fast endpoints jitter by more than the tolerance; ignore changes below this
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+# --- Worker processes ---
+def serve_worker(port):
+    from werkzeug.serving import run_simple
+    from app import app
+    run_simple("127.0.0.1", port, app, threaded=True)
+
+
+def start_workers(args, mock_base_url, data_dir):
+    env = dict(os.environ)
+    env.update({
+        "OPENROUTER_BASE_URL": mock_base_url,
+        "OPENROUTER_API_KEY": "mock",
+        "FLASK_SECRET_KEY": "load-test-secret",  # shared, so any worker can read any session
+        "SESSION_FILE_DIR": os.path.join(data_dir, "flask_session"),
+        "CONTENT_STORE_DIR": os.path.join(data_dir, "content_store"),
+        "ARTIFACT_DB_PATH": os.path.join(data_dir, "artifacts.sqlite3"),
+        "TRANSLATION_LANGUAGES": ",".join(args.languages),
+        "STREAM_RESPONSES": "true",
+        "PYTHONUNBUFFERED": "1",
+    })
+    workers = []
+    for index in range(args.workers):
+        port = free_port()
+        log = open(os.path.join(data_dir, f"worker-{index}.log"), "w")
+        process = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--serve-worker", str(port)],
+                                   cwd=ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        workers.append({"process": process, "url": f"http://127.0.0.1:{port}", "log": log, "peak_rss_kb": 0})
+
+    deadline = time.monotonic() + 60
+    for worker in workers:
+        while True:
+            if worker["process"].poll() is not None:
+                raise RuntimeError(f"Worker exited during startup; see {worker['log'].name}")
+            try:
+                requests.get(worker["url"] + "/", timeout=2)
+                break
+            except requests.exceptions.ConnectionError:
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Worker did not start within 60s; see {worker['log'].name}")
+                time.sleep(0.1)
+    return workers
+
+
+def stop_workers(workers):
+    for worker in workers:
+        worker["process"].terminate()
+    for worker in workers:
+        try:
+            worker["process"].wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            worker["process"].kill()
+        worker["log"].close()
+
+
+def proc_fields(pid, name):
+    fields = {}
+    try:
+        with open(f"/proc/{pid}/{name}") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                fields[key.strip()] = value.split()[0] if value.split() else ""
+    except OSError:
+        pass  # not Linux, or the process is gone
+    return fields
+
+
+def sample_memory(workers, stop):
+    while not stop.wait(MEMORY_SAMPLE_SECONDS):
+        for worker in workers:
+            rss_kb = int(proc_fields(worker["process"].pid, "status").get("VmRSS", 0))
+            worker["peak_rss_kb"] = max(worker["peak_rss_kb"], rss_kb)
+
+
+def dir_usage(directory):
+    files, total = 0, 0
+    for dirpath, _, filenames in os.walk(directory):
+        for name in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+                files += 1
+            except OSError:
+                continue
+    return {"files": files, "bytes": total}
+
+
+# --- Simulated users ---
+class User:
+    def __init__(self, base_url, args, rng, timings, errors, lock):
+        self.base_url = base_url
+        self.args = args
+        self.rng = rng
+        self.http = requests.Session()  # its own cookie jar: one browser session
+        self.timings = timings
+        self.errors = errors
+        self.lock = lock
+
+    def record(self, endpoint, seconds, ok):
+        with self.lock:
+            self.timings.setdefault(endpoint, []).append(seconds)
+            if not ok:
+                self.errors[endpoint] = self.errors.get(endpoint, 0) + 1
+
+    def request(self, endpoint, method, path, **kwargs):
+        started = time.perf_counter()
+        try:
+            response = self.http.request(method, self.base_url + path, timeout=REQUEST_TIMEOUT, **kwargs)
+            body = response.text
+            ok = response.status_code < 400 and not ERROR_FLASH.search(body)
+        except requests.exceptions.RequestException:
+            body, ok = "", False
+        self.record(endpoint, time.perf_counter() - started, ok)
+        return ok, body
+
+    def stream(self, endpoint, path):
+        # Reads the SSE stream to its end like the page's EventSource; returns the "done" payload.
+        started = time.perf_counter()
+        event, result = None, None
+        try:
+            with self.http.get(self.base_url + path, timeout=REQUEST_TIMEOUT, stream=True) as response:
+                for line in response.iter_lines(decode_unicode=True):
+                    if line.startswith("event:"):
+                        event = line[6:].strip()
+                    elif line.startswith("data:") and event in ("done", "failed"):
+                        result = json.loads(line[5:]) if event == "done" else None
+                        break
+        except (requests.exceptions.RequestException, ValueError):
+            result = None
+        self.record(endpoint, time.perf_counter() - started, result is not None)
+        return result
+
+    def think(self):
+        if self.args.think_ms:
+            time.sleep(self.rng.uniform(0.5, 1.5) * self.args.think_ms / 1000)
+
+    def flow(self, topics):
+        """One index -> ideas -> content -> translation walk; True if every step succeeded."""
+        ok, _ = self.request("index", "GET", "/")
+        if not ok:
+            return False
+        self.think()
+        ok, _ = self.request("generate_ideas", "POST", "/generate_ideas",
+                             data={"topic_id": self.rng.choice(topics)})
+        if not ok:
+            return False
+        self.think()
+        idea = str(self.rng.randrange(5))
+        languages = self.args.languages
+        if not self.args.stream:
+            ok, _ = self.request("generate_content", "POST", "/generate_content", data={"selected_idea_index": idea})
+            if not ok:
+                return False
+            self.think()
+            ok, _ = self.request("translate_content", "POST", "/translate_content", data={"language": languages})
+            return ok
+
+        ok, shell = self.request("generate_content", "POST", "/generate_content",
+                                 data={"selected_idea_index": idea, "stream": "1"})
+        urls = STREAM_URLS.search(shell)
+        if not ok or not urls:
+            return False
+        result = self.stream("generate_content/stream", html.unescape(urls.group(1)))
+        if result is None:
+            return False
+        ok, _ = self.request("generate_content/finalize", "POST", html.unescape(urls.group(2)), json=result)
+        if not ok:
+            return False
+        self.think()
+        ok, shell = self.request("translate_content", "POST", "/translate_content",
+                                 data={"language": languages, "stream": "1"})
+        urls = STREAM_URLS.search(shell)
+        if not ok or not urls:
+            return False
+        result = self.stream("translate_content/stream", html.unescape(urls.group(1)))
+        if result is None or result.get("errors"):
+            return False
+        ok, _ = self.request("translate_content/finalize", "POST", html.unescape(urls.group(2)), json=result)
+        return ok
+
+
+def run_load(args, workers, topics):
+    timings, errors, lock = {}, {}, threading.Lock()
+    outcomes = []
+    rng = random.Random(args.seed)
+
+    def one_user(index):
+        user = User(workers[index % len(workers)]["url"], args, random.Random(rng.random()), timings, errors, lock)
+        return [user.flow(topics) for _ in range(args.flows_per_user)]
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.users) as executor:
+        for results in executor.map(one_user, range(args.users)):
+            outcomes.extend(results)
+    return timings, errors, outcomes, time.perf_counter() - started
+
+
+# --- Report and baseline ---
+def build_report(args, timings, errors, outcomes, wall_seconds, workers, io_before, data_dir, mock):
+    requests_total = sum(len(values) for values in timings.values())
+    report = {
+        "config": {"workers": args.workers, "users": args.users, "flows_per_user": args.flows_per_user,
+                   "stream": args.stream, "languages": args.languages, "latency": args.latency,
+                   "think_ms": args.think_ms, "malformed_probability": args.malformed_probability,
+                   "rate_limit_probability": args.rate_limit_probability,
+                   "server_error_probability": args.server_error_probability},
+        "flows": len(outcomes),
+        "flows_failed": outcomes.count(False),
+        "error_rate": round(outcomes.count(False) / len(outcomes), 4) if outcomes else 0.0,
+        "wall_s": round(wall_seconds, 2),
+        "throughput_flows_per_s": round(outcomes.count(True) / wall_seconds, 3),
+        "throughput_requests_per_s": round(requests_total / wall_seconds, 2),
+        "endpoints": {},
+        "workers": [],
+        "stores": {"sessions": dir_usage(os.path.join(data_dir, "flask_session")),
+                   "content": dir_usage(os.path.join(data_dir, "content_store"))},
+        "upstream": mock.stats(),
+    }
+    for endpoint, values in sorted(timings.items()):
+        report["endpoints"][endpoint] = {
+            "requests": len(values),
+            "errors": errors.get(endpoint, 0),
+            "p50_ms": round(percentile(values, 50) * 1000, 1),
+            "p95_ms": round(percentile(values, 95) * 1000, 1),
+            "p99_ms": round(percentile(values, 99) * 1000, 1),
+        }
+    for worker, before in zip(workers, io_before):
+        pid = worker["process"].pid
+        status, io = proc_fields(pid, "status"), proc_fields(pid, "io")
+        report["workers"].append({
+            "rss_mb": round(int(status.get("VmRSS", 0)) / 1024, 1),
+            "peak_rss_mb": round(max(worker["peak_rss_kb"], int(status.get("VmHWM", 0))) / 1024, 1),
+            "disk_write_kb": round((int(io.get("write_bytes", 0)) - int(before.get("write_bytes", 0))) / 1024, 1),
+            "disk_read_kb": round((int(io.get("read_bytes", 0)) - int(before.get("read_bytes", 0))) / 1024, 1),
+        })
+    flows = max(1, report["flows"])
+    report["stores"]["sessions"]["bytes_per_flow"] = round(report["stores"]["sessions"]["bytes"] / flows)
+    report["stores"]["disk_write_kb_per_flow"] = round(sum(w["disk_write_kb"] for w in report["workers"]) / flows, 2)
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """Regressions beyond `tolerance` (a fraction) against a baseline report, as messages."""
+    regressions = []
+
+    def check(name, current, previous, higher_is_worse=True, min_delta=0):
+        if current is None or previous is None or previous == 0 or abs(current - previous) < min_delta:
+            return
+        change = (current - previous) / previous
+        if (change > tolerance) if higher_is_worse else (change < -tolerance):
+            regressions.append(f"{name}: {previous} -> {current} ({change:+.0%})")
+
+    if report["config"] != baseline.get("config"):
+        print("Warning: the baseline was recorded with a different configuration; comparisons may not mean much.")
+    check("throughput_flows_per_s", report["throughput_flows_per_s"], baseline.get("throughput_flows_per_s"),
+          higher_is_worse=False)
+    for endpoint, stats in report["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(endpoint, {})
+        check(f"{endpoint} p95_ms", stats["p95_ms"], previous.get("p95_ms"), min_delta=MIN_LATENCY_REGRESSION_MS)
+    peak = max(w["peak_rss_mb"] for w in report["workers"])
+    check("peak_rss_mb", peak, max((w["peak_rss_mb"] for w in baseline.get("workers", [])), default=None))
+    check("session bytes_per_flow", report["stores"]["sessions"]["bytes_per_flow"],
+          baseline.get("stores", {}).get("sessions", {}).get("bytes_per_flow"))
+    if report["error_rate"] > baseline.get("error_rate", 0) + 0.01:
+        regressions.append(f"error_rate: {baseline.get('error_rate', 0)} -> {report['error_rate']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=2, help="App processes")
+    parser.add_argument("--users", type=int, default=8, help="Concurrent simulated users")
+    parser.add_argument("--flows-per-user", type=int, default=10)
+    parser.add_argument("--stream", action="store_true", help="Use the streaming endpoints and /finalize")
+    parser.add_argument("--languages", default="fr", help="Comma-separated translation targets")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Average pause between a user's steps")
+    parser.add_argument("--latency", default="lognormal:150:0.25", help="Mock model latency (see mock_openrouter.py)")
+    parser.add_argument("--stream-chunk-ms", type=float, default=2.0)
+    parser.add_argument("--malformed-probability", type=float, default=0.0)
+    parser.add_argument("--rate-limit-probability", type=float, default=0.0)
+    parser.add_argument("--server-error-probability", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--data-dir", help="Where the workers keep sessions and stores (default: a temporary directory)")
+    parser.add_argument("--output", help="Write the report as JSON to this file")
+    parser.add_argument("--write-baseline", metavar="PATH", help="Write the report as the new baseline")
+    parser.add_argument("--baseline", metavar="PATH", help="Compare against this baseline; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed relative change against the baseline")
+    parser.add_argument("--serve-worker", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve_worker:
+        serve_worker(args.serve_worker)
+        return
+    args.languages = [code.strip() for code in args.languages.split(",") if code.strip()]
+
+    from topic_catalog import topic_catalog_from_env
+    topics = [topic["id"] for topic in topic_catalog_from_env().all()]  # the workers load the same catalog
+    data_dir = args.data_dir or tempfile.mkdtemp(prefix="load-test-")
+    os.makedirs(data_dir, exist_ok=True)
+    mock = MockOpenRouter(latency_ms=args.latency, seed=args.seed, stream_chunk_ms=args.stream_chunk_ms,
+                          malformed_probability=args.malformed_probability,
+                          rate_limit_probability=args.rate_limit_probability,
+                          server_error_probability=args.server_error_probability).start()
+    workers = start_workers(args, mock.base_url, data_dir)
+    stop = threading.Event()
+    try:
+        io_before = [proc_fields(worker["process"].pid, "io") for worker in workers]
+        threading.Thread(target=sample_memory, args=(workers, stop), daemon=True).start()
+        timings, errors, outcomes, wall_seconds = run_load(args, workers, topics)
+        stop.set()
+        report = build_report(args, timings, errors, outcomes, wall_seconds, workers, io_before, data_dir, mock)
+    finally:
+        stop.set()
+        stop_workers(workers)
+        mock.shutdown()
+        if not args.data_dir:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    print(json.dumps(report, indent=2))
+    for path in (args.output, args.write_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+                f.write("\n")
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+"""A local stand-in for the OpenRouter chat completions API.
+
+Answers the app's prompts (ideas, content, translation) with canned but
+well-formed responses after an injected delay, which can differ per model,
+follow a distribution and include a slow tail. `stream: true` requests get
+Server-Sent Events like the real API. Faults can be injected too: malformed
+JSON answers, 429s with Retry-After and 5xx errors. Used by the benchmarks and
+the load test; it can also back the app itself:
+
+    python benchmarks/mock_openrouter.py --port 8099 --latency lognormal:300:0.4 \\
+        --model-latency deepseek/deepseek-chat=800 --tail-probability 0.05 --tail-ms 5000 \\
+        --malformed-probability 0.02 --rate-limit-probability 0.01 --server-error-probability 0.01
+    OPENROUTER_BASE_URL=http://127.0.0.1:8099/api/v1 OPENROUTER_API_KEY=mock python app.py
+
+Latencies are milliseconds: a plain number, "fixed:MS", "uniform:LOW:HIGH"
+or "lognormal:MEDIAN:SIGMA".
+"""
+import argparse
+import json
+import math
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ARTICLE = "# Why Passwords Still Matter\n\n" + "\n\n".join(
+    f"## Section {i}\n\n" + "Strong passwords are long, unique and kept in a password manager. " * 6
+    for i in range(1, 6))
+STREAM_CHUNK_CHARS = 40
+
+
+def canned_answer(prompt_messages):
+    """A plausible reply for one of the app's prompts (see prompts.py)."""
+    system_prompt = prompt_messages[0]["content"] if prompt_messages else ""
+    user_prompt = prompt_messages[-1]["content"] if prompt_messages else ""
+    if "JSON" not in system_prompt and "markdown" in system_prompt.lower():
+        return "TRANSLATED " + user_prompt  # an article section (translation.py)
+    if "blog_link_tag" in system_prompt and "blog_article" not in system_prompt:
+        return json.dumps({"linkedin_post": "Les mots de passe comptent. https://myblogname.com/mots-de-passe",
+                           "blog_link_tag": "mots-de-passe"})
+    if "blog_article" in system_prompt or "linkedin_post" in system_prompt:
+        return json.dumps({"linkedin_post": "Passwords matter. Read more: https://myblogname.com/passwords",
+                           "blog_article": ARTICLE})
+    return json.dumps([{"title": f"Idea {i}", "summary": f"Summary {i}.", "slug": f"idea-{i}"} for i in range(5)])
+
+
+def malformed(content):
+    """The kind of broken JSON models send: cut off mid-way, or chatter in front of an unclosed fence."""
+    if not content.lstrip().startswith(("{", "[")):
+        return content  # plain-text answers (article sections) have no JSON to break
+    return content[:len(content) // 2] if len(content) % 2 else "Sure! Here it is:\n```json\n" + content[:-1]
+
+
+def parse_latency(spec):
+    """Turns a latency spec (see the module docstring) into a function of a Random returning milliseconds."""
+    if isinstance(spec, (int, float)):
+        return lambda rng: float(spec)
+    kind, _, rest = str(spec).partition(":")
+    numbers = [float(number) for number in rest.split(":")] if rest else []
+    if not rest:
+        value = float(kind)
+        return lambda rng: value
+    if kind == "fixed" and len(numbers) == 1:
+        return lambda rng: numbers[0]
+    if kind == "uniform" and len(numbers) == 2:
+        return lambda rng: rng.uniform(numbers[0], numbers[1])
+    if kind == "lognormal" and len(numbers) == 2:
+        return lambda rng: rng.lognormvariate(math.log(max(numbers[0], 0.001)), numbers[1])
+    raise ValueError(f"Unknown latency spec '{spec}'. Use MS, fixed:MS, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA")
+
+
+class MockOpenRouter(ThreadingHTTPServer):
+    """Threaded mock server; `model_latency_ms` overrides `latency_ms` per model.
+
+    With probability `tail_probability` a call takes `tail_ms` instead, which
+    models a provider that is occasionally very slow (only the `tail_models`,
+    when given). Streamed answers are sent in chunks `stream_chunk_ms` apart.
+    The fault probabilities apply per call, after the delay.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency_ms=0.0, model_latency_ms=None, tail_probability=0.0, tail_ms=0.0,
+                 tail_models=None, seed=None, stream_chunk_ms=0.0, malformed_probability=0.0,
+                 rate_limit_probability=0.0, retry_after_seconds=1, server_error_probability=0.0):
+        super().__init__(("127.0.0.1", port), MockHandler)
+        self.latency = parse_latency(latency_ms)
+        self.model_latency = {model: parse_latency(spec) for model, spec in (model_latency_ms or {}).items()}
+        self.tail_probability = tail_probability
+        self.tail_ms = tail_ms
+        self.tail_models = set(tail_models) if tail_models else None
+        self.stream_chunk_ms = stream_chunk_ms
+        self.malformed_probability = malformed_probability
+        self.rate_limit_probability = rate_limit_probability
+        self.retry_after_seconds = retry_after_seconds
+        self.server_error_probability = server_error_probability
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls_by_model = {}
+        self.injected = {"malformed": 0, "rate_limited": 0, "server_errors": 0, "streamed": 0}
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/api/v1"
+
+    def delay_for(self, model):
+        with self._lock:
+            self.calls_by_model[model] = self.calls_by_model.get(model, 0) + 1
+            slow = (self._random.random() < self.tail_probability
+                    and (self.tail_models is None or model in self.tail_models))
+            latency_ms = self.tail_ms if slow else self.model_latency.get(model, self.latency)(self._random)
+        return max(0.0, latency_ms) / 1000
+
+    def fault_for(self):
+        """None, or which fault to inject into the next answer: "rate_limited", "server_errors" or "malformed"."""
+        with self._lock:
+            roll = self._random.random()
+            for fault, probability in (("rate_limited", self.rate_limit_probability),
+                                       ("server_errors", self.server_error_probability),
+                                       ("malformed", self.malformed_probability)):
+                if roll < probability:
+                    return fault
+                roll -= probability
+        return None
+
+    def count(self, counter):
+        with self._lock:
+            self.injected[counter] += 1
+
+    def stats(self):
+        with self._lock:
+            return {"calls": sum(self.calls_by_model.values()), "calls_by_model": dict(self.calls_by_model),
+                    **self.injected}
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True  # headers and body are separate writes; don't let them wait on delayed ACKs
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        messages = body.get("messages") or []
+        model = body.get("model")
+        time.sleep(self.server.delay_for(model))
+
+        fault = self.server.fault_for()
+        if fault == "rate_limited":
+            self.server.count(fault)
+            self._send_json(429, {"error": {"message": "Rate limit exceeded", "code": 429}},
+                            {"Retry-After": str(self.server.retry_after_seconds)})
+            return
+        if fault == "server_errors":
+            self.server.count(fault)
+            status = self.server._random.choice((500, 502, 503))
+            self._send_json(status, {"error": {"message": "Upstream provider error", "code": status}})
+            return
+
+        content = canned_answer(messages)
+        if fault == "malformed":
+            self.server.count(fault)
+            content = malformed(content)
+        prompt_tokens = sum(len(message.get("content") or "") for message in messages) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                 "total_tokens": prompt_tokens + len(content) // 4}
+        if body.get("stream"):
+            self.server.count("streamed")
+            self._send_stream(model, content, usage)
+            return
+        self._send_json(200, {
+            "id": "gen-mock", "model": model,
+            "choices": [{"message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        })
+
+    def _send_json(self, status, payload, headers=None):
+        out = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(out)))
+        self.end_headers()
+        self.wfile.write(out)
+
+    def _send_stream(self, model, content, usage):
+        # Chunked SSE like OpenRouter: a keep-alive comment, content deltas, usage on the last chunk, [DONE].
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def send(text):
+            data = text.encode("utf-8")
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        send(": OPENROUTER PROCESSING\n\n")
+        for start in range(0, len(content), STREAM_CHUNK_CHARS):
+            if start and self.server.stream_chunk_ms:
+                time.sleep(self.server.stream_chunk_ms / 1000)
+            delta = {"choices": [{"delta": {"content": content[start:start + STREAM_CHUNK_CHARS]}}]}
+            send(f"data: {json.dumps(delta)}\n\n")
+        final = {"id": "gen-mock", "model": model, "choices": [{"delta": {}, "finish_reason": "stop"}], "usage": usage}
+        send(f"data: {json.dumps(final)}\n\n")
+        send("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, *args):
+        pass
+
+
+def parse_model_latencies(values):
+    latencies = {}
+    for value in values or []:
+        model, _, spec = value.rpartition("=")
+        latencies[model] = spec
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8099)
+    parser.add_argument("--latency", "--latency-ms", dest="latency", default="0",
+                        help="Delay before every answer (MS, fixed:MS, uniform:LOW:HIGH or lognormal:MEDIAN:SIGMA)")
+    parser.add_argument("--model-latency", action="append", metavar="MODEL=SPEC", help="Delay for one model (repeatable)")
+    parser.add_argument("--tail-probability", type=float, default=0.0, help="Share of calls that take --tail-ms instead")
+    parser.add_argument("--tail-ms", type=float, default=0.0)
+    parser.add_argument("--tail-model", action="append", help="Only this model has the slow tail (repeatable)")
+    parser.add_argument("--stream-chunk-ms", type=float, default=0.0, help="Delay between streamed chunks")
+    parser.add_argument("--malformed-probability", type=float, default=0.0, help="Share of JSON answers sent broken")
+    parser.add_argument("--rate-limit-probability", type=float, default=0.0, help="Share of calls answered with 429")
+    parser.add_argument("--retry-after-seconds", type=int, default=1, help="Retry-After sent with injected 429s")
+    parser.add_argument("--server-error-probability", type=float, default=0.0, help="Share of calls answered with 5xx")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+    server = MockOpenRouter(args.port, args.latency, parse_model_latencies(args.model_latency),
+                            args.tail_probability, args.tail_ms, args.tail_model, seed=args.seed,
+                            stream_chunk_ms=args.stream_chunk_ms, malformed_probability=args.malformed_probability,
+                            rate_limit_probability=args.rate_limit_probability,
+                            retry_after_seconds=args.retry_after_seconds,
+                            server_error_probability=args.server_error_probability)
+    print(f"Mock OpenRouter listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
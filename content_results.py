@@ -0,0 +1,76 @@
+from languages import LANGUAGES
+
+# --- Content Result Helpers ---
+# Default (error placeholder) results and post-processing of parsed model
+# output. Shared by the web routes (regular and streaming) and the batch CLI.
+
+
+def default_generated_content(selected_idea, current_topic_detail, blog_domain):
+    blog_link_tag_en = selected_idea.get('slug', 'my-default-blog-post')
+    return {
+        "linkedin_post_en": "Error: Could not generate English LinkedIn post.",
+        "blog_article_en": "Error: Could not generate English blog article.",
+        "blog_link_tag_en": blog_link_tag_en,
+        "full_blog_url_en": f"https://{blog_domain}/{blog_link_tag_en}",
+        "idea_title": selected_idea.get('title', "N/A"),
+        "topic_title": current_topic_detail.get('title', "N/A")
+    }
+
+
+def apply_generated_fields(generated_content_en, parsed_content):
+    full_blog_url_en = generated_content_en["full_blog_url_en"]
+    generated_content_en["linkedin_post_en"] = parsed_content.get("linkedin_post", generated_content_en["linkedin_post_en"])
+    generated_content_en["blog_article_en"] = parsed_content.get("blog_article", generated_content_en["blog_article_en"])
+
+    if len(generated_content_en["blog_article_en"]) < 200 and \
+       ("note:" in generated_content_en["blog_article_en"].lower() or \
+        "summary." in generated_content_en["blog_article_en"].lower() or \
+        "truncated" in generated_content_en["blog_article_en"].lower()):
+        print(f"Warning: Retrieved blog_article (key 'blog_article') from AI seems to be a short note/summary, not the full content. Content snippet: '{generated_content_en['blog_article_en'][:150]}...'")
+
+    if "Error:" not in generated_content_en["linkedin_post_en"] and full_blog_url_en not in generated_content_en["linkedin_post_en"]:
+         generated_content_en["linkedin_post_en"] += f"\n\nRead more: {full_blog_url_en}"
+    return generated_content_en
+
+
+def default_translated_content(blog_domain, language="fr"):
+    return {
+        "language": language,
+        "language_name": LANGUAGES[language]["name"],
+        "linkedin_post": "Error: Could not translate LinkedIn post.",
+        "blog_article": "Error: Could not translate blog article.",
+        "blog_link_tag": "error-slug",
+        "full_blog_url": f"https://{blog_domain}/error-slug"
+    }
+
+
+def apply_translated_fields(translated_data, parsed_translation, english_content, blog_domain):
+    translated_data["linkedin_post"] = parsed_translation.get("linkedin_post", translated_data["linkedin_post"])
+    translated_data["blog_article"] = parsed_translation.get("blog_article", translated_data["blog_article"])
+    translated_data["blog_link_tag"] = parsed_translation.get("blog_link_tag", translated_data["blog_link_tag"])
+    
+    translated_data["full_blog_url"] = f"https://{blog_domain}/{translated_data['blog_link_tag']}"
+    
+    if "Error:" not in translated_data["linkedin_post"] and \
+       translated_data["full_blog_url"] not in translated_data["linkedin_post"]:
+        original_en_url = english_content.get('full_blog_url_en', '') 
+        if original_en_url and original_en_url in translated_data["linkedin_post"]:
+             translated_data["linkedin_post"] = translated_data["linkedin_post"].replace(original_en_url, translated_data["full_blog_url"])
+        elif translated_data["full_blog_url"] not in translated_data["linkedin_post"]: 
+             read_more = LANGUAGES[translated_data["language"]]["read_more"]
+             translated_data["linkedin_post"] += f"\n\n{read_more} {translated_data['full_blog_url']}"
+    return translated_data
+
+
+def normalize_translation(translated_data):
+    # Translations saved before multi-language support were French-only with *_fr keys.
+    if "linkedin_post_fr" not in translated_data:
+        return translated_data
+    return {
+        "language": "fr",
+        "language_name": LANGUAGES["fr"]["name"],
+        "linkedin_post": translated_data.get("linkedin_post_fr", ""),
+        "blog_article": translated_data.get("blog_article_fr", ""),
+        "blog_link_tag": translated_data.get("blog_link_tag_fr", ""),
+        "full_blog_url": translated_data.get("full_blog_url_fr", ""),
+    }
@@ -0,0 +1,211 @@
+import json
+import os
+import threading
+import time
+import uuid
+import zlib
+
+
+# --- Backends ---
+# A backend stores opaque compressed blobs under a key with a time-to-live.
+
+class FileContentBackend:
+    """One file per blob under `directory`; expired files are removed by cleanup()."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key)
+
+    def set(self, key, blob, ttl_seconds):
+        path = self._path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"  # concurrent writers of one key
+        with open(tmp_path, "wb") as f:
+            f.write(f"{time.time() + ttl_seconds:.0f}\n".encode("ascii"))
+            f.write(blob)
+        os.replace(tmp_path, path)
+
+    def get(self, key):
+        try:
+            with open(self._path(key), "rb") as f:
+                header, _, blob = f.read().partition(b"\n")
+        except OSError:
+            return None
+        try:
+            # A corrupt header counts as a miss, like an expired entry.
+            expired = float(header or 0) <= time.time()
+        except ValueError:
+            expired = True
+        if expired:
+            self.delete(key)
+            return None
+        return blob
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except OSError:
+            pass
+
+    def cleanup(self):
+        removed = 0
+        now = time.time()
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path, "rb") as f:
+                    header = f.readline()
+                if float(header or 0) <= now:
+                    os.remove(path)
+                    removed += 1
+            except (OSError, ValueError):
+                continue
+        return removed
+
+
+class RedisContentBackend:
+    """Stores blobs in Redis (or anything with the same get/set/delete API); Redis expires keys itself."""
+
+    def __init__(self, client, key_prefix="content:"):
+        self.client = client
+        self.key_prefix = key_prefix
+
+    def set(self, key, blob, ttl_seconds):
+        self.client.set(self.key_prefix + key, blob, ex=int(ttl_seconds))
+
+    def get(self, key):
+        return self.client.get(self.key_prefix + key)
+
+    def delete(self, key):
+        self.client.delete(self.key_prefix + key)
+
+    def cleanup(self):
+        return 0
+
+
+class LocalRedis:
+    """In-process stand-in for the subset of the redis-py client used here.
+
+    Handy for development and benchmarks (REDIS_URL="local://"); state is
+    per process, so it does not replace a real Redis across workers.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def set(self, name, value, ex=None):
+        expires_at = time.time() + ex if ex else None
+        with self._lock:
+            self._data[name] = (value, expires_at)
+        return True
+
+    def get(self, name):
+        with self._lock:
+            entry = self._data.get(name)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[name]
+                return None
+            return value
+
+    def delete(self, *names):
+        with self._lock:
+            return sum(1 for name in names if self._data.pop(name, None) is not None)
+
+
+def redis_from_url(redis_url):
+    if redis_url.startswith("local://"):
+        return LocalRedis()
+    import redis  # optional dependency, only needed for a real Redis server
+    return redis.Redis.from_url(redis_url)
+
+
+# --- Content Store ---
+
+class ContentStore:
+    """Keeps large generated artifacts out of the session.
+
+    put() compresses a JSON-serialisable value and returns a short reference
+    to keep in the session; get() resolves it. Entries expire after
+    `ttl_seconds`.
+    """
+
+    def __init__(self, backend, ttl_seconds=6 * 3600, compress_level=6):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.compress_level = compress_level
+        self._lock = threading.Lock()
+        self._counters = {"puts": 0, "gets": 0, "misses": 0, "raw_bytes": 0, "stored_bytes": 0, "expired_removed": 0}
+        self._cleanup_thread = None
+
+    def put(self, value, ref=None, ttl_seconds=None):
+        # `ref` overwrites a known key (e.g. a job record) instead of creating a new one.
+        raw = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        blob = zlib.compress(raw, self.compress_level)
+        ref = ref or uuid.uuid4().hex
+        self.backend.set(ref, blob, ttl_seconds or self.ttl_seconds)
+        with self._lock:
+            self._counters["puts"] += 1
+            self._counters["raw_bytes"] += len(raw)
+            self._counters["stored_bytes"] += len(blob)
+        return ref
+
+    def get(self, ref):
+        blob = self.backend.get(ref)
+        value = None
+        if blob is not None:
+            try:
+                value = json.loads(zlib.decompress(blob))
+            except (zlib.error, ValueError):  # truncated or corrupt: a miss, and dropped
+                self.backend.delete(ref)
+                blob = None
+        with self._lock:
+            self._counters["gets"] += 1
+            if blob is None:
+                self._counters["misses"] += 1
+        return value
+
+    def delete(self, ref):
+        self.backend.delete(ref)
+
+    def cleanup(self):
+        removed = self.backend.cleanup()
+        with self._lock:
+            self._counters["expired_removed"] += removed
+        return removed
+
+    def start_background_cleanup(self, interval_seconds):
+        if self._cleanup_thread is not None or interval_seconds <= 0:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval_seconds)
+                try:
+                    self.cleanup()
+                except OSError as e:
+                    print(f"Content store cleanup failed: {e}")
+
+        self._cleanup_thread = threading.Thread(target=run, name="content-store-cleanup", daemon=True)
+        self._cleanup_thread.start()
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
+
+
+def content_store_from_env(default_directory):
+    """Build the content store from CONTENT_STORE_* / REDIS_URL environment variables."""
+    backend_name = os.getenv("CONTENT_STORE_BACKEND", "filesystem")
+    if backend_name == "redis":
+        backend = RedisContentBackend(redis_from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0")))
+    else:
+        backend = FileContentBackend(os.getenv("CONTENT_STORE_DIR") or default_directory)
+    store = ContentStore(backend, ttl_seconds=int(os.getenv("CONTENT_STORE_TTL_SECONDS", str(6 * 3600))))
+    store.start_background_cleanup(int(os.getenv("CONTENT_STORE_CLEANUP_INTERVAL", "600")))
+    return store
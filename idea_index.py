@@ -0,0 +1,266 @@
+import array
+import hashlib
+import operator
+import os
+import random
+import threading
+import time
+import zlib
+
+from artifact_store import artifact_id_for, thread_connection
+from topic_catalog import tokenize
+
+# --- Idea Similarity Index ---
+# Idea lists keep coming back with near-identical titles and slugs, across
+# sessions and topics. Every stored idea (title + summary + slug) gets a
+# MinHash signature, and LSH bands of that signature are kept in SQLite next
+# to the artifacts, so finding the ideas close to a new one is a handful of
+# indexed lookups on any worker instead of a scan. Ideas that were written up
+# point at their content artifact, which can be offered instead of paying for
+# another generation.
+
+NUM_PERM = 64
+BAND_ROWS = 2           # 32 bands: ideas with 0.3+ similarity share one ~95% of the time
+TITLE_WEIGHT = 3        # title and slug words count three times as much as summary words
+MAX_CANDIDATES = 300    # candidates sharing the most bands are compared in full; the rest are too far off
+_PRIME = (1 << 61) - 1
+# Changing the constants above (or the seed) invalidates stored signatures: delete the idea tables to rebuild.
+_rng = random.Random(1)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+
+STOPWORDS = frozenset("""a an and are as at be by for from how in into is it its of on or our that the this to
+vs what when why with without your you we can do does not""".split())
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS ideas (
+    key TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    slug TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    content_id TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ideas_slug ON ideas(slug);
+CREATE TABLE IF NOT EXISTS idea_bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    key TEXT NOT NULL,
+    PRIMARY KEY (band, bucket, key)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS idea_index_sources (
+    artifact_id TEXT PRIMARY KEY
+) WITHOUT ROWID;
+"""
+
+
+def _words(text):
+    # Lowercased content words with a naive plural strip, so "Mistakes" and "mistake" match.
+    words = []
+    for word in tokenize(text or ""):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+def shingles(idea):
+    """The weighted shingle set of an idea: title/slug words and word pairs, plus summary words."""
+    title_words = _words(idea.get("title"))
+    slug_words = _words((idea.get("slug") or "").replace("-", " "))
+    features = set()
+    for words in (title_words, slug_words):
+        features.update(words)
+        features.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    weighted = {f"{feature}#{copy}" for feature in features for copy in range(TITLE_WEIGHT)}
+    weighted.update(f"s:{word}" for word in _words(idea.get("summary")))
+    return weighted
+
+
+def signature(idea):
+    hashes = [zlib.crc32(shingle.encode("utf-8")) for shingle in shingles(idea)] or [0]
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def similarity(signature_a, signature_b):
+    """Estimated Jaccard similarity: the share of permutations whose minimum agrees."""
+    return sum(map(operator.eq, signature_a, signature_b)) / NUM_PERM
+
+
+def band_buckets(sig):
+    buckets = []
+    for band, start in enumerate(range(0, NUM_PERM, BAND_ROWS)):
+        digest = hashlib.blake2b(array.array("Q", sig[start:start + BAND_ROWS]).tobytes(), digest_size=8).digest()
+        buckets.append((band, int.from_bytes(digest, "big", signed=True)))
+    return buckets
+
+
+def idea_key(idea):
+    return artifact_id_for("idea", {field: idea.get(field) or "" for field in ("title", "summary", "slug")})
+
+
+def same_title(title_a, title_b):
+    return _words(title_a) == _words(title_b)
+
+
+class IdeaIndex:
+    """MinHash/LSH near-duplicate index over ideas, stored in the artifact database.
+
+    `threshold` is the estimated similarity from which two ideas count as the
+    same idea. Safe to share between threads; several workers can share the
+    database file.
+    """
+
+    def __init__(self, db_path, threshold=0.3):
+        self.db_path = db_path
+        self.threshold = threshold
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._counters = {"indexed": 0, "linked": 0, "lookups": 0, "candidates": 0, "matches": 0,
+                          "slug_collisions": 0}
+        with self._connect() as conn:
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return thread_connection(self._local, self.db_path)
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    def add(self, idea, content_id=None):
+        """Index `idea` (a no-op when already indexed); `content_id` links it to the article written from it."""
+        key = idea_key(idea)
+        sig = signature(idea)
+        conn = self._connect()
+        with conn:
+            inserted = conn.execute(
+                "INSERT OR IGNORE INTO ideas (key, title, slug, signature, content_id, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (key, idea.get("title") or "", idea.get("slug") or "", array.array("Q", sig).tobytes(),
+                 content_id, time.time()),
+            ).rowcount
+            if inserted:
+                conn.executemany("INSERT OR IGNORE INTO idea_bands (band, bucket, key) VALUES (?, ?, ?)",
+                                 [(band, bucket, key) for band, bucket in band_buckets(sig)])
+            elif content_id:
+                conn.execute("UPDATE ideas SET content_id = ? WHERE key = ?", (content_id, key))
+        if inserted:
+            self._count("indexed")
+        if content_id:
+            self._count("linked")
+        return key
+
+    def add_ideas(self, ideas, artifact_id=None):
+        """Index every idea of a generated list; `artifact_id` is the stored list they came from."""
+        for idea in ideas:
+            if isinstance(idea, dict):
+                self.add(idea)
+        if artifact_id:
+            self._mark_indexed(artifact_id)
+
+    def link_content(self, idea, content_id):
+        """Records that the article `content_id` was written from `idea`."""
+        self.add(idea, content_id=content_id)
+        self._mark_indexed(content_id)
+
+    def similar(self, idea, limit=3, written_only=True):
+        """Stored ideas at or above the threshold, most similar first: [{key, title, slug, content_id, similarity}].
+
+        With `written_only`, only ideas that have an article. The idea itself
+        is left out unless it has one.
+        """
+        key = idea_key(idea)
+        sig = signature(idea)
+        buckets = band_buckets(sig)
+        where = " OR ".join(["(band = ? AND bucket = ?)"] * len(buckets))
+        conn = self._connect()
+        # Ideas sharing more bands are more alike, so only the closest MAX_CANDIDATES are read back.
+        candidate_keys = [row["key"] for row in conn.execute(
+            f"SELECT key FROM idea_bands WHERE {where} GROUP BY key ORDER BY COUNT(*) DESC LIMIT ?",
+            [value for bucket in buckets for value in bucket] + [MAX_CANDIDATES],
+        )]
+        rows = conn.execute(
+            "SELECT key, title, slug, signature, content_id FROM ideas "
+            f"WHERE key IN ({', '.join('?' * len(candidate_keys))})",
+            candidate_keys,
+        ).fetchall() if candidate_keys else []
+        self._count("lookups")
+        self._count("candidates", len(rows))
+        matches = []
+        for row in rows:
+            if (written_only and not row["content_id"]) or (row["key"] == key and not row["content_id"]):
+                continue
+            score = similarity(sig, array.array("Q", row["signature"]))
+            if score >= self.threshold:
+                matches.append({"key": row["key"], "title": row["title"], "slug": row["slug"],
+                                "content_id": row["content_id"], "similarity": round(score, 2)})
+        matches.sort(key=lambda match: match["similarity"], reverse=True)
+        self._count("matches", min(len(matches), limit))
+        return matches[:limit]
+
+    def slug_owner(self, idea):
+        """The written-up idea with a different title that already uses this idea's slug (its URL), if any."""
+        slug = idea.get("slug") or ""
+        if not slug:
+            return None
+        rows = self._connect().execute(
+            "SELECT title, slug, content_id FROM ideas WHERE slug = ? AND content_id IS NOT NULL ORDER BY created_at",
+            (slug,),
+        ).fetchall()
+        for row in rows:
+            if not same_title(row["title"], idea.get("title")):
+                self._count("slug_collisions")
+                return dict(row)
+        return None
+
+    def _mark_indexed(self, artifact_id):
+        conn = self._connect()
+        with conn:
+            conn.execute("INSERT OR IGNORE INTO idea_index_sources (artifact_id) VALUES (?)", (artifact_id,))
+
+    def sync(self, artifact_store):
+        """Indexes ideas and articles stored before the index existed (or by the batch CLI). Returns the artifact count."""
+        conn = self._connect()
+        done = {row["artifact_id"] for row in conn.execute("SELECT artifact_id FROM idea_index_sources")}
+        synced = 0
+        for kind in ("ideas", "content"):
+            for artifact_id in artifact_store.ids(kind):
+                if artifact_id in done:
+                    continue
+                artifact = artifact_store.get(artifact_id, kind=kind)
+                if artifact is None:
+                    continue
+                if kind == "ideas":
+                    self.add_ideas(artifact["payload"].get("ideas") or [], artifact_id)
+                else:
+                    self._link_stored_content(artifact_id, artifact["payload"])
+                    self._mark_indexed(artifact_id)
+                synced += 1
+        return synced
+
+    def _link_stored_content(self, content_id, content):
+        # A stored article only keeps its idea's title and slug: attach it to the indexed
+        # idea with that title and slug, or index those two fields on their own.
+        title, slug = content.get("idea_title") or "", content.get("blog_link_tag_en") or ""
+        conn = self._connect()
+        with conn:
+            updated = conn.execute(
+                "UPDATE ideas SET content_id = ? WHERE slug = ? AND title = ? AND content_id IS NULL",
+                (content_id, slug, title),
+            ).rowcount
+        if updated:
+            self._count("linked")
+        else:
+            self.add({"title": title, "slug": slug}, content_id=content_id)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._counters)
+
+
+def idea_index_from_env(artifact_store):
+    """Build the index from IDEA_INDEX_* environment variables (None when disabled or without an artifact store)."""
+    if artifact_store is None or os.getenv("IDEA_INDEX_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return IdeaIndex(artifact_store.db_path, threshold=float(os.getenv("IDEA_SIMILARITY_THRESHOLD", "0.3")))
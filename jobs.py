@@ -0,0 +1,116 @@
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+
+from telemetry import percentile
+
+# --- Background Jobs ---
+# A local, in-process queue with a pool of worker threads; no external broker.
+# Job records (status, result) are written to the content store, so with a
+# shared backend (Redis, or a shared directory) any web worker can report a
+# job's status, while the process that accepted the job runs it.
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+
+class JobQueue:
+    """Runs submitted callables on `workers` background threads and tracks their status.
+
+    submit() returns a job ID immediately. While a job is queued or running,
+    submitting again with the same `dedup_key` returns the same ID instead of
+    starting a second job, so double-submits share one result (checked per
+    process; two web workers racing on the same key may each start one).
+    Threads, not processes, run the jobs because they spend their time
+    waiting on HTTP calls.
+    """
+
+    def __init__(self, store, workers=4, result_ttl_seconds=3600, latency_window=512):
+        self.store = store
+        self.result_ttl_seconds = result_ttl_seconds
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._counters = {"submitted": 0, "deduplicated": 0, "completed": 0, "failed": 0, "running": 0}
+        self._wait_seconds = deque(maxlen=latency_window)  # queued -> started
+        self._run_seconds = deque(maxlen=latency_window)   # started -> finished
+        self._threads = [threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True) for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    @staticmethod
+    def _record_key(job_id):
+        return f"job-{job_id}"
+
+    @staticmethod
+    def _dedup_key(dedup_key):
+        return f"job-key-{dedup_key}"
+
+    def _save(self, record):
+        self.store.put(record, ref=self._record_key(record["id"]), ttl_seconds=self.result_ttl_seconds)
+
+    def get(self, job_id):
+        return self.store.get(self._record_key(job_id))
+
+    def submit(self, kind, dedup_key, fn, *args):
+        with self._lock:
+            existing_id = self.store.get(self._dedup_key(dedup_key))
+            existing = self.get(existing_id) if existing_id else None
+            if existing and existing["status"] in (QUEUED, RUNNING):
+                self._counters["deduplicated"] += 1
+                return existing_id
+
+            job_id = uuid.uuid4().hex
+            record = {"id": job_id, "kind": kind, "status": QUEUED, "created_at": time.time(),
+                      "started_at": None, "finished_at": None, "result": None, "error": None}
+            self._save(record)
+            self.store.put(job_id, ref=self._dedup_key(dedup_key), ttl_seconds=self.result_ttl_seconds)
+            self._counters["submitted"] += 1
+        self._queue.put((record, fn, args))
+        return job_id
+
+    def _work(self):
+        while True:
+            record, fn, args = self._queue.get()
+            record["status"] = RUNNING
+            record["started_at"] = time.time()
+            self._save(record)
+            with self._lock:
+                self._counters["running"] += 1
+                self._wait_seconds.append(record["started_at"] - record["created_at"])
+            try:
+                record["result"] = fn(*args)
+                record["status"] = DONE
+            except Exception as e:  # keep the worker alive whatever the job raised
+                print(f"Background job {record['id']} ({record['kind']}) failed: {type(e).__name__} - {e}")
+                record["error"] = f"{type(e).__name__}: {e}"
+                record["status"] = FAILED
+            record["finished_at"] = time.time()
+            self._save(record)
+            with self._lock:
+                self._counters["running"] -= 1
+                self._counters["completed" if record["status"] == DONE else "failed"] += 1
+                self._run_seconds.append(record["finished_at"] - record["started_at"])
+            self._queue.task_done()
+
+    def stats(self):
+        with self._lock:
+            wait_seconds, run_seconds = list(self._wait_seconds), list(self._run_seconds)
+            return {
+                **self._counters,
+                "queue_depth": self._queue.qsize(),
+                "workers": len(self._threads),
+                "wait_ms_p50": round(percentile(wait_seconds, 50, default=0.0) * 1000, 1),
+                "wait_ms_p95": round(percentile(wait_seconds, 95, default=0.0) * 1000, 1),
+                "run_ms_p50": round(percentile(run_seconds, 50, default=0.0) * 1000, 1),
+                "run_ms_p95": round(percentile(run_seconds, 95, default=0.0) * 1000, 1),
+            }
+
+
+def job_queue_from_env(store):
+    """Build the job queue from JOB_* environment variables (None when disabled)."""
+    if os.getenv("JOB_QUEUE_ENABLED", "false").lower() not in ("1", "true", "yes"):
+        return None
+    return JobQueue(store, workers=int(os.getenv("JOB_WORKERS", "4")),
+                    result_ttl_seconds=int(os.getenv("JOB_RESULT_TTL_SECONDS", "3600")))
@@ -0,0 +1,25 @@
+# --- Target Languages ---
+# Languages content can be translated into. "name" goes into the prompts,
+# "native" is shown in the UI, and "read_more" introduces the blog link when
+# the model leaves it out of a translated LinkedIn post.
+LANGUAGES = {
+    "fr": {"name": "French", "native": "Français", "read_more": "Lire la suite :"},
+    "de": {"name": "German", "native": "Deutsch", "read_more": "Weiterlesen:"},
+    "es": {"name": "Spanish", "native": "Español", "read_more": "Leer más:"},
+    "it": {"name": "Italian", "native": "Italiano", "read_more": "Leggi di più:"},
+    "nl": {"name": "Dutch", "native": "Nederlands", "read_more": "Lees meer:"},
+    "pt": {"name": "Portuguese", "native": "Português", "read_more": "Leia mais:"},
+}
+
+
+def parse_language_list(value, default=("fr",)):
+    """Turns "fr, de,xx" (or a list) into ["fr", "de"]: known codes only, in order, without duplicates."""
+    codes = value.split(",") if isinstance(value, str) else (value or [])
+    languages = []
+    for code in codes:
+        code = code.strip().lower()
+        if code in LANGUAGES and code not in languages:
+            languages.append(code)
+        elif code and code not in LANGUAGES:
+            print(f"Warning: Ignoring unknown translation language '{code}'. Known: {', '.join(LANGUAGES)}")
+    return languages or list(default)
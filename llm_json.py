@@ -0,0 +1,377 @@
+import json
+import re
+
+# --- Incremental JSON helpers for LLM output ---
+
+_SIMPLE_ESCAPES = {'"': '"', '\\': '\\', '/': '/', 'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'}
+
+
+class StreamingFieldExtractor:
+    """Pull top-level string fields out of a JSON object while it is still arriving.
+
+    feed() takes raw model output in arbitrary chunks (```json fences and any
+    chatter before the opening brace are skipped) and returns a list of
+    (field_name, decoded_text) deltas for string values of the top-level
+    object. Nested values are skipped. `fields` holds the decoded strings
+    seen so far, and `complete` turns True once the closing brace arrives.
+    """
+
+    def __init__(self, wanted_fields=None):
+        self.wanted_fields = set(wanted_fields) if wanted_fields else None
+        self.fields = {}
+        self.complete = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = None       # None, "" (just saw a backslash) or the pending \uXXXX hex digits
+        self._is_key = False      # is the string being read an object key?
+        self._expect_key = False  # at depth 1, is the next string a key?
+        self._key_chars = []
+        self._current_key = None
+        self._capture = None      # field name whose value string is being streamed
+        self._pending_surrogate = ""
+
+    def feed(self, chunk):
+        deltas = []
+        if self.complete:
+            return deltas
+        out = []
+        for ch in chunk:
+            if self._in_string:
+                text = self._read_string_char(ch)
+                if text is None:
+                    # string closed
+                    self._in_string = False
+                    if self._is_key:
+                        self._current_key = "".join(self._key_chars)
+                        self._key_chars = []
+                    elif self._capture is not None:
+                        self._flush(out, deltas)
+                        self._capture = None
+                    continue
+                if text:
+                    if self._is_key:
+                        self._key_chars.append(text)
+                    elif self._capture is not None:
+                        out.append(text)
+                continue
+
+            if ch == '"':
+                if self._depth == 0:
+                    continue  # stray quote before the object starts
+                self._in_string = True
+                self._is_key = self._depth == 1 and self._expect_key
+                if not self._is_key and self._depth == 1 and self._current_key is not None:
+                    if self.wanted_fields is None or self._current_key in self.wanted_fields:
+                        self._capture = self._current_key
+                        self.fields.setdefault(self._capture, "")
+            elif ch in "{[":
+                if self._depth == 0 and ch == "[":
+                    continue  # only objects are streamed field by field
+                self._depth += 1
+                if self._depth == 1:
+                    self._expect_key = True
+            elif ch in "}]":
+                if self._depth == 0:
+                    continue
+                self._depth -= 1
+                if self._depth == 0:
+                    self.complete = True
+                    break
+            elif self._depth == 1:
+                if ch == ":":
+                    self._expect_key = False
+                elif ch == ",":
+                    self._expect_key = True
+                    self._current_key = None
+        if self._capture is not None:
+            self._flush(out, deltas)
+        return deltas
+
+    def _flush(self, out, deltas):
+        if out:
+            text = "".join(out)
+            out.clear()
+            self.fields[self._capture] += text
+            deltas.append((self._capture, text))
+
+    def _read_string_char(self, ch):
+        # Returns decoded text ("" when nothing is ready yet) or None at the closing quote.
+        if self._escape is None:
+            if ch == "\\":
+                self._escape = ""
+                return ""
+            if ch == '"':
+                return None
+            return ch
+        if self._escape == "":
+            if ch == "u":
+                self._escape = "u"
+                return ""
+            self._escape = None
+            return _SIMPLE_ESCAPES.get(ch, ch)
+        self._escape += ch
+        if len(self._escape) < 5:
+            return ""
+        hex_digits, self._escape = self._escape[1:], None
+        try:
+            code_point = int(hex_digits, 16)
+        except ValueError:
+            return ""
+        if 0xD800 <= code_point < 0xDC00:
+            self._pending_surrogate = chr(code_point)
+            return ""
+        if 0xDC00 <= code_point < 0xE000 and self._pending_surrogate:
+            pair = self._pending_surrogate + chr(code_point)
+            self._pending_surrogate = ""
+            return pair.encode("utf-16", "surrogatepass").decode("utf-16")
+        return chr(code_point)
+
+
+# --- One-shot parsing with schema validation and repair ---
+
+class LLMParseError(ValueError):
+    """The model output could not be turned into the JSON structure we asked for."""
+
+
+class ResponseSchema:
+    """Expected shape of a model response.
+
+    `container` is list or dict. For dicts, `required_keys` must all be present
+    and `optional_keys` are only used to pick which fields to stream. For lists, every item must be a dict with `item_keys`; invalid items are
+    dropped, and an empty result is an error.
+    """
+
+    def __init__(self, name, container, required_keys=(), optional_keys=(), item_keys=()):
+        self.name = name
+        self.container = container
+        self.required_keys = tuple(required_keys)
+        self.optional_keys = tuple(optional_keys)
+        self.item_keys = tuple(item_keys)
+        self.opener = "[" if container is list else "{"
+
+    def validate(self, data):
+        if not isinstance(data, self.container):
+            raise LLMParseError(f"Parsed data for {self.name} is not a {self.container.__name__} as expected.")
+        if self.container is list:
+            valid_items = []
+            for item in data:
+                if isinstance(item, dict) and all(key in item for key in self.item_keys):
+                    valid_items.append(item)
+                else:
+                    print(f"Warning: Skipping an invalid item in {self.name} list: {item}")
+            if not valid_items:
+                raise LLMParseError(f"No valid {self.name} found in the parsed AI response, or the list was empty.")
+            return valid_items
+        missing_keys = [key for key in self.required_keys if key not in data]
+        if missing_keys:
+            raise LLMParseError(f"Parsed {self.name} is missing keys: {', '.join(missing_keys)}.")
+        return data
+
+
+IDEAS_SCHEMA = ResponseSchema("ideas", list, item_keys=("title", "summary", "slug"))
+CONTENT_SCHEMA = ResponseSchema("content generation", dict, required_keys=("linkedin_post", "blog_article"))
+# Chunked translation sends the article separately (see translation.py); only the post and slug come back as JSON.
+POST_TRANSLATION_SCHEMA = ResponseSchema("post translation", dict, required_keys=("linkedin_post",),
+                                         optional_keys=("blog_link_tag",))
+
+
+class ParseResult:
+    __slots__ = ("data", "repaired")
+
+    def __init__(self, data, repaired):
+        self.data = data
+        self.repaired = repaired  # True when the raw text was not valid JSON and had to be fixed up
+
+
+# strict=False accepts raw newlines/tabs inside strings, by far the most common model defect.
+_DECODER = json.JSONDecoder(strict=False)
+_MAX_START_CANDIDATES = 4  # how many opening brackets to try when the model adds chatter like "Here are [5] ideas:"
+
+
+def parse_llm_json(raw_text, schema):
+    """Extract, decode and validate the JSON payload in `raw_text`.
+
+    Decoding starts in place at the first plausible opening bracket (no
+    fence stripping or slicing copies); trailing text is ignored. Only when
+    that fails is a repaired copy built (see repair_json) and decoded once.
+    """
+    if not raw_text:
+        raise LLMParseError(f"Empty AI response for {schema.name}.")
+
+    start = raw_text.find(schema.opener)
+    if start == -1:
+        raise LLMParseError(f"Response does not appear to contain a valid JSON structure for {schema.name}.")
+
+    first_error = None
+    repair_start = None  # first candidate that looked like broken JSON (rather than the wrong shape)
+    candidate = start
+    for _ in range(_MAX_START_CANDIDATES):
+        try:
+            data, _ = _DECODER.raw_decode(raw_text, candidate)
+            return ParseResult(schema.validate(data), repaired=False)
+        except json.JSONDecodeError as e:
+            first_error = first_error or e
+            if repair_start is None:
+                repair_start = candidate
+        except LLMParseError as e:
+            first_error = first_error or e
+        candidate = raw_text.find(schema.opener, candidate + 1)
+        if candidate == -1:
+            break
+
+    if repair_start is None:
+        raise first_error
+    try:
+        data, _ = _DECODER.raw_decode(repair_json(raw_text, repair_start))
+    except json.JSONDecodeError:
+        raise LLMParseError(f"{type(first_error).__name__} - {first_error}") from first_error
+    return ParseResult(schema.validate(data), repaired=True)
+
+
+_PY_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_STRING_RUN = re.compile(r'[^"\\]+')  # copy runs of ordinary string characters in one step
+
+
+def repair_json(raw_text, start=0):
+    """Return a best-effort valid JSON document from the bracketed payload at `start`.
+
+    Handles the defects models produce most often: trailing commas, // and
+    /* */ comments, Python literals (True/False/None), bad backslash escapes,
+    and output truncated mid-string or mid-object (open strings and brackets
+    are closed). Stops after the top-level value closes.
+    """
+    out = []
+    closers = []
+    in_string = False
+    i = start
+    n = len(raw_text)
+    while i < n:
+        ch = raw_text[i]
+        if in_string:
+            run = _STRING_RUN.match(raw_text, i)
+            if run:
+                out.append(run.group())
+                i = run.end()
+                continue
+            if ch == "\\":
+                nxt = raw_text[i + 1] if i + 1 < n else ""
+                if nxt in _SIMPLE_ESCAPES or nxt == "u":
+                    out.append(raw_text[i:i + 2])
+                    i += 2
+                else:
+                    out.append("\\\\")  # lone backslash, e.g. a Windows path
+                    i += 1
+                continue
+            if ch == '"':
+                in_string = False
+            out.append(ch)
+            i += 1
+            continue
+
+        if ch == '"':
+            in_string = True
+            out.append(ch)
+        elif ch in "{[":
+            closers.append("}" if ch == "{" else "]")
+            out.append(ch)
+        elif ch in "}]":
+            _drop_trailing_comma(out)
+            if closers:
+                out.append(closers.pop())
+            if not closers:
+                break
+        elif ch == "/" and raw_text.startswith("//", i):
+            newline = raw_text.find("\n", i)
+            i = n if newline == -1 else newline
+            continue
+        elif ch == "/" and raw_text.startswith("/*", i):
+            end = raw_text.find("*/", i + 2)
+            i = n if end == -1 else end + 2
+            continue
+        elif ch.isalpha():
+            j = i
+            while j < n and raw_text[j].isalpha():
+                j += 1
+            word = raw_text[i:j]
+            out.append(_PY_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    # Truncated output: close whatever is still open.
+    if in_string:
+        if out and out[-1].endswith("\\") and not out[-1].endswith("\\\\"):
+            out.pop()
+        out.append('"')
+    if closers:
+        _drop_dangling_member(out, closers[-1] == "}")
+        while closers:
+            _drop_trailing_comma(out)
+            out.append(closers.pop())
+    return "".join(out)
+
+
+def _drop_trailing_comma(out):
+    k = len(out) - 1
+    while k >= 0 and out[k].isspace():
+        k -= 1
+    if k >= 0 and out[k] == ",":
+        del out[k:]
+
+
+def _drop_dangling_member(out, in_object):
+    # A truncated object can end in `"key":`, `"key"` or a key cut off mid-way
+    # (its quote was closed above); drop the key so the object can close.
+    k = len(out) - 1
+    while k >= 0 and out[k].isspace():
+        k -= 1
+    has_colon = k >= 0 and out[k] == ":"
+    if has_colon:
+        k -= 1
+        while k >= 0 and out[k].isspace():
+            k -= 1
+    elif not in_object:
+        return
+    if k < 0 or out[k] != '"':
+        return
+    k -= 1
+    while k >= 0 and out[k] != '"':
+        k -= 1
+    if not has_colon:
+        # Without a colon, the string is a key only if it follows `{` or `,`.
+        j = k - 1
+        while j >= 0 and out[j].isspace():
+            j -= 1
+        if j < 0 or out[j] not in "{,":
+            return
+    del out[k:]
+
+
+class IncrementalJsonParser:
+    """Chunk-fed front end for parse_llm_json.
+
+    feed() returns the same (field, text) deltas as StreamingFieldExtractor for
+    object schemas (nothing for lists). close() parses the accumulated text
+    once and returns a ParseResult.
+    """
+
+    def __init__(self, schema):
+        self.schema = schema
+        self._chunks = []
+        self._extractor = (StreamingFieldExtractor(schema.required_keys + schema.optional_keys)
+                           if schema.container is dict else None)
+
+    def feed(self, chunk):
+        self._chunks.append(chunk)
+        return self._extractor.feed(chunk) if self._extractor else []
+
+    @property
+    def raw_text(self):
+        return "".join(self._chunks)
+
+    def close(self):
+        raw_text = self.raw_text
+        self._chunks = [raw_text]
+        return parse_llm_json(raw_text, self.schema)
@@ -0,0 +1,201 @@
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+# --- Call Scheduler ---
+# Sits in front of every OpenRouter call (see OpenRouterClient). Each model has
+# its own limits: a token bucket for requests per second and one for estimated
+# tokens per minute. Waiting calls are served by priority class first, then
+# round-robin across sessions, so one user translating into five languages
+# cannot starve everybody else. A 429 pauses that model for as long as
+# Retry-After asks (or an exponential backoff when it does not say).
+
+PRIORITIES = ("interactive", "batch")  # served strictly in this order
+DEFAULT_COMPLETION_TOKENS = 1000  # until a model's real usage has been seen
+MAX_BACKOFF_SECONDS = 60.0
+
+
+def estimate_prompt_tokens(prompt_messages):
+    # About four characters per token for English prose; only used for budgeting.
+    return sum(len(message.get("content") or "") for message in prompt_messages) // 4 + 1
+
+
+class TokenBucket:
+    def __init__(self, rate_per_second, capacity):
+        self.rate = rate_per_second
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount, now):
+        self._refill(now)
+        amount = min(amount, self.capacity)  # a call larger than the bucket only waits for a full bucket
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount):
+        self.level -= amount  # may go negative when a call turns out bigger than estimated
+
+
+class ModelLimit:
+    """Limits and backoff state for one model."""
+
+    def __init__(self, requests_per_second=0.0, tokens_per_minute=0):
+        # Requests are spaced evenly (a burst of one): providers count them in fixed
+        # windows, and a full second's burst at a window boundary overruns it.
+        self.requests = TokenBucket(requests_per_second, 1.0) if requests_per_second > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute / 60.0, tokens_per_minute) if tokens_per_minute > 0 else None
+        self.paused_until = 0.0
+        self.backoff_seconds = 0.0
+        self.completion_tokens = DEFAULT_COMPLETION_TOKENS  # moving average of real completions
+        self.waiting = {priority: OrderedDict() for priority in PRIORITIES}  # client -> deque of tickets
+
+    def next_ticket(self):
+        for priority in PRIORITIES:
+            for tickets in self.waiting[priority].values():
+                return tickets[0]
+        return None
+
+    def wait_time(self, estimated_tokens, now):
+        wait = max(0.0, self.paused_until - now)
+        if self.requests is not None:
+            wait = max(wait, self.requests.wait_time(1, now))
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(estimated_tokens, now))
+        return wait
+
+
+class CallScheduler:
+    """Admits calls per model within their limits, by priority and fairly across clients.
+
+    acquire() blocks until the call may start and returns its estimated token
+    count; settle() corrects the token budget with the real usage afterwards
+    and rate_limited() reports a 429. `limits` maps model IDs to
+    (requests_per_second, tokens_per_minute); "*" applies to every other
+    model, and 0 means unlimited.
+    """
+
+    def __init__(self, limits=None):
+        self.limits = dict(limits or {})
+        self._models = {}
+        self._cond = threading.Condition()
+        self._counters = {"granted": 0, "granted_batch": 0, "delayed": 0, "rate_limited": 0}
+        self._wait_seconds_total = 0.0
+        self._wait_seconds_max = 0.0
+
+    def _model(self, model):
+        limit = self._models.get(model)
+        if limit is None:
+            limit = self._models[model] = ModelLimit(*self.limits.get(model, self.limits.get("*", (0.0, 0))))
+        return limit
+
+    def acquire(self, model, prompt_messages, priority="interactive", client_id=None):
+        if priority not in PRIORITIES:
+            priority = PRIORITIES[0]
+        ticket = object()
+        started = time.monotonic()
+        with self._cond:
+            limit = self._model(model)
+            estimated_tokens = estimate_prompt_tokens(prompt_messages) + int(limit.completion_tokens)
+            limit.waiting[priority].setdefault(client_id, deque()).append(ticket)
+            delayed = False
+            while True:
+                now = time.monotonic()
+                wait = None
+                if limit.next_ticket() is ticket:
+                    wait = limit.wait_time(estimated_tokens, now)
+                    if wait <= 0:
+                        break
+                delayed = True
+                # The head of the queue sleeps until its budget is there; the rest are woken
+                # when it is admitted (the timeout is a safety net against missed wake-ups).
+                self._cond.wait(min(wait, 1.0) if wait is not None else 1.0)
+
+            clients = limit.waiting[priority]
+            clients[client_id].popleft()
+            if clients[client_id]:
+                clients.move_to_end(client_id)  # round-robin: this client goes behind the others
+            else:
+                del clients[client_id]
+            if limit.requests is not None:
+                limit.requests.take(1)
+            if limit.tokens is not None:
+                limit.tokens.take(estimated_tokens)
+
+            waited = time.monotonic() - started
+            self._counters["granted"] += 1
+            if priority == "batch":
+                self._counters["granted_batch"] += 1
+            if delayed:
+                self._counters["delayed"] += 1
+            self._wait_seconds_total += waited
+            self._wait_seconds_max = max(self._wait_seconds_max, waited)
+            self._cond.notify_all()
+        return estimated_tokens
+
+    def settle(self, model, estimated_tokens, usage):
+        """Charge the difference between the estimate and the call's reported `usage`."""
+        if not usage:
+            return
+        completion_tokens = usage.get("completion_tokens") or 0
+        total_tokens = usage.get("total_tokens") or (usage.get("prompt_tokens") or 0) + completion_tokens
+        with self._cond:
+            limit = self._model(model)
+            if limit.tokens is not None and total_tokens:
+                limit.tokens.take(total_tokens - estimated_tokens)
+            if completion_tokens:
+                limit.completion_tokens = 0.8 * limit.completion_tokens + 0.2 * completion_tokens
+            limit.backoff_seconds /= 2  # a success eases the backoff for the next 429
+
+    def rate_limited(self, model, retry_after_seconds=None):
+        """Pause `model` after a 429, for Retry-After seconds or an exponential backoff; returns the pause."""
+        with self._cond:
+            limit = self._model(model)
+            if retry_after_seconds is None:
+                limit.backoff_seconds = min(MAX_BACKOFF_SECONDS, max(1.0, limit.backoff_seconds * 2))
+                pause = limit.backoff_seconds
+            else:
+                pause = min(MAX_BACKOFF_SECONDS, max(0.0, retry_after_seconds))
+            limit.paused_until = max(limit.paused_until, time.monotonic() + pause)
+            self._counters["rate_limited"] += 1
+            self._cond.notify_all()
+        return pause
+
+    def stats(self):
+        with self._cond:
+            now = time.monotonic()
+            granted = self._counters["granted"]
+            return {
+                **self._counters,
+                "waiting": sum(len(tickets) for limit in self._models.values()
+                               for clients in limit.waiting.values() for tickets in clients.values()),
+                "paused_models": sorted(model for model, limit in self._models.items() if limit.paused_until > now),
+                "wait_ms_avg": round(self._wait_seconds_total / granted * 1000, 1) if granted else 0.0,
+                "wait_ms_max": round(self._wait_seconds_max * 1000, 1),
+            }
+
+
+def parse_rate_limits(value):
+    """Turns "*=5:0,mistralai/mistral-7b-instruct:free=0.3:20000" into {model: (requests/s, tokens/min)}."""
+    limits = {}
+    for entry in (value or "").split(","):
+        if not entry.strip():
+            continue
+        model, _, numbers = entry.strip().rpartition("=")
+        try:
+            requests_per_second, _, tokens_per_minute = numbers.partition(":")
+            limits[model or "*"] = (float(requests_per_second or 0), int(tokens_per_minute or 0))
+        except ValueError:
+            print(f"Warning: Ignoring malformed LLM_RATE_LIMITS entry '{entry.strip()}'. Expected model=requests_per_second:tokens_per_minute")
+    return limits
+
+
+def scheduler_from_env():
+    """Build the scheduler from LLM_SCHEDULER_ENABLED / LLM_RATE_LIMITS (None when disabled)."""
+    if os.getenv("LLM_SCHEDULER_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return CallScheduler(parse_rate_limits(os.getenv("LLM_RATE_LIMITS", "")))
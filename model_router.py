@@ -0,0 +1,187 @@
+import contextvars
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from telemetry import percentile
+
+# --- Model Routing ---
+# Each task (ideas, content, translation) has an ordered list of models. The
+# first healthy one gets the call. If it has not answered within its recent
+# p95 latency, the next model is tried in parallel (a hedged request) and the
+# first usable answer wins. An unusable answer or an error moves on to the
+# next model straight away.
+
+
+def parse_model_list(value, default_model):
+    """Turns "a/model, b/model" into ["a/model", "b/model"]; an empty value gives [default_model]."""
+    models = []
+    for model in (value or "").split(","):
+        model = model.strip()
+        if model and model not in models:
+            models.append(model)
+    return models or [default_model]
+
+
+class ModelStats:
+    """Rolling latency and outcome window for one (task, model) pair."""
+
+    def __init__(self, window=100):
+        self.latencies = deque(maxlen=window)  # seconds, usable answers only
+        self.outcomes = deque(maxlen=window)   # True for a usable answer
+        self.calls = 0
+        self.wins = 0
+
+    def error_rate(self):
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+
+class ModelRouter:
+    """Runs a call against a task's models with failover and latency hedging.
+
+    `hedge_percentile` of a model's recent latencies is how long to wait
+    before hedging (`initial_hedge_delay` until `min_samples` calls have been
+    seen; 0 turns hedging off, leaving failover only). Models whose recent
+    error rate reaches `unhealthy_error_rate` are tried last.
+    """
+
+    def __init__(self, hedge_percentile=95, initial_hedge_delay=20.0, min_hedge_delay=1.0,
+                 min_samples=10, unhealthy_error_rate=0.5, window=100, max_workers=32):
+        self.hedge_percentile = hedge_percentile
+        self.initial_hedge_delay = initial_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.min_samples = min_samples
+        self.unhealthy_error_rate = unhealthy_error_rate
+        self.window = window
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self._lock = threading.Lock()
+        self._stats = {}  # (task, model) -> ModelStats
+        self._counters = {"routed": 0, "hedged": 0, "failovers": 0, "backup_wins": 0, "abandoned": 0}
+
+    def _model_stats(self, task, model):
+        stats = self._stats.get((task, model))
+        if stats is None:
+            stats = self._stats[(task, model)] = ModelStats(self.window)
+        return stats
+
+    def candidates(self, task, models):
+        # Configured order, with models that keep failing moved to the back.
+        with self._lock:
+            def unhealthy(model):
+                stats = self._model_stats(task, model)
+                return len(stats.outcomes) >= self.min_samples and stats.error_rate() >= self.unhealthy_error_rate
+            return sorted(models, key=unhealthy)
+
+    def hedge_delay(self, task, model):
+        with self._lock:
+            latencies = list(self._model_stats(task, model).latencies)
+        if len(latencies) < self.min_samples:
+            return self.initial_hedge_delay
+        return max(self.min_hedge_delay, percentile(latencies, self.hedge_percentile))
+
+    def _attempt(self, task, model, fn, is_usable, answered=None):
+        # `answered` is set as soon as any model of the call has a usable answer; an
+        # attempt still queued by then is skipped (usable None) instead of sent.
+        if answered is not None and answered.is_set():
+            return model, None, None
+        started = time.monotonic()
+        try:
+            result = fn(model)
+            usable = is_usable(result)
+        except Exception as e:  # an error is an unusable answer; the next model gets a turn
+            print(f"Routed call to {model} ({task}) failed: {type(e).__name__} - {e}")
+            result, usable = None, False
+        with self._lock:
+            stats = self._model_stats(task, model)
+            stats.calls += 1
+            stats.outcomes.append(usable)
+            if usable:
+                stats.latencies.append(time.monotonic() - started)
+        if usable and answered is not None:
+            answered.set()
+        return model, result, usable
+
+    def call(self, task, models, fn, is_usable):
+        """Returns (model, result) of the first usable `fn(model)`; the last result if none was usable."""
+        order = self.candidates(task, models)
+        with self._lock:
+            self._counters["routed"] += 1
+        if len(order) == 1:
+            model, result, usable = self._attempt(task, order[0], fn, is_usable)
+            if usable:
+                with self._lock:
+                    self._model_stats(task, model).wins += 1
+            return model, result
+
+        pending = set()
+        next_index = 0
+        hedge_at = None
+        last = (order[0], None)
+        answered = threading.Event()
+
+        def launch(counter=None):
+            nonlocal next_index, hedge_at
+            model = order[next_index]
+            next_index += 1
+            # In a copy of the caller's context, so per-request state (e.g. trace spans) follows the call.
+            pending.add(self._executor.submit(contextvars.copy_context().run, self._attempt, task, model, fn, is_usable,
+                                              answered))
+            hedge_at = time.monotonic() + self.hedge_delay(task, model) if self.hedge_percentile else None
+            if counter:
+                with self._lock:
+                    self._counters[counter] += 1
+
+        launch()
+        while pending:
+            can_hedge = hedge_at is not None and next_index < len(order)
+            timeout = max(0.0, hedge_at - time.monotonic()) if can_hedge else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                launch("hedged")  # the models in flight are taking longer than usual
+                continue
+            for future in sorted(done, key=lambda future: not future.result()[2]):  # a usable answer first
+                pending.discard(future)
+                model, result, usable = future.result()
+                if usable is None:
+                    continue  # skipped: another model has already answered
+                if usable:
+                    with self._lock:
+                        self._model_stats(task, model).wins += 1
+                        if model != order[0]:
+                            self._counters["backup_wins"] += 1
+                        self._counters["abandoned"] += len(pending)
+                    for loser in pending:
+                        # Not started yet: dropped (or skipped, see _attempt). Already sent: left
+                        # to finish in the background (its stats still count); the answer is ignored.
+                        loser.cancel()
+                    return model, result
+                last = (model, result)
+                if next_index < len(order):
+                    launch("failovers")
+        return last
+
+    def stats(self):
+        with self._lock:
+            models = {}
+            for (task, model), stats in self._stats.items():
+                latencies = list(stats.latencies)
+                models[f"{task}:{model}"] = {
+                    "calls": stats.calls,
+                    "wins": stats.wins,
+                    "error_rate": round(stats.error_rate(), 3),
+                    "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+                    "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+                }
+            return {**self._counters, "models": models}
+
+
+def router_from_env(max_workers=32):
+    """Build the router from the LLM_HEDGE_* environment variables."""
+    return ModelRouter(
+        hedge_percentile=float(os.getenv("LLM_HEDGE_PERCENTILE", "95")),
+        initial_hedge_delay=float(os.getenv("LLM_HEDGE_INITIAL_DELAY_SECONDS", "20")),
+        min_hedge_delay=float(os.getenv("LLM_HEDGE_MIN_DELAY_SECONDS", "1")),
+        max_workers=max_workers,
+    )
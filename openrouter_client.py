@@ -0,0 +1,243 @@
+import json
+import os
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from llm_scheduler import scheduler_from_env
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+class OpenRouterStreamError(requests.exceptions.RequestException):
+    """An error event reported by OpenRouter in the middle of a streamed response."""
+
+
+def _retry_after_seconds(response):
+    # Retry-After is either a number of seconds or an HTTP date.
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+class OpenRouterClient:
+    """Shared, thread-safe HTTP transport for the OpenRouter chat completions API.
+
+    One instance is meant to live for the whole worker process so TCP/TLS
+    connections are reused across requests instead of being re-opened per call.
+    With a `scheduler` (llm_scheduler.CallScheduler), every call waits for its
+    model's rate limits first, and 429 responses are retried through the
+    scheduler (which pauses the model for Retry-After) instead of by urllib3.
+    """
+
+    def __init__(self, api_key, base_url="https://openrouter.ai/api/v1",
+                 pool_connections=4, pool_maxsize=8,
+                 connect_timeout=5.0, read_timeout=120.0,
+                 max_retries=3, backoff_factor=0.5, backoff_jitter=0.5,
+                 scheduler=None, max_rate_limit_retries=3):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.timeout = (connect_timeout, read_timeout)
+        self.scheduler = scheduler
+        self.max_rate_limit_retries = max_rate_limit_retries
+
+        retry = Retry(
+            total=max_retries,
+            connect=max_retries,
+            read=0,  # a read timeout means the model is still busy; retrying just doubles the bill
+            status=max_retries,
+            # With a scheduler, 429s are left to it: urllib3 would otherwise retry any
+            # response carrying Retry-After, whatever status_forcelist says.
+            status_forcelist=[code for code in RETRY_STATUS_CODES if code != 429 or scheduler is None],
+            allowed_methods=None,  # chat completions are POSTs, retry them too
+            backoff_factor=backoff_factor,
+            backoff_jitter=backoff_jitter,
+            respect_retry_after_header=scheduler is None,
+            raise_on_status=False,  # hand the final 429/5xx back so raise_for_status() reports it
+        )
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=True,  # bound sockets per worker; extra callers wait for a free connection
+            max_retries=retry,
+        )
+        self._session = requests.Session()
+        self._session.mount("https://", self._adapter)
+        self._session.mount("http://", self._adapter)
+        self._session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
+        })
+
+        self._lock = threading.Lock()
+        self._calls = 0
+        self._errors = 0
+
+    # --- Scheduling ---
+    def _admit(self, model, prompt_messages, priority, client_id):
+        if self.scheduler is None:
+            return 0
+        return self.scheduler.acquire(model, prompt_messages, priority=priority, client_id=client_id)
+
+    def _retry_rate_limited(self, response, model, attempt):
+        # True when a 429 should be retried; the scheduler holds back the model's calls until then.
+        if response.status_code != 429 or self.scheduler is None or attempt >= self.max_rate_limit_retries:
+            return False
+        pause = self.scheduler.rate_limited(model, _retry_after_seconds(response))
+        print(f"Rate limited by OpenRouter on {model}; pausing its calls for {pause:.1f}s (retry {attempt + 1}/{self.max_rate_limit_retries}).")
+        return True
+
+    def _settle(self, model, estimated_tokens, usage):
+        if self.scheduler is not None:
+            self.scheduler.settle(model, estimated_tokens, usage)
+
+    def chat_completion(self, prompt_messages, model, priority="interactive", client_id=None):
+        """POST a chat completion and return the decoded JSON body.
+
+        `priority` ("interactive" or "batch") and `client_id` (e.g. the browser
+        session) decide the call's place in the scheduler's queue.
+        Raises requests.exceptions.RequestException (or ValueError for a
+        non-JSON body) so the caller decides how to report the failure.
+        """
+        with self._lock:
+            self._calls += 1
+        try:
+            attempt = 0
+            while True:
+                estimated_tokens = self._admit(model, prompt_messages, priority, client_id)
+                response = self._session.post(
+                    f"{self.base_url}/chat/completions",
+                    json={"model": model, "messages": prompt_messages},
+                    timeout=self.timeout,
+                )
+                if not self._retry_rate_limited(response, model, attempt):
+                    break
+                attempt += 1
+            response.raise_for_status()
+            api_response = response.json()
+            self._settle(model, estimated_tokens, api_response.get("usage"))
+            return api_response
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+
+    def stream_chat_completion(self, prompt_messages, model, priority="interactive", client_id=None, on_usage=None):
+        """POST a `stream: true` chat completion and yield content deltas as they arrive.
+
+        The response is closed (and its connection returned to the pool) when
+        the generator finishes or is closed early by the caller. `on_usage` is
+        called with the stream's `usage` once it has finished.
+        """
+        with self._lock:
+            self._calls += 1
+        try:
+            attempt = 0
+            while True:
+                estimated_tokens = self._admit(model, prompt_messages, priority, client_id)
+                response = self._session.post(
+                    f"{self.base_url}/chat/completions",
+                    json={"model": model, "messages": prompt_messages, "stream": True},
+                    timeout=self.timeout,
+                    stream=True,
+                )
+                if not self._retry_rate_limited(response, model, attempt):
+                    break
+                response.close()
+                attempt += 1
+            usage = None
+            with response:
+                response.raise_for_status()
+                for raw_line in response.iter_lines():
+                    # SSE: "data: {...}" payloads, ": comment" keep-alives, "data: [DONE]" terminator.
+                    if not raw_line.startswith(b"data:"):
+                        continue
+                    data = raw_line[5:].strip()
+                    if data == b"[DONE]":
+                        break
+                    event = json.loads(data)
+                    if event.get("error"):
+                        raise OpenRouterStreamError(event["error"].get("message", "Stream error"))
+                    usage = event.get("usage") or usage  # sent with the last chunk
+                    choices = event.get("choices") or []
+                    delta = choices[0].get("delta", {}).get("content") if choices else None
+                    if delta:
+                        yield delta
+            self._settle(model, estimated_tokens, usage)
+            if on_usage is not None:
+                on_usage(usage)
+        except Exception:
+            with self._lock:
+                self._errors += 1
+            raise
+
+    def stats(self):
+        """Connection reuse counters aggregated over every pooled host."""
+        handshakes = 0
+        pooled_requests = 0
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            handshakes += pool.num_connections
+            pooled_requests += pool.num_requests
+        with self._lock:
+            calls, errors = self._calls, self._errors
+        return {
+            "calls": calls,
+            "errors": errors,
+            "http_requests": pooled_requests,  # includes retries
+            "handshakes": handshakes,
+            "pool_hits": max(pooled_requests - handshakes, 0),
+        }
+
+    def close(self):
+        self._session.close()
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def client_from_env(api_key):
+    """Build a client from the HTTP_* / OPENROUTER_BASE_URL environment variables."""
+    return OpenRouterClient(
+        api_key,
+        base_url=os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1"),
+        pool_connections=int(os.getenv("HTTP_POOL_CONNECTIONS", "4")),  # distinct hosts kept by the pool manager
+        # Keep-alive sockets per host, per worker. Callers wait for a free socket
+        # (pool_block), so this defaults to LLM_MAX_INFLIGHT, the number of calls a
+        # worker runs at once; a smaller pool would serialize chunk/language fan-out.
+        pool_maxsize=int(os.getenv("HTTP_POOL_MAXSIZE") or os.getenv("LLM_MAX_INFLIGHT") or "64"),
+        connect_timeout=float(os.getenv("HTTP_CONNECT_TIMEOUT", "5")),
+        read_timeout=float(os.getenv("HTTP_READ_TIMEOUT", "120")),  # ~1000-word articles are slow
+        max_retries=int(os.getenv("HTTP_MAX_RETRIES", "3")),
+        backoff_factor=float(os.getenv("HTTP_BACKOFF_FACTOR", "0.5")),
+        backoff_jitter=float(os.getenv("HTTP_BACKOFF_JITTER", "0.5")),
+        scheduler=scheduler_from_env(),
+        max_rate_limit_retries=int(os.getenv("LLM_RATE_LIMIT_RETRIES", "3")),
+    )
+
+
+def get_client(api_key):
+    """Return the per-process client, creating it on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = client_from_env(api_key)
+    return _client
@@ -0,0 +1,87 @@
+# --- Prompt Builders ---
+# Shared by the web routes and anything else that talks to the models, so the
+# exact same messages (and therefore the same response-cache keys) are produced
+# no matter who asks.
+
+
+def build_ideas_messages(topic_title):
+    return [
+        {"role": "system", "content": "You are an AI assistant that generates creative content ideas."},
+        {"role": "user", "content": f"""
+        Generate 5 distinct LinkedIn post ideas based on the topic: "{topic_title}".
+        For each idea, provide:
+        1. A catchy `title` for the potential LinkedIn post.
+        2. A brief `summary` (1-2 sentences) of what the post would cover.
+        3. A suggested URL `slug` (3-5 words, lowercase, hyphenated) for a blog post related to this idea.
+        
+        Format your response as a valid JSON list of objects. Each object must have 'title', 'summary', and 'slug' keys.
+        Ensure all strings within the JSON are properly escaped, especially for newlines (use \\n), tabs (use \\t), and quotes (use \\"). Avoid any raw control characters within string values.
+        
+        Example:
+        [
+          {{"title": "Unlocking Password Power", "summary": "Discover why strong passwords are your first line of defense against online threats. We'll cover simple steps.", "slug": "unlocking-password-power"}},
+          {{"title": "Password Myths Debunked", "summary": "Are long passwords always better? We bust common password security myths for you.", "slug": "password-myths-debunked"}}
+        ]
+        
+        Your entire response should be ONLY the JSON list, with no other text, explanations, or markdown formatting (like ```json) surrounding it.
+        """}
+    ]
+
+
+def build_content_messages(selected_idea, full_blog_url_en, blog_link_tag_en):
+    return [
+       {"role": "system", "content": "VERY IMPORTANT: Your entire response MUST be a single, valid JSON object and NOTHING ELSE. Do not include any commentary, notes, explanations, or any text whatsoever before or after the JSON object. Adhere strictly to JSON syntax. The JSON object must contain exactly two keys: 'linkedin_post' and 'blog_article'."},
+       {"role": "user", "content": f"""
+       Generate content based on the topic: "{selected_idea['title']}" (summary: "{selected_idea['summary']}").
+       The blog post should link to: {full_blog_url_en} with slug: {blog_link_tag_en}.
+    
+       Output a single JSON object with two keys:
+       1. `linkedin_post`: A concise LinkedIn post for the topic, including the link {full_blog_url_en}.
+       2. `blog_article`: A detailed Markdown blog article (approx. 1000 words) for the topic. This must be the full article, not a note.
+    
+       JSON Example:
+       {{
+         "linkedin_post": "Example LinkedIn post... Read more: {full_blog_url_en}",
+         "blog_article": "# Example Title\\n\\nFull Markdown article content..."
+       }}
+    
+       Reminder: ONLY the JSON object. No extra text, no ```json wrappers, just the raw JSON starting with {{ and ending with }}.
+       Ensure all string values inside the JSON are correctly escaped (newlines as \\n, quotes as \\", etc.).
+       """}
+    ]
+
+
+# Chunked translation (translation.py): the LinkedIn post and slug go in one small
+# JSON request, and each section of the article is translated on its own as
+# plain Markdown, so no single response has to carry the whole article.
+def build_post_translation_messages(linkedin_post_en, blog_link_tag_en, language_name="French"):
+    return [
+        {"role": "system", "content": f"You are an expert translator. Translate the provided texts from English to {language_name}. For the 'blog_link_tag', translate it into a suitable {language_name} slug (lowercase, hyphenated, 3-5 words, ASCII letters only). Output your response as a single JSON object with keys: 'linkedin_post' and 'blog_link_tag'."},
+        {"role": "user", "content": f"""
+        Please translate the following English content to {language_name}.
+
+        LinkedIn Post (English):
+        ---
+        {linkedin_post_en}
+        ---
+
+        Blog Link Tag (English Slug):
+        ---
+        {blog_link_tag_en}
+        ---
+
+        Return a JSON object with 'linkedin_post' and 'blog_link_tag', both in {language_name}.
+        Example JSON structure:
+        {{
+          "linkedin_post": "The translated LinkedIn post...",
+          "blog_link_tag": "the-translated-slug"
+        }}
+        """}
+    ]
+
+
+def build_chunk_translation_messages(markdown_chunk_en, language_name="French"):
+    return [
+        {"role": "system", "content": f"You are an expert translator. Translate the Markdown excerpt you are given from English to {language_name}. It is one section of a longer blog article. Keep the Markdown formatting (headings, lists, links, emphasis) exactly as it is and do not translate URLs. Reply with ONLY the translated Markdown: no commentary, no notes, and no ``` wrapper."},
+        {"role": "user", "content": markdown_chunk_en}
+    ]
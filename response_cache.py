@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+def make_cache_key(model, prompt_messages):
+    """Content address for an LLM call: the same model + messages always map to the same key."""
+    canonical = json.dumps([model, prompt_messages], sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Two-tier cache for OpenRouter responses.
+
+    The memory tier is an LRU bounded by entry count and total encoded size,
+    with a TTL per entry. The optional disk tier keeps one JSON file per key
+    under `disk_dir`, so popular responses survive a restart.
+    """
+
+    def __init__(self, max_entries=256, max_bytes=32 * 1024 * 1024, ttl_seconds=24 * 3600, disk_dir=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()  # key -> (expires_at, encoded_bytes)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "disk_hits": 0, "misses": 0, "stores": 0,
+                          "evictions": 0, "expirations": 0, "bypasses": 0}
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # --- Public API ---
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, encoded = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return json.loads(encoded)
+                self._drop(key)
+                self._counters["expirations"] += 1
+
+        encoded, value = self._disk_read(key, now)
+        with self._lock:
+            if encoded is None:
+                self._counters["misses"] += 1
+                return None
+            self._counters["disk_hits"] += 1
+            self._insert(key, now + self.ttl_seconds, encoded)
+        return value
+
+    def set(self, key, value):
+        encoded = json.dumps(value, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        expires_at = time.time() + self.ttl_seconds
+        with self._lock:
+            self._counters["stores"] += 1
+            self._insert(key, expires_at, encoded)
+        self._disk_write(key, expires_at, encoded)
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+        if self.disk_dir:
+            try:
+                os.remove(self._disk_path(key))
+            except OSError:
+                pass
+
+    def record_bypass(self):
+        with self._lock:
+            self._counters["bypasses"] += 1
+
+    def stats(self):
+        with self._lock:
+            return {**self._counters, "entries": len(self._entries), "bytes": self._bytes}
+
+    # --- Memory tier (call with self._lock held) ---
+    def _insert(self, key, expires_at, encoded):
+        if len(encoded) > self.max_bytes:
+            return  # a single oversized response would flush everything else
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = (expires_at, encoded)
+        self._bytes += len(encoded)
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            oldest_key = next(iter(self._entries))
+            self._drop(oldest_key)
+            self._counters["evictions"] += 1
+
+    def _drop(self, key):
+        _, encoded = self._entries.pop(key)
+        self._bytes -= len(encoded)
+
+    # --- Disk tier ---
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _disk_read(self, key, now):
+        """Return (encoded, value) for a live entry, else (None, None)."""
+        if not self.disk_dir:
+            return None, None
+        path = self._disk_path(key)
+        try:
+            with open(path, "rb") as f:
+                header, _, encoded = f.read().partition(b"\n")
+        except OSError:
+            return None, None
+        try:
+            # A corrupt or truncated file (bad header or body) counts as a miss, like an expired one.
+            expired = float(header or 0) <= now
+            value = None if expired else json.loads(encoded)
+        except ValueError:
+            expired = True
+        if expired:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None, None
+        return encoded, value
+
+    def _disk_write(self, key, expires_at, encoded):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(f"{expires_at}\n".encode("ascii"))
+                f.write(encoded)
+            os.replace(tmp_path, path)  # atomic, so concurrent workers never read half a file
+        except OSError as e:
+            print(f"Response cache: could not write {path}: {e}")
+
+
+def cache_from_env():
+    """Build the response cache from LLM_CACHE_* environment variables (None when disabled)."""
+    if os.getenv("LLM_CACHE_ENABLED", "true").lower() not in ("1", "true", "yes"):
+        return None
+    return ResponseCache(
+        max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256")),
+        max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+        ttl_seconds=int(os.getenv("LLM_CACHE_TTL_SECONDS", str(24 * 3600))),
+        disk_dir=os.getenv("LLM_CACHE_DIR") or None,
+    )
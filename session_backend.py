@@ -0,0 +1,90 @@
+import os
+import threading
+
+from flask.sessions import SecureCookieSessionInterface, SessionInterface
+
+# --- Session Backend ---
+# Choose your session backend (SESSION_BACKEND in .env):
+#   "filesystem" - Flask-Session files under flask_session/ (default, easy for local development)
+#   "redis"      - Flask-Session in Redis at REDIS_URL (needs the `redis` package), shared by all workers/nodes
+#   "cookie"     - Flask's built-in signed cookie; no server-side session I/O at all
+# Sessions only hold small references; generated articles live in the content store.
+# The backend is set up on the first request rather than at import, so starting
+# a worker does not import Flask-Session / redis, create directories or connect.
+
+
+class LazySessionInterface(SessionInterface):
+    """Builds the real session interface on first use and hands every call to it.
+
+    `factory` returns the real interface; `save_span` (optional) is a
+    context manager factory wrapped around every session write.
+    """
+
+    def __init__(self, factory, save_span=None):
+        self._factory = factory
+        self._save_span = save_span
+        self._interface = None
+        self._lock = threading.Lock()
+
+    @property
+    def interface(self):
+        if self._interface is None:
+            with self._lock:
+                if self._interface is None:
+                    self._interface = self._factory()
+        return self._interface
+
+    def open_session(self, app, request):
+        return self.interface.open_session(app, request)
+
+    def save_session(self, app, session, response):
+        if self._save_span is None:
+            return self.interface.save_session(app, session, response)
+        with self._save_span():
+            return self.interface.save_session(app, session, response)
+
+    def make_null_session(self, app):
+        return self.interface.make_null_session(app)
+
+    def is_null_session(self, obj):
+        return self.interface.is_null_session(obj)
+
+
+def build_session_interface(app, backend, file_dir):
+    if backend == "cookie":
+        return SecureCookieSessionInterface()
+
+    from flask_session import Session  # Import Flask-Session
+    if backend == "redis":
+        import redis
+        app.config["SESSION_TYPE"] = "redis"
+        app.config["SESSION_REDIS"] = redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+    elif backend == "filesystem":
+        app.config["SESSION_TYPE"] = "filesystem"
+
+        # Configure the directory for filesystem sessions.
+        if not os.path.exists(file_dir):
+            try:
+                os.makedirs(file_dir)
+                print(f"Created session directory: {file_dir}")
+            except OSError as e:
+                print(f"Error creating session directory {file_dir}: {e}")
+                # Depending on your needs, you might want to exit or handle this error differently
+        app.config["SESSION_FILE_DIR"] = file_dir
+        app.config["SESSION_FILE_THRESHOLD"] = int(os.getenv("SESSION_FILE_THRESHOLD", "500")) # Oldest files are pruned beyond this
+
+    # Session(app) installs its interface on the app; keep the lazy one installed and return the real one.
+    lazy_interface = app.session_interface
+    Session(app)
+    interface, app.session_interface = app.session_interface, lazy_interface
+    return interface
+
+
+def init_session_backend(app, backend, file_dir, save_span=None):
+    """Install a session interface for SESSION_BACKEND that is built on the first request."""
+    app.config["SESSION_PERMANENT"] = False # Make sessions non-permanent (browser-length) by default
+    app.config["SESSION_USE_SIGNER"] = True  # Encrypts the session ID cookie. Recommended.
+    # app.config["SESSION_COOKIE_SAMESITE"] = "Lax"
+    # app.config["SESSION_COOKIE_SECURE"] = True # In production with HTTPS, set this to True
+    app.session_interface = LazySessionInterface(lambda: build_session_interface(app, backend, file_dir), save_span)
+    return app.session_interface
@@ -0,0 +1,85 @@
+import threading
+from concurrent.futures import Future
+
+# --- Single-Flight ---
+# Identical calls that overlap in time share one execution: the first caller
+# (the leader) runs the function, later callers with the same key wait for it
+# and get the same result (or exception). Nothing is kept after the call ends;
+# that is the response cache's job.
+
+
+class SingleFlight:
+    """Coalesces concurrent calls by key.
+
+    Threads use `do`, which runs the call inline for the leader. Asyncio code
+    uses `submit`, which starts the leader's call on an executor and returns a
+    concurrent Future (await it with `asyncio.wrap_future`); followers only
+    get the Future, so waiting tasks do not take up executor threads.
+
+    A submitted call may still be queued behind busy executor threads when a
+    thread joins it with `do`. That thread runs the call itself instead of
+    waiting, since it may be one of the threads the queued call needs.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}  # key -> Future of the call in progress
+        self._queued = {}  # key -> (fn, args, kwargs) submitted but not started yet
+        self._counters = {"leaders": 0, "coalesced": 0}
+
+    def _claim(self, key, queued_call=None):
+        with self._lock:
+            future = self._flights.get(key)
+            leader = future is None
+            if leader:
+                future = self._flights[key] = Future()
+                if queued_call is not None:
+                    self._queued[key] = queued_call
+            self._counters["leaders" if leader else "coalesced"] += 1
+        return future, leader
+
+    def _run(self, key, future, fn, args, kwargs):
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                del self._flights[key]
+            future.set_exception(e)
+        else:
+            with self._lock:
+                del self._flights[key]
+            future.set_result(result)
+
+    def _start(self, key, future):
+        # Runs on the executor; the call may already have been taken by a `do` follower.
+        with self._lock:
+            queued_call = self._queued.pop(key, None)
+        if queued_call is not None:
+            self._run(key, future, *queued_call)
+
+    def do(self, key, fn, *args, **kwargs):
+        future, leader = self._claim(key)
+        call = (fn, args, kwargs) if leader else None
+        if not leader:
+            with self._lock:
+                call = self._queued.pop(key, None)
+        if call is not None:
+            self._run(key, future, *call)
+        return future.result()
+
+    def submit(self, key, executor, fn, *args, **kwargs):
+        future, leader = self._claim(key, (fn, args, kwargs))
+        if leader:
+            try:
+                executor.submit(self._start, key, future)
+            except RuntimeError as e:  # executor shut down
+                with self._lock:
+                    if self._queued.pop(key, None) is None:
+                        return future  # a `do` follower is already running it
+                    del self._flights[key]
+                future.set_exception(e)
+        return future
+
+    def stats(self):
+        with self._lock:
+            return {**self._counters, "in_flight": len(self._flights)}
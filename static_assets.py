@@ -0,0 +1,97 @@
+import gzip
+import hashlib
+import mimetypes
+import os
+import threading
+
+from flask import Response, abort, request
+from werkzeug.security import safe_join
+
+# --- Static Assets ---
+# Files under static/ are read once per worker, gzip-compressed once (text
+# types only), and served from memory with a content hash as ETag. Pages link
+# to them with that hash in the URL (?v=...), so browsers can cache them for
+# a year and still pick up a new version on the next deploy. Files changed on
+# disk are reloaded on their next request.
+
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json", "image/svg+xml")
+
+
+class StaticAssets:
+    """In-memory, precompressed static files with ETags.
+
+    `max_age` is the Cache-Control lifetime of versioned URLs; unversioned
+    ones must be revalidated (a 304 when the ETag still matches).
+    """
+
+    def __init__(self, folder, max_age=31536000):
+        self.folder = folder
+        self.max_age = max_age
+        self._assets = {}  # filename -> asset dict
+        self._lock = threading.Lock()
+        self._counters = {"served": 0, "not_modified": 0, "gzip": 0, "loaded": 0}
+
+    def _load(self, filename):
+        path = safe_join(self.folder, filename)
+        try:
+            mtime = os.stat(path).st_mtime if path else None
+        except OSError:
+            mtime = None
+        if mtime is None or not os.path.isfile(path):
+            return None
+        asset = self._assets.get(filename)
+        if asset is not None and asset["mtime"] == mtime:
+            return asset
+
+        with open(path, "rb") as f:
+            data = f.read()
+        mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        compressed = None
+        if mimetype.startswith(COMPRESSIBLE_TYPES):
+            compressed = gzip.compress(data, 9, mtime=0)
+            if len(compressed) >= len(data):
+                compressed = None
+        asset = {"data": data, "gzip": compressed, "mimetype": mimetype, "mtime": mtime,
+                 "etag": hashlib.sha256(data).hexdigest()[:16]}
+        with self._lock:
+            self._assets[filename] = asset
+            self._counters["loaded"] += 1
+        return asset
+
+    def version(self, filename):
+        asset = self._load(filename)
+        return asset["etag"] if asset else None
+
+    def _count(self, name):
+        with self._lock:
+            self._counters[name] += 1
+
+    def response(self, filename):
+        asset = self._load(filename)
+        if asset is None:
+            abort(404)
+        if request.args.get("v") == asset["etag"]:
+            cache_control = f"public, max-age={self.max_age}, immutable"
+        else:
+            cache_control = "no-cache"
+        headers = {"ETag": f'"{asset["etag"]}"', "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        if asset["etag"] in request.if_none_match:
+            self._count("not_modified")
+            return Response(status=304, headers=headers)
+
+        body = asset["data"]
+        if asset["gzip"] is not None and "gzip" in request.accept_encodings:
+            body = asset["gzip"]
+            headers["Content-Encoding"] = "gzip"
+            self._count("gzip")
+        self._count("served")
+        return Response(body, mimetype=asset["mimetype"], headers=headers)
+
+    def stats(self):
+        with self._lock:
+            return {**self._counters, "assets": len(self._assets)}
+
+
+def static_assets_from_env(folder):
+    """Build the static asset server from STATIC_MAX_AGE_SECONDS."""
+    return StaticAssets(folder, max_age=int(os.getenv("STATIC_MAX_AGE_SECONDS", "31536000")))
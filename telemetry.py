@@ -0,0 +1,303 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+# --- Telemetry ---
+# Counters and latency histograms for the hot path (upstream calls, parsing,
+# session writes, template rendering), token and cost accounting per route
+# from OpenRouter's `usage` field, and sampled per-request traces. Everything
+# is exported in the Prometheus text format from /metrics. Debug payload dumps
+# go through a level-gated, sampled logger so production pays nothing for them.
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+METRIC_PREFIX = "app_"
+
+_current_trace = contextvars.ContextVar("trace", default=None)
+
+
+def parse_model_prices(value):
+    """Turns "deepseek/deepseek-chat=0.27:1.10" into {model: (USD per 1M prompt tokens, USD per 1M completion tokens)}."""
+    prices = {}
+    for entry in (value or "").split(","):
+        if not entry.strip():
+            continue
+        model, _, numbers = entry.strip().rpartition("=")
+        try:
+            prompt_price, _, completion_price = numbers.partition(":")
+            prices[model] = (float(prompt_price or 0), float(completion_price or 0))
+        except ValueError:
+            print(f"Warning: Ignoring malformed LLM_MODEL_PRICES entry '{entry.strip()}'. Expected model=prompt_usd:completion_usd (per million tokens)")
+    return prices
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}" if labels else ""
+
+
+def _metric_name(*parts):
+    return "".join(c if c.isalnum() else "_" for c in "_".join(str(part) for part in parts if part))
+
+
+def percentile(values, pct, default=None):
+    """Nearest-rank `pct` percentile of `values`, or `default` when there are none."""
+    if not values:
+        return default
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Metrics:
+    """Thread-safe counters and histograms keyed by (name, sorted labels)."""
+
+    def __init__(self, buckets=DURATION_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}  # key -> [bucket counts..., sum, count]
+        self._help = {}
+
+    def inc(self, name, value=1, help_text=None, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    def observe(self, name, seconds, help_text=None, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    histogram[index] += 1
+            histogram[-2] += seconds
+            histogram[-1] += 1
+            if help_text:
+                self._help.setdefault(name, help_text)
+
+    def counter_values(self, name):
+        with self._lock:
+            return {labels: value for (metric, labels), value in self._counters.items() if metric == name}
+
+    def render(self):
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+            help_texts = dict(self._help)
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                if name in help_texts:
+                    lines.append(f"# HELP {METRIC_PREFIX}{name} {help_texts[name]}")
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} counter")
+            lines.append(f"{METRIC_PREFIX}{name}{_labels(labels)} {value:g}")
+        for (name, labels), histogram in histograms:
+            if name not in seen:
+                seen.add(name)
+                if name in help_texts:
+                    lines.append(f"# HELP {METRIC_PREFIX}{name} {help_texts[name]}")
+                lines.append(f"# TYPE {METRIC_PREFIX}{name} histogram")
+            for bound, count in zip(self.buckets, histogram):
+                lines.append(f"{METRIC_PREFIX}{name}_bucket{_labels(labels + (('le', f'{bound:g}'),))} {count}")
+            lines.append(f"{METRIC_PREFIX}{name}_bucket{_labels(labels + (('le', '+Inf'),))} {histogram[-1]}")
+            lines.append(f"{METRIC_PREFIX}{name}_sum{_labels(labels)} {histogram[-2]:.6f}")
+            lines.append(f"{METRIC_PREFIX}{name}_count{_labels(labels)} {histogram[-1]}")
+        return lines
+
+
+def render_stats(component, stats):
+    """Prometheus gauges for a component's stats() dict; nested dicts become a `key` label, other values are skipped."""
+    lines = []
+    for stat, value in sorted((stats or {}).items()):
+        if isinstance(value, dict):
+            for key, nested in sorted(value.items()):
+                for nested_stat, nested_value in sorted((nested if isinstance(nested, dict) else {"value": nested}).items()):
+                    if isinstance(nested_value, (int, float)):
+                        name = METRIC_PREFIX + _metric_name(component, stat, nested_stat)
+                        lines.append(f"{name}{_labels((('key', key),))} {float(nested_value):g}")
+        elif isinstance(value, (int, float)):  # bools too
+            lines.append(f"{METRIC_PREFIX}{_metric_name(component, stat)} {float(value):g}")
+    return lines
+
+
+class Trace:
+    """One request's spans; only recorded when the request was sampled."""
+
+    def __init__(self, route, sampled):
+        self.id = uuid.uuid4().hex[:16]
+        self.route = route
+        self.sampled = sampled
+        self.started = time.perf_counter()
+        self.spans = []
+
+
+class SampledLogger:
+    """Debug payload dumps that cost nothing unless LOG_LEVEL=DEBUG, and then only for a sample."""
+
+    def __init__(self, logger, sample_rate=1.0):
+        self.logger = logger
+        self.sample_rate = sample_rate
+
+    def enabled(self):
+        return self.logger.isEnabledFor(logging.DEBUG) and random.random() < self.sample_rate
+
+    def debug_payload(self, label, payload):
+        # The payload is only serialized when this call is actually logged.
+        if not self.enabled():
+            return
+        try:
+            self.logger.debug("%s:\n%s", label, json.dumps(payload, indent=2, ensure_ascii=False))
+        except TypeError:
+            self.logger.debug("%s (not JSON-serializable): %r", label, payload)
+
+
+class Telemetry:
+    """Metrics, spans and sampled tracing for one worker process.
+
+    `trace_sample_rate` is the share of requests whose spans are kept (the
+    most recent `trace_buffer` are available from recent_traces() and each
+    is logged at INFO). Metrics are recorded for every request when
+    `enabled`. `model_prices` maps model IDs to USD per million prompt and
+    completion tokens, used when a response does not report its own cost.
+    """
+
+    def __init__(self, enabled=True, trace_sample_rate=0.0, trace_buffer=100, model_prices=None, logger=None):
+        self.enabled = enabled
+        self.trace_sample_rate = trace_sample_rate
+        self.model_prices = dict(model_prices or {})
+        self.metrics = Metrics()
+        self.logger = logger or logging.getLogger("linkedin_generator")
+        self._traces = deque(maxlen=trace_buffer)
+
+    # --- Requests and spans ---
+    def start_trace(self, route):
+        trace = Trace(route, sampled=self.trace_sample_rate > 0 and random.random() < self.trace_sample_rate)
+        return trace, _current_trace.set(trace)
+
+    def finish_trace(self, trace, token, status):
+        try:
+            _current_trace.reset(token)
+        except ValueError:
+            pass  # finished from another context; the context it was set in is gone anyway
+        duration = time.perf_counter() - trace.started
+        if self.enabled:
+            self.metrics.inc("http_requests_total", route=trace.route, status=status,
+                             help_text="Requests served, by route and status code.")
+            self.metrics.observe("http_request_duration_seconds", duration, route=trace.route,
+                                 help_text="Time until the response was returned (streams keep running after this).")
+        if trace.sampled:
+            record = {"trace_id": trace.id, "route": trace.route, "status": status,
+                      "duration_ms": round(duration * 1000, 1), "spans": trace.spans}
+            self._traces.append(record)
+            self.logger.info("trace %s", json.dumps(record))
+
+    @contextmanager
+    def span(self, stage, route=None, **attributes):
+        """Times the block as `stage` (upstream, parse, session_write, render, ...) of `route`."""
+        trace = _current_trace.get()
+        if not self.enabled and (trace is None or not trace.sampled):
+            yield
+            return
+        route = route or (trace.route if trace else "-")
+        started = time.perf_counter()
+        error = None
+        try:
+            yield
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            if self.enabled:
+                self.metrics.observe("stage_duration_seconds", duration, stage=stage, route=route,
+                                     help_text="Time spent per stage of a request.")
+            if trace is not None and trace.sampled:
+                span = {"stage": stage, "route": route, "start_ms": round((started - trace.started) * 1000, 1),
+                        "duration_ms": round(duration * 1000, 1), **attributes}
+                if error:
+                    span["error"] = error
+                trace.spans.append(span)
+
+    def bind(self, fn):
+        """`fn` wrapped to run in a copy of the current context, so spans on an executor thread join this request's trace."""
+        return functools.partial(contextvars.copy_context().run, fn)
+
+    # --- Token accounting ---
+    def record_usage(self, route, model, usage):
+        """Counts an upstream call's tokens and cost (usage.cost when reported, else LLM_MODEL_PRICES)."""
+        if not self.enabled:
+            return
+        route = route or "-"
+        self.metrics.inc("llm_calls_total", route=route, model=model, help_text="Upstream model calls that returned.")
+        if not usage:
+            return
+        prompt_tokens = usage.get("prompt_tokens") or 0
+        completion_tokens = usage.get("completion_tokens") or 0
+        self.metrics.inc("llm_tokens_total", prompt_tokens, route=route, model=model, kind="prompt",
+                         help_text="Tokens billed, from the responses' usage field.")
+        self.metrics.inc("llm_tokens_total", completion_tokens, route=route, model=model, kind="completion")
+        cost = usage.get("cost")
+        if cost is None and model in self.model_prices:
+            prompt_price, completion_price = self.model_prices[model]
+            cost = (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+        if cost:
+            self.metrics.inc("llm_cost_usd_total", cost, route=route, model=model,
+                             help_text="Estimated spend in USD, by route and model.")
+
+    def usage_by_route(self):
+        """{route: {"prompt_tokens", "completion_tokens", "cost_usd"}} summed over models."""
+        totals = {}
+        for labels, value in self.metrics.counter_values("llm_tokens_total").items():
+            labels = dict(labels)
+            route = totals.setdefault(labels["route"], {"prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0})
+            route[f"{labels['kind']}_tokens"] += value
+        for labels, value in self.metrics.counter_values("llm_cost_usd_total").items():
+            labels = dict(labels)
+            route = totals.setdefault(labels["route"], {"prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0})
+            route["cost_usd"] = round(route["cost_usd"] + value, 6)
+        return totals
+
+    def recent_traces(self):
+        return list(self._traces)
+
+    def render(self, component_stats=None):
+        """The Prometheus text exposition: our metrics plus every component's stats() as gauges."""
+        lines = self.metrics.render()
+        for component, stats in (component_stats or {}).items():
+            lines.extend(render_stats(component, stats))
+        return "\n".join(lines) + "\n"
+
+
+def telemetry_from_env():
+    """Build telemetry and configure logging from METRICS_ENABLED, TRACE_SAMPLE_RATE, LOG_LEVEL, DEBUG_LOG_SAMPLE_RATE and LLM_MODEL_PRICES."""
+    logger = logging.getLogger("linkedin_generator")
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(message)s"))
+        logger.addHandler(handler)
+        logger.propagate = False
+    logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    telemetry = Telemetry(
+        enabled=os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes"),
+        trace_sample_rate=float(os.getenv("TRACE_SAMPLE_RATE", "0")),
+        model_prices=parse_model_prices(os.getenv("LLM_MODEL_PRICES", "")),
+        logger=logger,
+    )
+    return telemetry, SampledLogger(logger, float(os.getenv("DEBUG_LOG_SAMPLE_RATE", "1")))
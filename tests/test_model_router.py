@@ -0,0 +1,173 @@
+"""ModelRouter against the local mock OpenRouter server: hedging, failover and losers.
+
+    python -m pytest tests/test_model_router.py
+"""
+import os
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from mock_openrouter import MockOpenRouter  # noqa: E402
+from model_router import ModelRouter  # noqa: E402
+from openrouter_client import OpenRouterClient  # noqa: E402
+
+PRIMARY, BACKUP = "primary/model", "backup/model"
+PROMPT = [{"role": "user", "content": "Give me ideas."}]
+
+
+def is_usable(api_response):
+    return bool(api_response and api_response.get("choices"))
+
+
+@pytest.fixture
+def start_mock():
+    # Starts mock servers (and a client for each) and shuts them down after the test.
+    started = []
+
+    def start(**options):
+        server = MockOpenRouter(seed=1, **options).start()
+        client = OpenRouterClient("test", base_url=server.base_url, max_retries=0, pool_maxsize=8)
+        started.append((server, client))
+        return server, client
+
+    yield start
+    for server, client in started:
+        server.shutdown()
+        client.close()
+
+
+def make_router(**options):
+    settings = {"hedge_percentile": 95, "initial_hedge_delay": 0.1, "min_hedge_delay": 0.01,
+                "min_samples": 1000, "max_workers": 8}  # min_samples: always hedge after initial_hedge_delay
+    settings.update(options)
+    return ModelRouter(**settings)
+
+
+def test_hedge_fires_only_after_the_delay(start_mock):
+    server, client = start_mock(latency_ms=30, model_latency_ms={BACKUP: 10})
+    router = make_router(initial_hedge_delay=0.3)
+
+    model, result = router.call("ideas", [PRIMARY, BACKUP], lambda model: client.chat_completion(PROMPT, model), is_usable)
+
+    assert model == PRIMARY and is_usable(result)
+    assert router.stats()["hedged"] == 0
+    assert server.stats()["calls_by_model"] == {PRIMARY: 1}
+
+
+def test_backup_wins_when_primary_is_slow(start_mock):
+    server, client = start_mock(latency_ms=10, model_latency_ms={PRIMARY: 800})
+    router = make_router(initial_hedge_delay=0.1)
+
+    started = time.monotonic()
+    model, result = router.call("ideas", [PRIMARY, BACKUP], lambda model: client.chat_completion(PROMPT, model), is_usable)
+    elapsed = time.monotonic() - started
+
+    assert model == BACKUP and is_usable(result)
+    assert 0.1 <= elapsed < 0.6  # hedged after the delay, answered long before the primary
+    stats = router.stats()
+    assert stats["hedged"] == 1 and stats["backup_wins"] == 1
+    assert server.stats()["calls_by_model"] == {PRIMARY: 1, BACKUP: 1}
+
+
+def test_hedge_delay_follows_the_primarys_latency_profile(start_mock):
+    # Once min_samples answers are in, the hedge delay is the primary's p95 rather
+    # than initial_hedge_delay, so a call that falls into its slow tail is hedged early.
+    server, client = start_mock(latency_ms=10, tail_ms=800, tail_models=[PRIMARY])
+    router = make_router(min_samples=10, initial_hedge_delay=5.0)
+
+    def call():
+        started = time.monotonic()
+        model, _ = router.call("ideas", [PRIMARY, BACKUP], lambda model: client.chat_completion(PROMPT, model), is_usable)
+        return model, time.monotonic() - started
+
+    for _ in range(10):
+        call()
+    assert router.stats()["hedged"] == 0
+    assert router.hedge_delay("ideas", PRIMARY) < 0.1
+
+    server.tail_probability = 1.0  # every primary call is now slow
+    model, elapsed = call()
+
+    assert model == BACKUP
+    assert elapsed < 0.4
+    assert router.stats()["hedged"] == 1
+
+
+@pytest.mark.parametrize("fault", ["server_error_probability", "rate_limit_probability"])
+def test_failover_on_server_errors_and_rate_limits(start_mock, fault):
+    failing_server, failing_client = start_mock(latency_ms=5, **{fault: 1.0})
+    healthy_server, healthy_client = start_mock(latency_ms=5)
+    clients = {PRIMARY: failing_client, BACKUP: healthy_client}
+    router = make_router(hedge_percentile=0)  # failover only
+
+    model, result = router.call("ideas", [PRIMARY, BACKUP], lambda model: clients[model].chat_completion(PROMPT, model),
+                                is_usable)
+
+    assert model == BACKUP and is_usable(result)
+    stats = router.stats()
+    assert stats["failovers"] == 1 and stats["hedged"] == 0
+    assert stats["models"][f"ideas:{PRIMARY}"]["error_rate"] == 1.0
+    assert failing_server.stats()["rate_limited" if fault == "rate_limit_probability" else "server_errors"] == 1
+
+
+def test_failing_model_is_tried_last(start_mock):
+    failing_server, failing_client = start_mock(latency_ms=5, server_error_probability=1.0)
+    healthy_server, healthy_client = start_mock(latency_ms=5)
+    clients = {PRIMARY: failing_client, BACKUP: healthy_client}
+    router = make_router(hedge_percentile=0, min_samples=3)
+
+    for _ in range(3):
+        router.call("ideas", [PRIMARY, BACKUP], lambda model: clients[model].chat_completion(PROMPT, model), is_usable)
+    calls_before = failing_server.stats()["calls"]
+    model, _ = router.call("ideas", [PRIMARY, BACKUP], lambda model: clients[model].chat_completion(PROMPT, model),
+                           is_usable)
+
+    assert router.candidates("ideas", [PRIMARY, BACKUP]) == [BACKUP, PRIMARY]
+    assert model == BACKUP
+    assert failing_server.stats()["calls"] == calls_before
+
+
+def test_losing_request_is_abandoned(start_mock):
+    server, client = start_mock(latency_ms=10, model_latency_ms={PRIMARY: 500})
+    router = make_router(initial_hedge_delay=0.05)
+    answers = []
+
+    def fn(model):
+        api_response = client.chat_completion(PROMPT, model)
+        answers.append(model)
+        return api_response
+
+    model, _ = router.call("ideas", [PRIMARY, BACKUP], fn, is_usable)
+
+    assert model == BACKUP
+    assert router.stats()["abandoned"] == 1
+    assert answers == [BACKUP]  # returned without waiting for the primary
+
+    # The sent request is left to finish in the background; its answer is ignored
+    # but its latency still counts towards the primary's profile.
+    deadline = time.monotonic() + 2
+    while PRIMARY not in answers and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert answers == [BACKUP, PRIMARY]
+    primary_stats = router.stats()["models"][f"ideas:{PRIMARY}"]
+    assert primary_stats["calls"] == 1 and primary_stats["wins"] == 0
+
+
+def test_queued_loser_is_cancelled(start_mock):
+    # With every worker busy, the hedged call is still queued when the primary answers; it is dropped.
+    server, client = start_mock(latency_ms=10, model_latency_ms={PRIMARY: 300})
+    router = make_router(initial_hedge_delay=0.05, max_workers=1)
+    blocker = router._executor.submit(time.sleep, 0.0)  # warm the single worker thread
+    blocker.result()
+
+    model, _ = router.call("ideas", [PRIMARY, BACKUP], lambda model: client.chat_completion(PROMPT, model), is_usable)
+    time.sleep(0.1)
+
+    assert model == PRIMARY
+    assert router.stats()["abandoned"] == 1
+    assert server.stats()["calls_by_model"].get(BACKUP, 0) == 0
@@ -0,0 +1,70 @@
+"""SingleFlight: blocking and executor-backed callers sharing one flight.
+
+    python -m pytest tests/test_singleflight.py
+"""
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from singleflight import SingleFlight  # noqa: E402
+
+
+def test_concurrent_do_calls_share_one_run():
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def fetch():
+        calls.append(1)
+        release.wait(5)
+        return "v"
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(flights.do, "k", fetch) for _ in range(4)]
+        time.sleep(0.1)
+        release.set()
+        assert [f.result(timeout=5) for f in futures] == ["v"] * 4
+    assert len(calls) == 1
+    assert flights.stats() == {"leaders": 1, "coalesced": 3, "in_flight": 0}
+
+
+def test_pool_thread_runs_a_queued_leader_instead_of_waiting():
+    # Both workers join a flight whose submitted leader is queued behind them.
+    flights = SingleFlight()
+    calls = []
+    executor = ThreadPoolExecutor(max_workers=2)
+    started = threading.Barrier(3)
+
+    def fetch(caller):
+        calls.append(caller)
+        time.sleep(0.3)
+
+    def in_pool():
+        started.wait(5)
+        time.sleep(0.1)
+        return flights.do("k", fetch, "do")
+
+    followers = [executor.submit(in_pool) for _ in range(2)]
+    started.wait(5)
+    leader = flights.submit("k", executor, fetch, "submit")
+    try:
+        for future in followers + [leader]:
+            future.result(timeout=5)
+    finally:
+        executor.shutdown(wait=False)
+    assert calls == ["submit"]
+    assert flights.stats() == {"leaders": 1, "coalesced": 2, "in_flight": 0}
+
+
+def test_submit_after_shutdown_fails_the_flight():
+    flights = SingleFlight()
+    executor = ThreadPoolExecutor(max_workers=1)
+    executor.shutdown()
+    future = flights.submit("k", executor, lambda: "v")
+    assert isinstance(future.exception(timeout=1), RuntimeError)
+    assert flights.stats()["in_flight"] == 0
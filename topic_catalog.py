@@ -0,0 +1,204 @@
+import bisect
+import csv
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from topics import TOPICS_DATA
+
+# --- Topic Catalog ---
+# Topics can come from the built-in list (topics.py) or from a JSON, CSV or
+# SQLite file with thousands of entries. The catalog gives every topic a
+# stable ID, looks topics up by ID or title in O(1), and keeps an inverted
+# index from keyword/category/title words to topics for search and filtering.
+# Search results are in catalog order, so pages are stable.
+
+WORD_RE = re.compile(r"[a-z0-9]+")
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def slugify(text):
+    return "-".join(WORD_RE.findall(text.lower())) or "topic"
+
+
+def tokenize(text):
+    return WORD_RE.findall(str(text).lower())
+
+
+def _split_keywords(value):
+    # Keywords may already be a list (JSON), a JSON array string, or "a; b; c" / "a|b|c" (CSV, SQLite).
+    if isinstance(value, list):
+        return [str(keyword).strip() for keyword in value if str(keyword).strip()]
+    value = (value or "").strip()
+    if value.startswith("["):
+        try:
+            return _split_keywords(json.loads(value))
+        except ValueError:
+            pass
+    return [keyword.strip() for keyword in re.split(r"[;|]", value) if keyword.strip()]
+
+
+# --- Loaders ---
+def load_json_topics(path):
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    return data["topics"] if isinstance(data, dict) else data
+
+
+def load_csv_topics(path):
+    # Columns: title, category, keywords (";"-separated), and optionally id.
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def load_sqlite_topics(path, table="topics"):
+    # A `topics` table with title, category and keywords columns (and optionally id).
+    if not re.fullmatch(r"\w+", table):
+        raise ValueError(f"Invalid topic table name: {table}")
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        conn.row_factory = sqlite3.Row
+        return [dict(row) for row in conn.execute(f"SELECT * FROM {table}")]
+    finally:
+        conn.close()
+
+
+def load_topics(path=None, table="topics"):
+    """Raw topic dicts from a .json, .csv or .sqlite/.db file (the built-in list when `path` is empty)."""
+    if not path:
+        return TOPICS_DATA["topics"]
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".json":
+        return load_json_topics(path)
+    if extension == ".csv":
+        return load_csv_topics(path)
+    if extension in (".sqlite", ".sqlite3", ".db"):
+        return load_sqlite_topics(path, table)
+    raise ValueError(f"Unsupported topic catalog file: {path} (use .json, .csv or .sqlite)")
+
+
+class TopicCatalog:
+    """Indexed, read-only topic catalog.
+
+    `loader` returns the raw topic dicts; it runs once, on first use when
+    `lazy`, else right away. Topics without an "id" get one from their title.
+    """
+
+    def __init__(self, loader, lazy=False):
+        self._loader = loader
+        self._lock = threading.Lock()
+        self._loaded = False
+        if not lazy:
+            self._ensure_loaded()
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if not self._loaded:
+                self._build(self._loader())
+                self._loaded = True
+
+    def _build(self, raw_topics):
+        self._topics = []                 # catalog order
+        self._position_by_id = {}
+        self._position_by_title = {}
+        self._by_category = {}            # lowercased category -> positions, ascending
+        self._index = {}                  # word -> positions, ascending
+        self._category_names = {}         # lowercased category -> display name
+        for raw in raw_topics:
+            title = str(raw.get("title") or "").strip()
+            if not title:
+                continue
+            category = str(raw.get("category") or "").strip()
+            topic_id = str(raw.get("id") or "").strip() or slugify(title)
+            if topic_id in self._position_by_id:
+                suffix = 2
+                while f"{topic_id}-{suffix}" in self._position_by_id:
+                    suffix += 1
+                topic_id = f"{topic_id}-{suffix}"
+            topic = {"id": topic_id, "category": category, "title": title,
+                     "keywords": _split_keywords(raw.get("keywords"))}
+            position = len(self._topics)
+            self._topics.append(topic)
+            self._position_by_id[topic_id] = position
+            self._position_by_title.setdefault(title, position)
+            if category:
+                self._category_names.setdefault(category.lower(), category)
+                self._by_category.setdefault(category.lower(), []).append(position)
+            words = set(tokenize(title)) | set(tokenize(category))
+            for keyword in topic["keywords"]:
+                words.update(tokenize(keyword))
+            for word in words:
+                self._index.setdefault(word, []).append(position)
+        self._words = sorted(self._index)  # for prefix lookups
+
+    def __len__(self):
+        self._ensure_loaded()
+        return len(self._topics)
+
+    def all(self):
+        self._ensure_loaded()
+        return list(self._topics)
+
+    def get(self, topic_id):
+        self._ensure_loaded()
+        position = self._position_by_id.get(str(topic_id))
+        return self._topics[position] if position is not None else None
+
+    def get_by_title(self, title):
+        self._ensure_loaded()
+        position = self._position_by_title.get(title)
+        return self._topics[position] if position is not None else None
+
+    def categories(self):
+        """[(category, topic count)] in order of first appearance."""
+        self._ensure_loaded()
+        return [(self._category_names[key], len(positions)) for key, positions in self._by_category.items()]
+
+    def search(self, query="", category=None, offset=0, limit=DEFAULT_PAGE_SIZE):
+        """(total matches, topics[offset:offset + limit]) for topics matching every query word, in `category`.
+
+        A query word matches a keyword, category or title word, or the start
+        of one when it is the last word (so search-as-you-type works).
+        """
+        self._ensure_loaded()
+        offset = max(0, int(offset))
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        candidate_sets = []
+        if category:
+            candidate_sets.append(self._by_category.get(category.lower(), []))
+        words = tokenize(query or "")
+        for index, word in enumerate(words):
+            if index == len(words) - 1 and word not in self._index:
+                # Prefix match for the word still being typed.
+                positions = set()
+                start = bisect.bisect_left(self._words, word)
+                while start < len(self._words) and self._words[start].startswith(word):
+                    positions.update(self._index[self._words[start]])
+                    start += 1
+                candidate_sets.append(positions)
+            else:
+                candidate_sets.append(self._index.get(word, []))
+
+        if not candidate_sets:
+            return len(self._topics), self._topics[offset:offset + limit]
+        candidate_sets.sort(key=len)  # intersect starting from the rarest word
+        matches = set(candidate_sets[0])
+        for positions in candidate_sets[1:]:
+            if not matches:
+                break
+            matches.intersection_update(positions)
+        ordered = sorted(matches)
+        return len(ordered), [self._topics[position] for position in ordered[offset:offset + limit]]
+
+
+def topic_catalog_from_env():
+    """Build the catalog from TOPIC_CATALOG_PATH / TOPIC_CATALOG_TABLE / TOPIC_CATALOG_LAZY."""
+    path = os.getenv("TOPIC_CATALOG_PATH", "")
+    table = os.getenv("TOPIC_CATALOG_TABLE", "topics")
+    lazy = os.getenv("TOPIC_CATALOG_LAZY", "false").lower() in ("1", "true", "yes")
+    return TopicCatalog(lambda: load_topics(path, table), lazy=lazy)
@@ -0,0 +1,13 @@
+# --- Topics Data ---
+TOPICS_DATA = {
+  "topics": [
+    {"category": "cybersecurity", "title": "Password Security Basics", "keywords": ["passwords", "security", "authentication", "best practices"]},
+    {"category": "cybersecurity", "title": "Understanding Phishing Attacks", "keywords": ["phishing", "email security", "social engineering", "prevention"]},
+    {"category": "networking", "title": "VPN Explained Simply", "keywords": ["VPN", "remote work", "privacy", "security"]},
+    {"category": "networking", "title": "Network Security Fundamentals", "keywords": ["firewall", "network protection", "monitoring", "basics"]},
+    {"category": "AI", "title": "AI in Business: Practical Applications", "keywords": ["artificial intelligence", "business automation", "productivity", "implementation"]},
+    {"category": "AI", "title": "Machine Learning for Non-Technical Teams", "keywords": ["machine learning", "data analysis", "business intelligence", "simple explanation"]},
+    {"category": "cloud", "title": "Cloud Storage Security Best Practices", "keywords": ["cloud security", "data protection", "backup", "compliance"]},
+    {"category": "cloud", "title": "Moving to the Cloud: What HR Needs to Know", "keywords": ["cloud migration", "HR considerations", "employee training", "change management"]}
+  ]
+}
@@ -0,0 +1,197 @@
+import re
+
+from languages import LANGUAGES
+from llm_json import POST_TRANSLATION_SCHEMA, LLMParseError, ParseResult, parse_llm_json
+from prompts import build_chunk_translation_messages, build_post_translation_messages
+
+# --- Markdown Chunking ---
+# Articles are split along their Markdown structure so each section can be
+# translated on its own (and concurrently). Code blocks are never sent to the
+# model, and the whitespace between blocks is kept exactly as it was.
+
+_FENCE = re.compile(r"^ {0,3}(`{3,}|~{3,})")
+_HEADING = re.compile(r"^ {0,3}#{1,6}(\s|$)")
+_EDGE_WHITESPACE = re.compile(r"^(\s*)(.*?)(\s*)$", re.DOTALL)
+
+
+def _markdown_blocks(markdown_text):
+    """Yields (kind, text) pairs, kind being "code", "blank", "heading" or "text".
+
+    Joining the texts in order gives back the input unchanged.
+    """
+    lines = markdown_text.splitlines(keepends=True)
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        fence = _FENCE.match(line)
+        if fence:
+            j = i + 1
+            while j < len(lines) and not lines[j].strip().startswith(fence.group(1)):
+                j += 1
+            j = min(j + 1, len(lines))  # include the closing fence (an unclosed block runs to the end)
+            yield "code", "".join(lines[i:j])
+        elif not line.strip():
+            j = i + 1
+            while j < len(lines) and not lines[j].strip():
+                j += 1
+            yield "blank", "".join(lines[i:j])
+        elif _HEADING.match(line):
+            j = i + 1
+            yield "heading", line
+        else:
+            j = i + 1
+            while j < len(lines) and lines[j].strip() and not _FENCE.match(lines[j]) and not _HEADING.match(lines[j]):
+                j += 1
+            yield "text", "".join(lines[i:j])
+        i = j
+
+
+class Segment:
+    __slots__ = ("text", "translate")
+
+    def __init__(self, text, translate):
+        self.text = text
+        self.translate = translate  # False for code blocks and whitespace, which are copied as-is
+
+
+def split_markdown(markdown_text, max_chars=2000):
+    """Splits an article into segments: one per section, with long sections split between paragraphs.
+
+    A heading always starts a new chunk; paragraphs are added to the current
+    chunk until it would exceed `max_chars`. `max_chars <= 0` keeps the article
+    in one piece.
+    """
+    if max_chars <= 0:
+        return [Segment(markdown_text, True)] if markdown_text.strip() else [Segment(markdown_text, False)]
+
+    segments = []
+    current = []
+    current_size = 0
+    current_has_body = False  # a heading is never sent on its own, even if its first paragraph is long
+
+    def flush():
+        nonlocal current, current_size, current_has_body
+        if current:
+            segments.append(Segment("".join(current), True))
+        current, current_size, current_has_body = [], 0, False
+
+    for kind, text in _markdown_blocks(markdown_text):
+        if kind == "code":
+            flush()
+            segments.append(Segment(text, False))
+            continue
+        if kind == "blank":
+            if current:
+                current.append(text)
+                current_size += len(text)
+            else:
+                segments.append(Segment(text, False))
+            continue
+        if kind == "heading" or (current_has_body and current_size + len(text) > max_chars):
+            flush()
+        current.append(text)
+        current_size += len(text)
+        current_has_body = current_has_body or kind == "text"
+    flush()
+    return segments
+
+
+# --- Translation Plan ---
+
+def _response_text(api_response):
+    if not api_response or not api_response.get('choices'):
+        return None
+    return api_response['choices'][0]['message']['content']
+
+
+def _clean_chunk_translation(raw_text, segment_text):
+    # Models sometimes wrap the whole answer in ```markdown fences despite the prompt.
+    body = (raw_text or "").strip()
+    if body.startswith("```") and body.endswith("```") and "\n" in body:
+        body = body[body.index("\n") + 1:-3].strip()
+    if not body:
+        raise LLMParseError("The AI returned an empty translation for an article section.")
+    leading, _, trailing = _EDGE_WHITESPACE.match(segment_text).groups()
+    return leading + body + trailing
+
+
+class ChunkedTranslationError(LLMParseError):
+    """Some of a plan's requests failed; `failed_indexes` point into `TranslationPlan.requests`."""
+
+    def __init__(self, message, failed_indexes):
+        super().__init__(message)
+        self.failed_indexes = failed_indexes
+
+
+class TranslationPlan:
+    """The requests needed to translate one piece of content, and how to put the answers back together.
+
+    `requests[0]` translates the LinkedIn post and slug (JSON); the others
+    translate the article's chunks (plain Markdown), in article order. They
+    are independent, so callers can send them all at once. Each chunk's
+    request only depends on that chunk's text, so the response cache keeps
+    unchanged sections of an edited article and retries only redo the chunks
+    that failed.
+    """
+
+    def __init__(self, linkedin_post_en, blog_article_en, blog_link_tag_en, language="fr", max_chunk_chars=2000):
+        self.language = language
+        language_name = LANGUAGES[language]["name"]
+        self.segments = split_markdown(blog_article_en, max_chunk_chars)
+        self.requests = [build_post_translation_messages(linkedin_post_en, blog_link_tag_en, language_name)]
+        self.requests += [build_chunk_translation_messages(segment.text.strip(), language_name)
+                          for segment in self.segments if segment.translate]
+
+    @property
+    def chunk_count(self):
+        return len(self.requests) - 1
+
+    def parse_post(self, api_response):
+        raw_text = _response_text(api_response)
+        if raw_text is None:
+            raise ChunkedTranslationError("No response was received from the API for the LinkedIn post translation.", [0])
+        try:
+            return parse_llm_json(raw_text.strip(), POST_TRANSLATION_SCHEMA)
+        except LLMParseError as e:
+            raise ChunkedTranslationError(str(e), [0]) from e
+
+    def _article_pieces(self, chunk_responses):
+        # Yields (request index, text, error) per segment; copied segments have index None.
+        chunk_responses = iter(chunk_responses)
+        chunk_index = 0
+        for segment in self.segments:
+            if not segment.translate:
+                yield None, segment.text, None
+                continue
+            chunk_index += 1
+            try:
+                yield chunk_index, _clean_chunk_translation(_response_text(next(chunk_responses)), segment.text), None
+            except LLMParseError as e:
+                yield chunk_index, None, e
+
+    def iter_article(self, chunk_responses):
+        """Yields the translated article piece by piece, pulling chunk responses (in order) only as needed."""
+        for chunk_index, text, error in self._article_pieces(chunk_responses):
+            if error is not None:
+                raise ChunkedTranslationError(f"Article section {chunk_index} of {self.chunk_count}: {error}",
+                                              [chunk_index]) from error
+            yield text
+
+    def assemble(self, api_responses):
+        """Builds the translation from all responses (aligned with `requests`; None for a failed call)."""
+        failed_indexes = []
+        try:
+            post_result = self.parse_post(api_responses[0])
+        except ChunkedTranslationError:
+            post_result = None
+            failed_indexes.append(0)
+        article_pieces = []
+        for chunk_index, text, error in self._article_pieces(api_responses[1:]):
+            if error is not None:
+                failed_indexes.append(chunk_index)  # keep going so every failed chunk is reported
+            article_pieces.append(text)
+        if failed_indexes:
+            raise ChunkedTranslationError(
+                f"{len(failed_indexes)} of {len(self.requests)} translation requests failed "
+                f"({self.chunk_count} article sections plus the LinkedIn post).", failed_indexes)
+        return ParseResult({**post_result.data, "blog_article": "".join(article_pieces)}, post_result.repaired)